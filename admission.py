@@ -0,0 +1,144 @@
+"""
+Admission control for the character data service.
+
+Every upstream CharPage fetch takes a slot. At most `max_concurrency`
+fetches run at once and at most `max_queue` more wait for a slot; anything
+beyond that is refused straight away with ServiceBusy, which carries a
+retry hint, instead of queueing until the client times out.
+
+The retry hint is the time the queue ahead is expected to take to drain
+(average fetch time x queued fetches / concurrency), never less than the
+configured floor.
+
+Free slots go to waiting interactive lookups before background (batch)
+ones; see fetch_scheduler.py.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict
+
+from fetch_scheduler import PriorityQueue, class_stats, current_priority
+
+
+class ServiceBusy(Exception):
+    """Raised when the wait queue is full."""
+
+    def __init__(self, retry_after_ms: int):
+        super().__init__(f"Service busy, retry after {retry_after_ms} ms")
+        self.retry_after_ms = retry_after_ms
+
+
+class AdmissionControl:
+    """
+    Concurrency limit with a bounded wait queue.
+
+    Args:
+        max_concurrency: Fetches allowed to run at once
+        max_queue: Fetches allowed to wait for a slot
+        retry_after_ms: Smallest retry hint handed out with ServiceBusy
+    """
+
+    def __init__(self, max_concurrency: int = 16, max_queue: int = 64, retry_after_ms: int = 250):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.min_retry_after_ms = retry_after_ms
+        self._queue_obj = None
+        self._loop = None
+
+        self.active = 0
+        self.waiting = 0
+        self.peak_waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        # Moving average of how long an admitted fetch holds its slot
+        self.avg_service_time = 0.0
+        self.classes = class_stats()
+
+    @property
+    def _queue(self) -> PriorityQueue:
+        # Created lazily (and again for a new event loop) so its futures belong to the running loop
+        loop = asyncio.get_running_loop()
+        if self._queue_obj is None or self._loop is not loop:
+            self._queue_obj, self._loop = PriorityQueue(), loop
+        return self._queue_obj
+
+    def _release(self):
+        """Free a slot, handing it straight to the next waiter in priority order."""
+        waiter = self._queue.pop()
+        if waiter is None:
+            self.active -= 1
+        else:
+            waiter.set_result(None)  # The slot stays taken, now by the waiter
+
+    def retry_after_ms(self) -> int:
+        """Estimated time until a slot frees up for a new arrival."""
+        drain = self.avg_service_time * (self.waiting + 1) / self.max_concurrency
+        return max(self.min_retry_after_ms, int(drain * 1000))
+
+    def full(self) -> bool:
+        """True when every slot is taken and the wait queue is full (new fetches are refused)."""
+        return self.active >= self.max_concurrency and self.waiting >= self.max_queue
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        Hold one fetch slot for the duration of the block (raises ServiceBusy if the queue is full).
+
+        Waiters are admitted in fetch priority order (interactive first), then arrival order.
+        """
+        priority = current_priority()
+        if self.full():
+            self.rejected += 1
+            self.classes[priority].rejected += 1
+            raise ServiceBusy(self.retry_after_ms())
+
+        started = time.monotonic()
+        if self.active < self.max_concurrency and self._queue.peek() is None:
+            self.active += 1
+        else:
+            waiter = self._queue.push(priority)
+            self.waiting += 1
+            self.classes[priority].queued += 1
+            self.peak_waiting = max(self.peak_waiting, self.waiting)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._release()  # Admitted just as the caller gave up: pass the slot on
+                raise
+            finally:
+                self.waiting -= 1
+                self.classes[priority].queued -= 1
+
+        admitted_at = time.monotonic()
+        waited = admitted_at - started
+        self.admitted += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        self.classes[priority].record(waited)
+        try:
+            yield
+        finally:
+            self._release()
+            held = time.monotonic() - admitted_at
+            self.avg_service_time = held if self.admitted == 1 else 0.9 * self.avg_service_time + 0.1 * held
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, slots in use and time spent waiting for a slot."""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queue_depth": self.waiting,
+            "peak_queue_depth": self.peak_waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "wait_avg_ms": round(self.wait_total / self.admitted * 1000, 2) if self.admitted else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 2),
+            "avg_service_ms": round(self.avg_service_time * 1000, 2),
+            "classes": {name: stats.stats() for name, stats in self.classes.items()},
+        }
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: frame payload formats for the character data service.
+
+Measures encode and decode time and bytes on the wire for a typical
+character lookup reply and for a large inventory-sized reply, with every
+codec installed on this host: the standard json module, orjson (used for
+JSON frames when installed) and msgpack (the negotiated binary format).
+
+Usage:
+    python benchmarks/bench_codecs.py [--items 2500] [--repeat 2000]
+"""
+
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from char_protocol import CODECS, Codec  # noqa: E402
+
+
+def codecs():
+    """Every payload codec available here, stdlib json first as the baseline."""
+    found = [Codec('json (stdlib)', lambda m: json.dumps(m, separators=(',', ':')).encode(), json.loads)]
+    try:
+        import orjson
+        found.append(Codec('json (orjson)', lambda m: orjson.dumps(m, option=orjson.OPT_NON_STR_KEYS),
+                           orjson.loads))
+    except ImportError:
+        pass
+    if 'msgpack' in CODECS:
+        found.append(CODECS['msgpack'])
+    return found
+
+
+def lookup_reply():
+    """A single-character reply as sent for a lookup."""
+    return {'id': 17, 'status': 'ok', 'data': {
+        'name': 'Artix', 'level': '100', 'class': 'Void Highlord',
+        'helm': 'Helm of the Highlord', 'armor': 'Void Highlord', 'cape': 'Cape of Awe',
+        'weapon': 'Necrotic Sword of Doom', 'pet': 'Twig',
+        'co_armor': 'Legion Revenant', 'co_helm': 'N/A', 'co_cape': 'Broken Wings',
+        'co_weapon': "Hollowborn Reaper's Scythe", 'co_pet': 'N/A',
+    }}
+
+
+def inventory_reply(items):
+    """A large reply shaped like a character inventory listing."""
+    categories = ('Sword', 'Armor', 'Helm', 'Cape', 'Pet', 'Necklace', 'Item', 'Resource', 'Quest Item')
+    return {'id': 18, 'status': 'ok', 'data': {'name': 'Artix', 'inventory': [
+        {
+            'name': f'Legendary Item of the Realm {n}',
+            'category': categories[n % len(categories)],
+            'quantity': 1 if n % 3 else n % 500,
+            'max_stack': 1 if n % 3 else 500,
+            'enhancement': n % 100,
+            'rarity': n % 10,
+            'member': bool(n % 4 == 0),
+            'ac': bool(n % 11 == 0),
+            'equipped': n < 6,
+        }
+        for n in range(items)
+    ]}}
+
+
+def _per_call_us(func, repeat):
+    return min(timeit.repeat(func, number=repeat, repeat=5)) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=2500, help='Items in the large inventory reply')
+    parser.add_argument('--repeat', type=int, default=2000, help='Calls per timing sample (typical reply)')
+    args = parser.parse_args()
+
+    payloads = [('lookup', lookup_reply(), args.repeat),
+                (f'inventory x{args.items}', inventory_reply(args.items), max(1, args.repeat // 200))]
+    if 'msgpack' not in CODECS:
+        print('msgpack not installed (pip install msgpack); comparing JSON codecs only\n')
+
+    for label, message, repeat in payloads:
+        print(f"{label}:")
+        print(f"  {'codec':<16} {'bytes':>9} {'encode':>10} {'decode':>10} {'vs stdlib':>10}")
+        baseline = None
+        for codec in codecs():
+            payload = codec.dumps(message)
+            assert codec.loads(payload) == message, f'{codec.name} did not round-trip'
+            encode = _per_call_us(lambda: codec.dumps(message), repeat)
+            decode = _per_call_us(lambda: codec.loads(payload), repeat)
+            baseline = baseline or encode + decode
+            print(f"  {codec.name:<16} {len(payload):>9} {encode:>8.1f}us {decode:>8.1f}us "
+                  f"{baseline / (encode + decode):>9.1f}x")
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: FlashVars decoding per CharPage.
+
+Compares the previous per-slot regex parsing (scrape_character) and the
+unquote + parse_qs parsing (char_data_scraper) against the shared single-pass
+decoder in flashvars.py, on saved CharPage HTML.
+
+Usage:
+    python benchmarks/bench_flashvars.py saved_pages/*.html [--repeat 2000]
+"""
+
+import argparse
+import re
+import sys
+import timeit
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, unquote_plus
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from flashvars import decode_flashvars, find_flashvars  # noqa: E402
+
+EQUIPMENT_SLOTS = ('Weapon', 'Armor', 'Helm', 'Cape', 'Pet', 'Misc')
+COSMETIC_SLOTS = ('Weapon', 'Armor', 'Helm', 'Cape', 'Pet')
+
+
+def legacy_scrape_character(html):
+    """The FlashVars block scrape_character used before the shared decoder."""
+    data = {'flashvars': {}, 'equipment': {}, 'cosmetics': {}}
+    flashvars_match = re.search(r'flashvars="([^"]+)"', html, re.IGNORECASE)
+    if not flashvars_match:
+        return data
+    flashvars_raw = flashvars_match.group(1).replace('&amp;', '&')
+    for param in flashvars_raw.split('&'):
+        if '=' in param:
+            key, value = param.split('=', 1)
+            if value and value != 'none':
+                data['flashvars'][key] = unquote_plus(value)
+    for slot in EQUIPMENT_SLOTS:
+        match = re.search(rf'str{slot}Name=([^&]+)', flashvars_raw)
+        if match and match.group(1):
+            data['equipment'][slot] = unquote_plus(match.group(1))
+    for slot in COSMETIC_SLOTS:
+        match = re.search(rf'strCust{slot}Name=([^&]+)', flashvars_raw)
+        if match and match.group(1):
+            data['cosmetics'][slot] = unquote_plus(match.group(1))
+    return data
+
+
+def legacy_char_data(html):
+    """The FlashVars block char_data_scraper.get_char_data used before the shared decoder."""
+    match = re.search(r'flashvars="([^"]+)"', html, re.IGNORECASE)
+    if not match:
+        match = re.search(r'<param name="FlashVars" value="([^"]+)"', html, re.IGNORECASE)
+    if not match:
+        return {}
+    return parse_qs(unquote(match.group(1).replace("&amp;", "&")))
+
+
+def shared_decoder(html):
+    raw = find_flashvars(html)
+    return decode_flashvars(raw) if raw else None
+
+
+def _per_call_us(func, html, repeat):
+    return min(timeit.repeat(lambda: func(html), number=repeat, repeat=5)) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('pages', nargs='+', type=Path, help='Saved CharPage HTML files')
+    parser.add_argument('--repeat', type=int, default=2000, help='Calls per timing sample')
+    args = parser.parse_args()
+
+    print(f"{'page':<32} {'scrape_character':>17} {'char_data':>10} {'shared':>8} {'speedup':>8}  same")
+    totals = [0.0, 0.0, 0.0]
+    for path in args.pages:
+        html = path.read_text(encoding='utf-8', errors='replace')
+        timings = [_per_call_us(func, html, args.repeat)
+                   for func in (legacy_scrape_character, legacy_char_data, shared_decoder)]
+        totals = [total + t for total, t in zip(totals, timings)]
+        same = shared_decoder(html) == legacy_scrape_character(html) if find_flashvars(html) else 'n/a'
+        print(f"{path.name[:32]:<32} {timings[0]:>15.1f}us {timings[1]:>8.1f}us {timings[2]:>6.1f}us "
+              f"{timings[0] / timings[2]:>7.1f}x  {same}")
+
+    count = len(args.pages)
+    print(f"\nmean per page: scrape_character {totals[0] / count:.1f}us, "
+          f"char_data {totals[1] / count:.1f}us, shared {totals[2] / count:.1f}us")
+
+
+if __name__ == '__main__':
+    main()
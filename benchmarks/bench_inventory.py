@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark: character inventories as a list of dicts vs CompactInventory.
+
+scrape_character used to keep /CharPage/Inventory as json decoded it, one
+dict per item. This measures the memory that costs per character next to
+CompactInventory (inventory_index.py), with both tracemalloc (bytes
+allocated while building it) and a deep getsizeof walk, plus the time to
+ingest the body (json.loads vs streaming it in chunks).
+
+Pass saved inventory responses (the JSON from /CharPage/Inventory?ccid=...)
+to measure real data; without them a synthetic inventory is used.
+
+Usage:
+    python benchmarks/bench_inventory.py [inventory.json ...] [--items 2500] [--chunk 16384]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from inventory_index import read_inventory  # noqa: E402
+
+
+def synthetic_inventory(items):
+    """An inventory body shaped like /CharPage/Inventory."""
+    types = ('Sword', 'Armor', 'Helm', 'Cape', 'Pet', 'Necklace', 'Item', 'Resource', 'Quest Item', 'Class')
+    return json.dumps([
+        {
+            'ItemID': 10000 + n,
+            'strName': f'Legendary Item of the Realm {n}',
+            'strType': types[n % len(types)],
+            'intCount': 1 if n % 3 else n % 500,
+            'intLevel': n % 100,
+            'bCoins': n % 7 == 0,
+            'bUpg': n % 4 == 0,
+            'bTemp': False,
+            'strEnh': 'Lucky' if n % 5 == 0 else None,
+        }
+        for n in range(items)
+    ])
+
+
+def deep_size(obj, seen=None):
+    """getsizeof of obj and everything it references, each object counted once."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(deep_size(v, seen) for v in obj)
+    return size
+
+
+async def _compact(body, chunk):
+    inventory = await read_inventory(_chunks(body, chunk))
+    inventory.position('')  # Build the name index so it is measured too
+    return inventory
+
+
+async def _chunks(text, size):
+    for start in range(0, len(text), size):
+        yield text[start:start + size]
+
+
+def measure(build):
+    """(result, bytes still allocated by build(), seconds for an untraced build())."""
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Timed separately: tracemalloc slows allocation-heavy code down
+    started = time.perf_counter()
+    build()
+    return result, current, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('files', nargs='*', help='Saved /CharPage/Inventory responses')
+    parser.add_argument('--items', type=int, default=2500, help='Items in the synthetic inventory')
+    parser.add_argument('--chunk', type=int, default=16384, help='Streamed chunk size in characters')
+    args = parser.parse_args()
+
+    bodies = [(path, Path(path).read_text(encoding='utf-8')) for path in args.files]
+    if not bodies:
+        bodies = [(f'synthetic x{args.items}', synthetic_inventory(args.items))]
+
+    for label, body in bodies:
+        items, dict_bytes, dict_time = measure(lambda: json.loads(body))
+        compact, compact_bytes, compact_time = measure(lambda: asyncio.run(_compact(body, args.chunk)))
+        assert list(compact) == items, f'{label} did not round-trip'
+
+        print(f"{label}: {len(items)} items, {len(body)} bytes of JSON")
+        print(f"  {'':<16} {'tracemalloc':>12} {'getsizeof':>12} {'per item':>9} {'ingest':>9}")
+        print(f"  {'list of dicts':<16} {dict_bytes:>12} {deep_size(items):>12} "
+              f"{dict_bytes / max(1, len(items)):>9.0f} {dict_time * 1000:>7.1f}ms")
+        print(f"  {'CompactInventory':<16} {compact_bytes:>12} {compact.nbytes():>12} "
+              f"{compact_bytes / max(1, len(compact)):>9.0f} {compact_time * 1000:>7.1f}ms")
+        print(f"  {dict_bytes / max(1, compact_bytes):.1f}x less memory\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Benchmark: HTML parser backends on recorded pages.
+
+For each installed backend (see html_parser.BACKENDS) this reports the mean
+parse time, the mean full-extraction time and the peak traced memory of one
+parse, and checks that every extracted field matches the html.parser result.
+CharPages are also parsed with and without the targeted header/card-body
+mode of parse_character_info. The targeted result depends on the page
+layout (the <h1> before the card-body or inside it, or no fragment found,
+which falls back to a full parse), so the layout of each page measured is
+reported with it. parse_identity (the verification fast path) is checked
+against parse_character_info's name, guild and ccid on the same pages.
+
+Usage:
+    python benchmarks/bench_parsers.py --charpage saved/char_*.html --wiki saved/wiki_*.html
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import html_parser  # noqa: E402
+from scraper import (  # noqa: E402
+    locate_charpage_fragment, parse_character_info, parse_character_page, parse_identity
+)
+from wiki_scraper import parse_wiki_page  # noqa: E402
+
+
+def _extract_charpage(path, html):
+    return {
+        'info': parse_character_info(html),
+        'page': parse_character_page(html, path.stem),
+    }
+
+
+def _extract_wiki(path, html):
+    return parse_wiki_page(html, f'http://aqwwiki.wikidot.com/{path.stem}', path.stem)
+
+
+def _mean_seconds(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def _peak_bytes(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_corpus(label, pages, extract, backends, repeat):
+    print(f"\n{label} ({len(pages)} pages)")
+    print(f"{'backend':<12} {'parse':>10} {'extract':>10} {'peak mem':>10}  fields")
+
+    baseline = {}
+    for backend in backends:
+        html_parser.HTML_PARSER = backend
+        parse_s = extract_s = 0.0
+        peak = 0
+        mismatches = []
+        # The scrapers print debug lines while extracting; keep the table readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            for path, html in pages:
+                parse_s += _mean_seconds(lambda: html_parser.make_soup(html), repeat)
+                extract_s += _mean_seconds(lambda: extract(path, html), repeat)
+                peak = max(peak, _peak_bytes(lambda: html_parser.make_soup(html)))
+
+                result = extract(path, html)
+                if backend == html_parser.DEFAULT_BACKEND:
+                    baseline[path] = result
+                elif result != baseline[path]:
+                    mismatches.append(path.name)
+
+        count = len(pages)
+        fields = 'identical' if not mismatches else f"DIFFER: {', '.join(mismatches)}"
+        print(f"{backend:<12} {parse_s / count * 1e3:>8.2f}ms {extract_s / count * 1e3:>8.2f}ms "
+              f"{peak / 1024:>8.0f}KB  {fields}")
+
+
+def bench_targeted(pages, repeat):
+    """Full-page vs header/card-body parse in parse_character_info (configured backend)."""
+    print(f"\nparse_character_info targeted parse ({len(pages)} pages, {html_parser.HTML_PARSER})")
+    layouts = {}
+    for _, html in pages:
+        location = locate_charpage_fragment(html)
+        layout = location[2] if location else 'not found'
+        layouts[layout] = layouts.get(layout, 0) + 1
+    print('layouts: ' + ', '.join(f'{layout} {count}' for layout, count in sorted(layouts.items())))
+    print(f"{'mode':<12} {'time':>10} {'peak mem':>10}  fields")
+
+    baseline = {}
+    for targeted in (False, True):
+        total_s = 0.0
+        peak = 0
+        mismatches = []
+        for path, html in pages:
+            total_s += _mean_seconds(lambda: parse_character_info(html, targeted=targeted), repeat)
+            peak = max(peak, _peak_bytes(lambda: parse_character_info(html, targeted=targeted)))
+
+            result = parse_character_info(html, targeted=targeted)
+            if not targeted:
+                baseline[path] = result
+            elif result != baseline[path]:
+                mismatches.append(path.name)
+
+        fields = 'identical' if not mismatches else f"DIFFER: {', '.join(mismatches)}"
+        mode = 'targeted' if targeted else 'full'
+        print(f"{mode:<12} {total_s / len(pages) * 1e3:>8.2f}ms {peak / 1024:>8.0f}KB  {fields}")
+
+
+def bench_identity(pages, repeat):
+    """parse_identity vs the name/guild/ccid of a full parse_character_info."""
+    print(f"\nparse_identity ({len(pages)} pages, {html_parser.HTML_PARSER})")
+    print(f"{'parser':<22} {'time':>10}  fields")
+
+    identity_s = info_s = 0.0
+    mismatches = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for path, html in pages:
+            identity_s += _mean_seconds(lambda: parse_identity(html), repeat)
+            info_s += _mean_seconds(lambda: parse_character_info(html, targeted=False), repeat)
+
+            info = parse_character_info(html, targeted=False)
+            expected = {'name': info['name'], 'guild': info['guild'], 'ccid': info['ccid']}
+            if parse_identity(html) != expected:
+                mismatches.append(path.name)
+
+    fields = 'identical' if not mismatches else f"DIFFER: {', '.join(mismatches)}"
+    print(f"{'parse_character_info':<22} {info_s / len(pages) * 1e3:>8.2f}ms")
+    print(f"{'parse_identity':<22} {identity_s / len(pages) * 1e3:>8.2f}ms  {fields}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--charpage', nargs='*', type=Path, default=[], help='Saved CharPage HTML files')
+    parser.add_argument('--wiki', nargs='*', type=Path, default=[], help='Saved AQW Wiki HTML files')
+    parser.add_argument('--repeat', type=int, default=20, help='Runs per page and backend')
+    args = parser.parse_args()
+
+    if not args.charpage and not args.wiki:
+        parser.error('pass at least one --charpage or --wiki file')
+
+    # html.parser first so the other backends are compared against it
+    backends = [html_parser.DEFAULT_BACKEND] + [
+        name for name in html_parser.available_backends() if name != html_parser.DEFAULT_BACKEND
+    ]
+    print(f"Backends: {', '.join(backends)}")
+
+    def load(paths):
+        return [(path, path.read_text(encoding='utf-8', errors='replace')) for path in paths]
+
+    if args.charpage:
+        charpages = load(args.charpage)
+        bench_corpus('CharPage', charpages, _extract_charpage, backends, args.repeat)
+        html_parser.HTML_PARSER = html_parser.DEFAULT_BACKEND
+        bench_targeted(charpages, args.repeat)
+        bench_identity(charpages, args.repeat)
+    if args.wiki:
+        bench_corpus('Wiki', load(args.wiki), _extract_wiki, backends, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Load benchmark: character data service throughput by worker count.
+
+Starts char_data_scraper with each --workers value on a local port, with
+the CharPage fetch replaced by a saved page (plus optional simulated
+upstream latency) and the result cache disabled, so every request does the
+real parse + encode work. Load generator processes drive pipelined lookups
+over pooled framed connections and the script reports requests/second.
+
+Usage:
+    python benchmarks/bench_service_load.py saved_pages/artix.html --workers 1 2 4
+    python benchmarks/bench_service_load.py --workers 1 2 4 8 --duration 10 --latency 20
+    python benchmarks/bench_service_load.py --workers 1 --socket /tmp/char_data.sock
+
+Without a page a synthetic CharPage of similar size is used. Run the load
+generators on spare cores (--generators) or the client side becomes the
+bottleneck. With --socket the clients connect over a Unix domain socket
+instead of TCP loopback.
+"""
+
+import argparse
+import asyncio
+import itertools
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import char_data_scraper  # noqa: E402
+from scanner_client import CharDataClient  # noqa: E402
+
+HOST = '127.0.0.1'
+
+
+def synthetic_page():
+    """A CharPage-sized page with a realistic FlashVars attribute."""
+    flashvars = '&amp;'.join([
+        'strName=Bench+Hero', 'intLevel=100', 'strClassName=Void+Highlord',
+        'strWeaponName=Necrotic+Sword+of+Doom', 'strArmorName=Void+Highlord',
+        'strHelmName=Helm+of+the+Highlord', 'strCapeName=Cape+of+Awe', 'strPetName=Twig',
+        'strCustArmorName=Legion+Revenant', 'strCustHelmName=none', 'strCustCapeName=Broken+Wings',
+        'strCustWeaponName=Hollowborn+Reaper%27s+Scythe', 'strCustPetName=none',
+        'strGuildName=Bench', 'intColorHair=3355443', 'intColorSkin=15388042',
+    ] + [f'strFiller{i}=value{i}' for i in range(40)])
+    filler = '<div class="row"><span>filler text for page weight</span></div>\n' * 600
+    return (f'<html><head><title>Character Page</title></head><body>{filler}'
+            f'<embed src="charpage.swf" flashvars="{flashvars}" width="715" height="455"/>'
+            f'{filler}</body></html>')
+
+
+def run_service(port, workers, html, latency, path):
+    """Service process: serve the saved page instead of fetching CharPages."""
+    sys.stdout = open(os.devnull, 'w')
+
+    async def fetch_page(char_name):
+        if latency:
+            await asyncio.sleep(latency)
+        return 200, html
+
+    char_data_scraper.fetch_page = fetch_page
+    char_data_scraper.result_cache.ttl_for = lambda data: 0
+    char_data_scraper.admission.max_concurrency = 1_000_000
+    char_data_scraper.admission.max_queue = 1_000_000
+    if workers > 1:
+        char_data_scraper.run_workers(workers, HOST, port, path)
+        return
+    unix_sock = char_data_scraper._unix_socket(path) if path else None
+    try:
+        asyncio.run(char_data_scraper.serve(HOST, port, unix_sock=unix_sock))
+    finally:
+        if path:
+            os.unlink(path)
+
+
+def run_generator(port, path, connections, concurrency, duration, results, index):
+    """Load generator process: keep `concurrency` lookups in flight for `duration` seconds."""
+    async def generate():
+        client = CharDataClient(HOST, port, timeout=30, min_size=connections, max_size=connections,
+                                max_in_flight=max(1, concurrency // connections) + 1, path=path)
+        names = (f'bench{index}_{n}' for n in itertools.count())
+        done = errors = 0
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            nonlocal done, errors
+            while time.perf_counter() < deadline:
+                data = await client.get_char_data(next(names))
+                if 'error' in data:
+                    errors += 1
+                else:
+                    done += 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        await client.close()
+        return done, errors
+
+    sys.stdout = open(os.devnull, 'w')
+    results.put(asyncio.run(generate()))
+
+
+def wait_for_port(port, timeout=15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((HOST, port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'Service did not start on port {port}')
+
+
+def bench(workers, args, html):
+    ctx = multiprocessing.get_context('fork')
+    service = ctx.Process(target=run_service, args=(args.port, workers, html, args.latency / 1000, args.socket))
+    service.start()
+    try:
+        wait_for_port(args.port)
+        time.sleep(0.5 + 0.1 * workers)  # Let every worker bind before measuring
+
+        results = ctx.Queue()
+        generators = [
+            ctx.Process(target=run_generator,
+                        args=(args.port, args.socket, args.connections, args.concurrency, args.duration, results, i))
+            for i in range(args.generators)
+        ]
+        started = time.perf_counter()
+        for generator in generators:
+            generator.start()
+        totals = [results.get() for _ in generators]
+        elapsed = time.perf_counter() - started
+        for generator in generators:
+            generator.join()
+    finally:
+        os.kill(service.pid, signal.SIGTERM)
+        service.join(15)
+        if service.is_alive():
+            service.kill()
+            service.join()
+
+    done = sum(total[0] for total in totals)
+    errors = sum(total[1] for total in totals)
+    return done / min(elapsed, args.duration + 1), errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('page', nargs='?', type=Path, help='Saved CharPage HTML file (default: synthetic page)')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help='Worker counts to compare')
+    parser.add_argument('--duration', type=float, default=5.0, help='Seconds of load per run')
+    parser.add_argument('--generators', type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help='Load generator processes')
+    parser.add_argument('--connections', type=int, default=4, help='Connections per generator')
+    parser.add_argument('--concurrency', type=int, default=64, help='Lookups in flight per generator')
+    parser.add_argument('--latency', type=float, default=0.0, help='Simulated upstream latency (ms)')
+    parser.add_argument('--port', type=int, default=4599)
+    parser.add_argument('--socket', help='Connect over this Unix socket path instead of TCP')
+    args = parser.parse_args()
+
+    html = args.page.read_text(encoding='utf-8', errors='replace') if args.page else synthetic_page()
+    print(f"page {len(html) / 1024:.0f} KiB, {args.generators} generators x {args.connections} connections, "
+          f"{args.concurrency} in flight each, {args.duration:.0f}s per run, cpus {os.cpu_count()}, "
+          f"{'unix socket' if args.socket else 'tcp'}")
+    print(f"{'workers':>7} {'req/s':>10} {'speedup':>8} {'errors':>7}")
+    baseline = None
+    for workers in args.workers:
+        rate, errors = bench(workers, args, html)
+        baseline = baseline or rate
+        print(f"{workers:>7} {rate:>10.0f} {rate / baseline:>7.2f}x {errors:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,7 +4,6 @@ import discord
 from discord import app_commands, ui
 from discord.ext import commands
 from dotenv import load_dotenv
-import aiohttp
 from typing import Optional
 from datetime import timedelta
 import re
@@ -17,6 +16,7 @@ from logging.handlers import RotatingFileHandler
 from discord.ext import tasks
 from datetime import time, timezone, datetime
 from typing import Literal
+from time import perf_counter
 
 load_dotenv(override=True)
 
@@ -39,10 +39,15 @@ logger.setLevel(logging.INFO)
 logger.addHandler(file_handler)
 logger.addHandler(console_handler)
 
-from scraper import get_character_info_async
+from scraper import BASE as CHARPAGE_URL, fetch_identity
+from http_clients import close_http_clients, http_client_stats
+from upstream_guard import add_listener, get_guard, guard_stats
+from fetch_scheduler import BACKGROUND, fetch_priority
 from wiki_scraper import scrape_wiki_page
 from shop_scraper import scrape_shop_items
-from scanner_client import get_char_data
+from scanner_client import close_clients, get_char_data, get_client
+from charpage_cache import charpage_cache
+from storage import AsyncStorage, atomic_write_json, open_storage, write_stats
 
 LEGEND_EMOJI = "<:legendlarge:1438729295571845201>"
 AC_EMOJI = "<:aclarge:1438723955740639435>"
@@ -56,8 +61,26 @@ REQUESTER_FILE = Path(__file__).parent / "requester_stats.json"
 # Verification system file paths
 VERIFIED_USERS_FILE = Path(__file__).parent / "verified_users.json"
 VERIFICATION_CONFIG_FILE = Path(__file__).parent / "verification_config.json"
+
+# Points, requester stats and verified users (STORAGE_BACKEND=json or sqlite).
+# All persistence runs on the storage writer thread, never on the event loop.
+storage = AsyncStorage(open_storage(
+    points_file=POINTS_FILE,
+    requester_file=REQUESTER_FILE,
+    verified_users_file=VERIFIED_USERS_FILE,
+))
 SERVER_CONFIG_FILE = Path(__file__).parent / "server_config.json"
 
+# Daily verification check: number of CharPage lookups in flight at once
+VERIFICATION_FETCH_CONCURRENCY = max(1, int(os.getenv("VERIFICATION_FETCH_CONCURRENCY", "8")))
+# Daily verification check: flush verified_users.json after this many changed users
+VERIFICATION_CHECKPOINT_EVERY = int(os.getenv("VERIFICATION_CHECKPOINT_EVERY", "100"))
+# Daily verification check: how long (seconds from the start of the run) lookups wait for
+# account.aq.com's circuit breaker to close before they are skipped for the day
+VERIFICATION_PAUSE_LIMIT = float(os.getenv("VERIFICATION_PAUSE_LIMIT", "3600"))
+# Seconds between readiness probes of the character data service
+CHAR_DATA_HEALTH_INTERVAL = max(5, int(os.getenv("CHAR_DATA_HEALTH_INTERVAL", "60")))
+
 # Boss points mapping
 BOSS_POINTS = {
     # UltraWeeklies bosses
@@ -93,217 +116,107 @@ BOSS_POINTS = {
 }
 
 
-def load_points():
-    """Load points data from JSON file"""
-    if POINTS_FILE.exists():
-        with open(POINTS_FILE, 'r') as f:
-            return json.load(f)
-    return {}
-
-
-def save_points(points_data):
-    """Save points data to JSON file"""
-    with open(POINTS_FILE, 'w') as f:
-        json.dump(points_data, f, indent=2)
-
-
-def load_requester_stats():
-    """Load requester stats from JSON file"""
-    if REQUESTER_FILE.exists():
-        with open(REQUESTER_FILE, 'r') as f:
-            return json.load(f)
-    return {}
-
-
-def save_requester_stats(requester_data):
-    """Save requester stats to JSON file"""
-    with open(REQUESTER_FILE, 'w') as f:
-        json.dump(requester_data, f, indent=2)
-
-
-def track_ticket_created(user_id, ticket_type, guild_id):
+async def track_ticket_created(user_id, ticket_type, guild_id):
     """Track when a user creates a ticket (per-server)"""
-    all_requester_data = load_requester_stats()
-    user_id_str = str(user_id)
-    guild_id_str = str(guild_id)
-
-    # Ensure guild exists in data structure
-    if guild_id_str not in all_requester_data:
-        all_requester_data[guild_id_str] = {"users": {}}
-
-    requester_data = all_requester_data[guild_id_str]["users"]
-
-    if user_id_str not in requester_data:
-        requester_data[user_id_str] = {
-            "tickets_created": 0,
-            "ticket_types": {}
-        }
-
-    requester_data[user_id_str]["tickets_created"] += 1
-
-    if "ticket_types" not in requester_data[user_id_str]:
-        requester_data[user_id_str]["ticket_types"] = {}
-
-    if ticket_type not in requester_data[user_id_str]["ticket_types"]:
-        requester_data[user_id_str]["ticket_types"][ticket_type] = 0
-    requester_data[user_id_str]["ticket_types"][ticket_type] += 1
+    return await storage.track_ticket_created(guild_id, user_id, ticket_type)
 
-    save_requester_stats(all_requester_data)
-    return requester_data[user_id_str]["tickets_created"]
 
-
-def add_points(user_id, points, bosses, guild_id):
+async def add_points(user_id, points, bosses, guild_id):
     """Add points to a user and track boss completions (per-server)"""
-    points_data = load_points()
-    user_id_str = str(user_id)
-    guild_id_str = str(guild_id)
-
-    # Ensure guild exists in data structure
-    if guild_id_str not in points_data:
-        points_data[guild_id_str] = {"users": {}}
-
-    guild_users = points_data[guild_id_str]["users"]
-
-    if user_id_str not in guild_users:
-        guild_users[user_id_str] = {
-            "total_points": 0,
-            "bosses": {},
-            "tickets_completed": 0
-        }
-
-    # Handle old format (just a number)
-    if isinstance(guild_users[user_id_str], (int, float)):
-        guild_users[user_id_str] = {
-            "total_points": guild_users[user_id_str],
-            "bosses": {},
-            "tickets_completed": 0
-        }
-
-    # Add points
-    guild_users[user_id_str]["total_points"] += points
-
-    # Track boss completions
-    if "bosses" not in guild_users[user_id_str]:
-        guild_users[user_id_str]["bosses"] = {}
+    return await storage.add_points(guild_id, user_id, points, bosses)
 
-    for boss in bosses:
-        if boss not in guild_users[user_id_str]["bosses"]:
-            guild_users[user_id_str]["bosses"][boss] = 0
-        guild_users[user_id_str]["bosses"][boss] += 1
 
-    # Increment tickets completed
-    if "tickets_completed" not in guild_users[user_id_str]:
-        guild_users[user_id_str]["tickets_completed"] = 0
-    guild_users[user_id_str]["tickets_completed"] += 1
-
-    save_points(points_data)
-    return guild_users[user_id_str]["total_points"]
-
-
-def track_ticket_join(user_id, guild_id):
+async def track_ticket_join(user_id, guild_id):
     """Track when a user joins a ticket (per-server)"""
-    points_data = load_points()
-    user_id_str = str(user_id)
-    guild_id_str = str(guild_id)
-
-    # Ensure guild exists in data structure
-    if guild_id_str not in points_data:
-        points_data[guild_id_str] = {"users": {}}
-
-    guild_users = points_data[guild_id_str]["users"]
-
-    if user_id_str not in guild_users:
-        guild_users[user_id_str] = {
-            "total_points": 0,
-            "bosses": {},
-            "tickets_joined": 0,
-            "tickets_completed": 0
-        }
-
-    # Handle old format
-    if isinstance(guild_users[user_id_str], (int, float)):
-        guild_users[user_id_str] = {
-            "total_points": guild_users[user_id_str],
-            "bosses": {},
-            "tickets_joined": 0,
-            "tickets_completed": 0
-        }
-
-    # Increment tickets joined
-    if "tickets_joined" not in guild_users[user_id_str]:
-        guild_users[user_id_str]["tickets_joined"] = 0
-    guild_users[user_id_str]["tickets_joined"] += 1
-
-    save_points(points_data)
+    await storage.track_ticket_join(guild_id, user_id)
 
 
 # ==================== VERIFICATION SYSTEM HELPERS ====================
 
-def load_verified_users():
-    """Load verified users from JSON file"""
+async def load_verified_users():
+    """Load verified users for every server"""
     try:
-        if VERIFIED_USERS_FILE.exists():
-            with open(VERIFIED_USERS_FILE, 'r') as f:
-                return json.load(f)
-        return {}
+        return await storage.load_verified_users()
     except Exception as e:
         logger.error(f"Error loading verified users: {e}")
         return {}
 
-def save_verified_users(data):
-    """Save verified users to JSON file"""
-    try:
-        with open(VERIFIED_USERS_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
-    except Exception as e:
-        logger.error(f"Error saving verified users: {e}")
-
-def add_verified_user(user_id, ign, guild, ccid=None, guild_id=None):
+async def add_verified_user(user_id, ign, guild, ccid=None, guild_id=None):
     """Add a verified user to storage (per-server)"""
-    data = load_verified_users()
     user_id_str = str(user_id)
     guild_id_str = str(guild_id)
 
-    # Ensure guild exists in data structure
-    if guild_id_str not in data:
-        data[guild_id_str] = {"users": {}}
-
     # Add or update user
-    data[guild_id_str]["users"][user_id_str] = {
+    await storage.set_verified_user(guild_id_str, user_id_str, {
         "ign": ign,
         "guild": guild,
         "ccid": ccid,  # Character ID (unique identifier)
         "verified_at": datetime.now(timezone.utc).isoformat(),
         "last_checked": datetime.now(timezone.utc).isoformat(),
         "failed_checks": 0
-    }
-
-    save_verified_users(data)
+    })
     logger.info(f"Added verified user: {user_id_str} in guild {guild_id_str} (IGN: {ign}, Guild: {guild}, CCID: {ccid})")
 
-def remove_verified_user(user_id, guild_id):
+async def remove_verified_user(user_id, guild_id):
     """Remove a verified user from storage (per-server)"""
-    data = load_verified_users()
-    user_id_str = str(user_id)
-    guild_id_str = str(guild_id)
-
-    if guild_id_str in data and "users" in data[guild_id_str]:
-        if user_id_str in data[guild_id_str]["users"]:
-            del data[guild_id_str]["users"][user_id_str]
-            save_verified_users(data)
-            logger.info(f"Removed verified user: {user_id_str} from guild {guild_id_str}")
-            return True
+    if await storage.remove_verified_user(guild_id, user_id):
+        logger.info(f"Removed verified user: {user_id} from guild {guild_id}")
+        return True
     return False
 
-def get_verified_user(user_id, guild_id):
-    """Get verified user data (per-server)"""
-    data = load_verified_users()
-    guild_id_str = str(guild_id)
-    user_id_str = str(user_id)
+class VerifiedUsersBatch:
+    """
+    Buffers verified-user changes made during a verification run.
+
+    Changed records are tracked per (guild, user) and written with one atomic
+    flush at the end of the run instead of rewriting verified_users.json after
+    every user. A checkpoint flush happens every `checkpoint_every` changes so
+    a crash loses at most one batch. Flushing applies only the changed records,
+    so verifications completed during the run are kept.
+    """
+
+    def __init__(self, checkpoint_every: int = VERIFICATION_CHECKPOINT_EVERY):
+        self.checkpoint_every = checkpoint_every
+        self._changes = {}
+        self.flushes = 0
+        self.bytes_written = 0
+
+    async def update(self, user_id, guild_id, user_data):
+        """Stage a changed user record"""
+        self._changes[(str(guild_id), str(user_id))] = user_data
+        await self._checkpoint()
+
+    async def remove(self, user_id, guild_id):
+        """Stage the removal of a user record"""
+        self._changes[(str(guild_id), str(user_id))] = None
+        await self._checkpoint()
+
+    async def _checkpoint(self):
+        if self.checkpoint_every > 0 and len(self._changes) >= self.checkpoint_every:
+            await self.flush()
+
+    async def flush(self):
+        """Write all staged changes in a single atomic save"""
+        if not self._changes:
+            return
 
-    if guild_id_str in data and "users" in data[guild_id_str]:
-        return data[guild_id_str]["users"].get(user_id_str)
-    return None
+        # Other guilds keep staging changes while the write is in flight
+        changes, self._changes = self._changes, {}
+        try:
+            self.bytes_written += await storage.apply_verified_user_changes(changes)
+        except Exception as e:
+            logger.error(f"Error saving verified users: {e}")
+            self._changes = {**changes, **self._changes}
+            return
+
+        for (guild_id_str, user_id_str), user_data in changes.items():
+            if user_data is None:
+                logger.info(f"Removed verified user: {user_id_str} from guild {guild_id_str}")
+        self.flushes += 1
+
+async def get_verified_user(user_id, guild_id):
+    """Get verified user data (per-server)"""
+    return await storage.get_verified_user(guild_id, user_id)
 
 def load_verification_config():
     """Load verification config from JSON file (per-server)"""
@@ -319,14 +232,13 @@ def load_verification_config():
 def save_verification_config(data):
     """Save verification config to JSON file (per-server)"""
     try:
-        with open(VERIFICATION_CONFIG_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
+        atomic_write_json(VERIFICATION_CONFIG_FILE, data)
     except Exception as e:
         logger.error(f"Error saving verification config: {e}")
 
-def get_guild_verification_config(guild_id):
+async def get_guild_verification_config(guild_id):
     """Get verification config for a specific guild"""
-    all_config = load_verification_config()
+    all_config = await storage.run(load_verification_config)
     guild_id_str = str(guild_id)
 
     if guild_id_str not in all_config:
@@ -338,25 +250,28 @@ def get_guild_verification_config(guild_id):
         }
     return all_config[guild_id_str]
 
-def update_guild_verification_config(guild_id, updates):
+async def update_guild_verification_config(guild_id, updates):
     """Update verification config for a specific guild"""
-    all_config = load_verification_config()
-    guild_id_str = str(guild_id)
+    def update():
+        all_config = load_verification_config()
+        guild_id_str = str(guild_id)
 
-    if guild_id_str not in all_config:
-        all_config[guild_id_str] = {
-            "daily_check_enabled": True,
-            "last_check_time": None,
-            "total_checks_run": 0,
-            "users_removed_total": 0
-        }
+        if guild_id_str not in all_config:
+            all_config[guild_id_str] = {
+                "daily_check_enabled": True,
+                "last_check_time": None,
+                "total_checks_run": 0,
+                "users_removed_total": 0
+            }
+
+        all_config[guild_id_str].update(updates)
+        save_verification_config(all_config)
 
-    all_config[guild_id_str].update(updates)
-    save_verification_config(all_config)
+    await storage.run(update)
 
-def is_daily_check_enabled_for_guild(guild_id):
+async def is_daily_check_enabled_for_guild(guild_id):
     """Check if daily verification checks are enabled for a specific guild"""
-    config = get_guild_verification_config(guild_id)
+    config = await get_guild_verification_config(guild_id)
     return config.get("daily_check_enabled", True)
 
 async def get_or_create_verification_logs_channel(guild: discord.Guild) -> Optional[discord.TextChannel]:
@@ -406,64 +321,122 @@ def load_server_config():
 def save_server_config(data):
     """Save server configuration to JSON file"""
     try:
-        with open(SERVER_CONFIG_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
+        atomic_write_json(SERVER_CONFIG_FILE, data)
     except Exception as e:
         logger.error(f"Error saving server config: {e}")
 
-def get_verified_role_name(guild_id: int) -> str:
+async def get_verified_role_name(guild_id: int) -> str:
     """Get the verified role name for a specific server"""
-    config = load_server_config()
+    config = await storage.run(load_server_config)
     guild_id_str = str(guild_id)
     return config.get(guild_id_str, {}).get("verified_role_name", "Verified")
 
-def set_verified_role_name(guild_id: int, role_name: str):
+async def set_verified_role_name(guild_id: int, role_name: str):
     """Set the verified role name for a specific server"""
-    config = load_server_config()
-    guild_id_str = str(guild_id)
-    if guild_id_str not in config:
-        config[guild_id_str] = {}
-    config[guild_id_str]["verified_role_name"] = role_name
-    save_server_config(config)
+    def update():
+        config = load_server_config()
+        guild_id_str = str(guild_id)
+        if guild_id_str not in config:
+            config[guild_id_str] = {}
+        config[guild_id_str]["verified_role_name"] = role_name
+        save_server_config(config)
+
+    await storage.run(update)
     logger.info(f"Set verified role name for guild {guild_id} to: {role_name}")
 
 # ==================== END SERVER CONFIG HELPERS ====================
 
 # ==================== END VERIFICATION SYSTEM HELPERS ====================
 
-async def run_verification_check(guild: discord.Guild) -> dict:
+# Breaker transitions and rate cuts for account.aq.com and the wiki go to bot.log
+add_listener(lambda host, message: logger.warning(f"Upstream {host}: {message}"))
+
+# Rate limiter + circuit breaker shared by every request to account.aq.com
+charpage_guard = get_guard(CHARPAGE_URL)
+
+
+class VerificationLookup:
     """
-    Run verification check on all verified users
-    Returns dict with results: {checked, mismatches, errors, removed}
+    CharPage identity lookups for one verification run.
+
+    Each distinct IGN is fetched once per run and the result is shared with
+    every guild that verifies it. The semaphore bounds the number of
+    lookups in flight across all guilds of the run.
+
+    While account.aq.com's circuit breaker is open the lookups pause instead
+    of failing, and a lookup that failed because the breaker opened is
+    retried once it closes. Lookups still paused VERIFICATION_PAUSE_LIMIT
+    seconds after the run started return {"error": ..., "upstream_unavailable": True},
+    which does not count as a strike. Other failures are retried once.
     """
-    results = {
-        "checked": 0,
-        "mismatches": 0,
-        "errors": 0,
-        "removed": 0
-    }
 
-    # Load per-server data
-    all_data = load_verified_users()
-    guild_id_str = str(guild.id)
+    def __init__(self, concurrency: int = VERIFICATION_FETCH_CONCURRENCY,
+                 pause_limit: float = VERIFICATION_PAUSE_LIMIT):
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._lookups = {}
+        self._resume_by = asyncio.get_running_loop().time() + pause_limit
+        self.fetched = 0
+        self.shared = 0
+        self.retried = 0
+        self.unavailable = 0
+
+    def prefetch(self, ign: str) -> asyncio.Future:
+        """Start the lookup for an IGN during planning (counts IGNs shared between users)"""
+        key = " ".join(ign.lower().split())
+        lookup = self._lookups.get(key)
+        if lookup is None:
+            lookup = asyncio.ensure_future(self._fetch(key))
+            self._lookups[key] = lookup
+            self.fetched += 1
+        else:
+            self.shared += 1
+        return lookup
+
+    async def get(self, ign: str) -> dict:
+        """Return the identity for an IGN, or {"error": ...} if it could not be fetched"""
+        lookup = self._lookups.get(" ".join(ign.lower().split()))
+        if lookup is None:
+            lookup = self.prefetch(ign)
+        return await asyncio.shield(lookup)
+
+    async def _fetch(self, ign: str) -> dict:
+        async with self._semaphore:
+            # One more try for a plain failure: the first failures of an outage come before the breaker opens
+            retry = True
+            while True:
+                remaining = self._resume_by - asyncio.get_running_loop().time()
+                if not await charpage_guard.wait_until_available(max(0.0, remaining)):
+                    self.unavailable += 1
+                    return {"error": "AQ.com character pages are unavailable", "upstream_unavailable": True}
+                try:
+                    # Fetch current character data from AQ.com (name, guild and ccid only)
+                    return await fetch_identity(ign)
+                except RuntimeError as fetch_error:
+                    if charpage_guard.is_open or retry:
+                        # AQ.com may be failing as a whole, not this character: wait and retry
+                        retry = retry and charpage_guard.is_open
+                        self.retried += 1
+                        continue
+                    return {"error": str(fetch_error)}
 
-    # Get this guild's users
-    guild_data = all_data.get(guild_id_str, {})
+
+async def plan_verification_check(guild: discord.Guild, all_data: dict):
+    """
+    Collect the users a verification check has to look at in one guild
+    Returns (verified_role, [(user_id_str, user_data, member), ...]); the role is None if missing
+    """
+    guild_data = all_data.get(str(guild.id), {})
     verified_users = guild_data.get("users", {})
 
     # Get configured role name for this guild
-    role_name = get_verified_role_name(guild.id)
+    role_name = await get_verified_role_name(guild.id)
     verified_role = discord.utils.get(guild.roles, name=role_name)
 
     if not verified_role:
         logger.warning(f"Verified role '{role_name}' not found in guild {guild.name} - skipping verification check")
-        return results
-
-    logs_channel = await get_or_create_verification_logs_channel(guild)
-
-    # Track users to remove (can't modify dict during iteration)
-    users_to_remove = []
+        return None, []
 
+    targets = []
     for user_id_str, user_data in verified_users.items():
         user_id = int(user_id_str)
         member = guild.get_member(user_id)
@@ -476,8 +449,57 @@ async def run_verification_check(guild: discord.Guild) -> dict:
         if verified_role not in member.roles:
             continue
 
-        results["checked"] += 1
+        targets.append((user_id_str, user_data, member))
 
+    return verified_role, targets
+
+
+async def run_verification_check(guild: discord.Guild, lookup: Optional[VerificationLookup] = None,
+                                 batch: Optional[VerifiedUsersBatch] = None, plan: Optional[tuple] = None) -> dict:
+    """
+    Run verification check on all verified users
+    Returns dict with results: {checked, mismatches, errors, skipped, removed, duration, throughput}
+
+    The check runs as a two-stage pipeline: up to VERIFICATION_FETCH_CONCURRENCY
+    CharPage lookups are in flight at once, and their results are handed to a
+    single stage that applies the Discord side effects (role removal, DMs, log
+    posts) so slow sends never hold up fetching. Pass a shared lookup to reuse
+    CharPage results across guilds checked in the same run, and a shared batch
+    to write verified_users.json once for all of them (the caller flushes it).
+    Pass the (verified_role, targets) of plan_verification_check to check
+    exactly the users the caller planned (and prefetched) instead of
+    loading verified users again.
+    """
+    results = {
+        "checked": 0,
+        "mismatches": 0,
+        "errors": 0,
+        "skipped": 0,
+        "removed": 0,
+        "duration": 0.0,
+        "throughput": 0.0
+    }
+    started = perf_counter()
+
+    # Load per-server data unless the caller already planned this guild
+    if plan is None:
+        plan = await plan_verification_check(guild, await load_verified_users())
+    verified_role, targets = plan
+    if not verified_role:
+        return results
+
+    if lookup is None:
+        lookup = VerificationLookup()
+
+    owns_batch = batch is None
+    if owns_batch:
+        batch = VerifiedUsersBatch()
+
+    logs_channel = await get_or_create_verification_logs_channel(guild)
+
+    results["checked"] = len(targets)
+
+    async def apply_result(user_id_str, user_data, member, char_info):
         stored_ign = user_data.get("ign", "").strip().lower()
         stored_guild = user_data.get("guild")
         if stored_guild:
@@ -485,205 +507,292 @@ async def run_verification_check(guild: discord.Guild) -> dict:
 
         failed_checks = user_data.get("failed_checks", 0)
 
-        try:
-            # Fetch current character data from AQ.com
-            char_info = await get_character_info_async(stored_ign)
-
-            if not char_info or "error" in char_info:
-                # Network error - increment strike counter
-                failed_checks += 1
-                user_data["failed_checks"] = failed_checks
-                user_data["last_checked"] = datetime.now(timezone.utc).isoformat()
-                # Save updated user data
-                all_data[guild_id_str]["users"][user_id_str] = user_data
-                save_verified_users(all_data)
-                results["errors"] += 1
+        if char_info and char_info.get("upstream_unavailable"):
+            # AQ.com was down for the whole pause window: not the user's fault, no strike
+            results["skipped"] += 1
+            logger.warning(f"Skipped checking {member.name}: AQ.com unavailable (no strike recorded)")
+            return
 
-                if failed_checks == 1:
-                    # Strike 1: Just log it
-                    if logs_channel:
-                        await logs_channel.send(
-                            f"⚠️ **Network Error (Strike 1/3)**\n"
-                            f"User: {member.mention} ({member.name})\n"
-                            f"IGN: `{user_data.get('ign')}`\n"
-                            f"Error: Could not fetch character data\n"
-                            f"Action: None - will retry tomorrow"
-                        )
-                    logger.warning(f"Network error checking {member.name} (Strike 1)")
+        if not char_info or "error" in char_info:
+            # Network error - increment strike counter
+            failed_checks += 1
+            user_data["failed_checks"] = failed_checks
+            user_data["last_checked"] = datetime.now(timezone.utc).isoformat()
+            # Save updated user data
+            await batch.update(user_id_str, guild.id, user_data)
+            results["errors"] += 1
+
+            if failed_checks == 1:
+                # Strike 1: Just log it
+                if logs_channel:
+                    await logs_channel.send(
+                        f"⚠️ **Network Error (Strike 1/3)**\n"
+                        f"User: {member.mention} ({member.name})\n"
+                        f"IGN: `{user_data.get('ign')}`\n"
+                        f"Error: Could not fetch character data\n"
+                        f"Action: None - will retry tomorrow"
+                    )
+                logger.warning(f"Network error checking {member.name} (Strike 1)")
+
+            elif failed_checks == 2:
+                # Strike 2: Send warning DM
+                if logs_channel:
+                    await logs_channel.send(
+                        f"⚠️ **Network Error (Strike 2/3)**\n"
+                        f"User: {member.mention} ({member.name})\n"
+                        f"IGN: `{user_data.get('ign')}`\n"
+                        f"Error: Could not fetch character data\n"
+                        f"Action: Warning DM sent to user"
+                    )
+                try:
+                    await member.send(
+                        f"⚠️ **Verification Check Warning**\n\n"
+                        f"We've been unable to verify your character information for 2 consecutive days due to network errors.\n"
+                        f"IGN: `{user_data.get('ign')}`\n\n"
+                        f"If we cannot verify your information tomorrow, your 'Verified' role will be removed and you'll need to re-verify.\n\n"
+                        f"This is likely a temporary issue with the AQ.com character page. No action is needed from you."
+                    )
+                except:
+                    pass
+                logger.warning(f"Network error checking {member.name} (Strike 2) - Warning sent")
+
+            elif failed_checks >= 3:
+                # Strike 3: Remove role and delete from storage
+                try:
+                    await member.remove_roles(verified_role)
+                    await batch.remove(user_id_str, guild.id)
+                    results["removed"] += 1
 
-                elif failed_checks == 2:
-                    # Strike 2: Send warning DM
                     if logs_channel:
                         await logs_channel.send(
-                            f"⚠️ **Network Error (Strike 2/3)**\n"
+                            f"❌ **Verification Removed (Strike 3/3)**\n"
                             f"User: {member.mention} ({member.name})\n"
                             f"IGN: `{user_data.get('ign')}`\n"
-                            f"Error: Could not fetch character data\n"
-                            f"Action: Warning DM sent to user"
+                            f"Reason: 3 consecutive network errors\n"
+                            f"Action: Role removed, user must re-verify"
                         )
+
                     try:
                         await member.send(
-                            f"⚠️ **Verification Check Warning**\n\n"
-                            f"We've been unable to verify your character information for 2 consecutive days due to network errors.\n"
+                            f"❌ **Verification Removed**\n\n"
+                            f"Your 'Verified' role has been removed because we were unable to verify your character information for 3 consecutive days.\n"
                             f"IGN: `{user_data.get('ign')}`\n\n"
-                            f"If we cannot verify your information tomorrow, your 'Verified' role will be removed and you'll need to re-verify.\n\n"
-                            f"This is likely a temporary issue with the AQ.com character page. No action is needed from you."
+                            f"This was likely due to temporary network issues. You can re-verify using the verification embed in the server."
                         )
                     except:
                         pass
-                    logger.warning(f"Network error checking {member.name} (Strike 2) - Warning sent")
-
-                elif failed_checks >= 3:
-                    # Strike 3: Remove role and delete from storage
-                    try:
-                        await member.remove_roles(verified_role)
-                        users_to_remove.append(user_id_str)
-                        results["removed"] += 1
-
-                        if logs_channel:
-                            await logs_channel.send(
-                                f"❌ **Verification Removed (Strike 3/3)**\n"
-                                f"User: {member.mention} ({member.name})\n"
-                                f"IGN: `{user_data.get('ign')}`\n"
-                                f"Reason: 3 consecutive network errors\n"
-                                f"Action: Role removed, user must re-verify"
-                            )
-
-                        try:
-                            await member.send(
-                                f"❌ **Verification Removed**\n\n"
-                                f"Your 'Verified' role has been removed because we were unable to verify your character information for 3 consecutive days.\n"
-                                f"IGN: `{user_data.get('ign')}`\n\n"
-                                f"This was likely due to temporary network issues. You can re-verify using the verification embed in the server."
-                            )
-                        except:
-                            pass
-                        logger.info(f"Removed {member.name} after 3 network errors")
-                    except Exception as e:
-                        logger.error(f"Error removing role from {member.name}: {e}")
-
-                continue  # Skip to next user
+                    logger.info(f"Removed {member.name} after 3 network errors")
+                except Exception as e:
+                    logger.error(f"Error removing role from {member.name}: {e}")
 
-            # Successfully fetched data - check for mismatches
-            current_ign = char_info.get("name", "").strip().lower()
-            current_guild = char_info.get("guild")
-            if current_guild:
-                current_guild = current_guild.strip().lower()
-            current_ccid = char_info.get("ccid")
+            return
 
-            # Reset failed checks on successful fetch
-            user_data["failed_checks"] = 0
-            user_data["last_checked"] = datetime.now(timezone.utc).isoformat()
+        # Successfully fetched data - check for mismatches
+        current_ign = (char_info.get("name") or "").strip().lower()
+        current_guild = char_info.get("guild")
+        if current_guild:
+            current_guild = current_guild.strip().lower()
+        current_ccid = char_info.get("ccid")
+
+        # Reset failed checks on successful fetch
+        user_data["failed_checks"] = 0
+        user_data["last_checked"] = datetime.now(timezone.utc).isoformat()
+
+        # Store ccid if we don't have it yet (graceful migration)
+        stored_ccid = user_data.get("ccid")
+        if current_ccid and not stored_ccid:
+            user_data["ccid"] = current_ccid
+            stored_ccid = current_ccid
+
+        # Save updated user data
+        await batch.update(user_id_str, guild.id, user_data)
+
+        # Check if IGN, Guild, or CCID changed
+        ign_matches = current_ign == stored_ign
+        guild_matches = (current_guild == stored_guild) if stored_guild else True
+        ccid_matches = (current_ccid == stored_ccid) if (current_ccid and stored_ccid) else True
+
+        if not ign_matches or not guild_matches or not ccid_matches:
+            # Mismatch found - remove role immediately
+            results["mismatches"] += 1
+            results["removed"] += 1
+
+            mismatch_details = []
+            if not ign_matches:
+                mismatch_details.append(f"IGN changed: `{user_data.get('ign')}` → `{char_info.get('name')}`")
+            if not guild_matches:
+                mismatch_details.append(f"Guild changed: `{user_data.get('guild')}` → `{char_info.get('guild')}`")
+            if not ccid_matches:
+                mismatch_details.append(f"Character ID changed: `{stored_ccid}` → `{current_ccid}` (Account ownership may have changed)")
 
-            # Store ccid if we don't have it yet (graceful migration)
-            stored_ccid = user_data.get("ccid")
-            if current_ccid and not stored_ccid:
-                user_data["ccid"] = current_ccid
-                stored_ccid = current_ccid
+            try:
+                await member.remove_roles(verified_role)
+                await batch.remove(user_id_str, guild.id)
 
-            # Save updated user data
-            all_data[guild_id_str]["users"][user_id_str] = user_data
-            save_verified_users(all_data)
-
-            # Check if IGN, Guild, or CCID changed
-            ign_matches = current_ign == stored_ign
-            guild_matches = (current_guild == stored_guild) if stored_guild else True
-            ccid_matches = (current_ccid == stored_ccid) if (current_ccid and stored_ccid) else True
-
-            if not ign_matches or not guild_matches or not ccid_matches:
-                # Mismatch found - remove role immediately
-                results["mismatches"] += 1
-                results["removed"] += 1
-
-                mismatch_details = []
-                if not ign_matches:
-                    mismatch_details.append(f"IGN changed: `{user_data.get('ign')}` → `{char_info.get('name')}`")
-                if not guild_matches:
-                    mismatch_details.append(f"Guild changed: `{user_data.get('guild')}` → `{char_info.get('guild')}`")
-                if not ccid_matches:
-                    mismatch_details.append(f"Character ID changed: `{stored_ccid}` → `{current_ccid}` (Account ownership may have changed)")
+                if logs_channel:
+                    await logs_channel.send(
+                        f"❌ **Verification Mismatch Detected**\n"
+                        f"User: {member.mention} ({member.name})\n"
+                        + "\n".join(mismatch_details) +
+                        f"\nAction: Role removed, user must re-verify"
+                    )
 
                 try:
-                    await member.remove_roles(verified_role)
-                    users_to_remove.append(user_id_str)
+                    await member.send(
+                        f"❌ **Verification Status Changed**\n\n"
+                        f"Your 'Verified' role has been removed because your character information has changed:\n"
+                        + "\n".join(mismatch_details) +
+                        f"\n\nIf you'd like to verify with your new information, please use the verification embed in the server."
+                    )
+                except:
+                    pass
+                logger.info(f"Removed {member.name} due to data mismatch")
+            except Exception as e:
+                logger.error(f"Error removing role from {member.name}: {e}")
 
-                    if logs_channel:
-                        await logs_channel.send(
-                            f"❌ **Verification Mismatch Detected**\n"
-                            f"User: {member.mention} ({member.name})\n"
-                            + "\n".join(mismatch_details) +
-                            f"\nAction: Role removed, user must re-verify"
-                        )
+    # Stage 1: bounded-concurrency CharPage fetches
+    pending = iter(targets)
+    # Unbounded: results are small, and a slow Discord stage must not stall the fetch workers
+    fetched: asyncio.Queue = asyncio.Queue()
 
-                    try:
-                        await member.send(
-                            f"❌ **Verification Status Changed**\n\n"
-                            f"Your 'Verified' role has been removed because your character information has changed:\n"
-                            + "\n".join(mismatch_details) +
-                            f"\n\nIf you'd like to verify with your new information, please use the verification embed in the server."
-                        )
-                    except:
-                        pass
-                    logger.info(f"Removed {member.name} due to data mismatch")
-                except Exception as e:
-                    logger.error(f"Error removing role from {member.name}: {e}")
+    async def fetch_worker():
+        for user_id_str, user_data, member in pending:
+            try:
+                char_info = await lookup.get(user_data.get("ign", ""))
+            except Exception as e:
+                logger.error(f"Error checking user {user_id_str}: {e}")
+                results["errors"] += 1
+                continue
+            await fetched.put((user_id_str, user_data, member, char_info))
 
-        except Exception as e:
-            logger.error(f"Error checking user {user_id_str}: {e}")
-            results["errors"] += 1
+    # Stage 2: Discord side effects, one result at a time
+    async def action_worker():
+        while True:
+            item = await fetched.get()
+            if item is None:
+                return
+            try:
+                await apply_result(*item)
+            except Exception as e:
+                logger.error(f"Error checking user {item[0]}: {e}")
+                results["errors"] += 1
 
-    # Remove users from storage
-    for user_id_str in users_to_remove:
-        remove_verified_user(user_id_str, guild.id)
+    try:
+        actions = asyncio.create_task(action_worker())
+        try:
+            workers = min(VERIFICATION_FETCH_CONCURRENCY, len(targets))
+            await asyncio.gather(*(fetch_worker() for _ in range(workers)))
+        finally:
+            await fetched.put(None)
+            await actions
+    finally:
+        # Write updated and removed users in one atomic save, also when the run
+        # fails or is cancelled (roles already removed must not come back)
+        if owns_batch:
+            await batch.flush()
+            logger.info(
+                f"Saved verification results for {guild.name}: "
+                f"{batch.flushes} flushes, {batch.bytes_written} bytes written"
+            )
 
     # Update config for this guild
-    update_guild_verification_config(guild.id, {
+    config = await get_guild_verification_config(guild.id)
+    await update_guild_verification_config(guild.id, {
         "last_check_time": datetime.now(timezone.utc).isoformat(),
-        "total_checks_run": get_guild_verification_config(guild.id).get("total_checks_run", 0) + 1,
-        "users_removed_total": get_guild_verification_config(guild.id).get("users_removed_total", 0) + results["removed"]
+        "total_checks_run": config.get("total_checks_run", 0) + 1,
+        "users_removed_total": config.get("users_removed_total", 0) + results["removed"]
     })
 
+    results["duration"] = perf_counter() - started
+    if results["duration"] > 0:
+        results["throughput"] = results["checked"] / results["duration"]
+
     return results
 
+async def run_daily_check_for_guild(guild: discord.Guild, lookup: VerificationLookup, batch: VerifiedUsersBatch,
+                                   plan: tuple):
+    """Run the daily check for one guild (as planned) and post the summary to #verification-logs"""
+    try:
+        results = await run_verification_check(guild, lookup, batch, plan)
+        logger.info(
+            f"Verification check complete for {guild.name}: "
+            f"Checked {results['checked']}, "
+            f"Mismatches {results['mismatches']}, "
+            f"Errors {results['errors']}, "
+            f"Skipped {results['skipped']}, "
+            f"Removed {results['removed']} "
+            f"in {results['duration']:.1f}s ({results['throughput']:.1f} users/s)"
+        )
+
+        # Send summary to logs channel
+        logs_channel = await get_or_create_verification_logs_channel(guild)
+        if logs_channel and results['checked'] > 0:
+            await logs_channel.send(
+                f"✅ **Daily Verification Check Complete**\n"
+                f"Users Checked: {results['checked']}\n"
+                f"Mismatches Found: {results['mismatches']}\n"
+                f"Network Errors: {results['errors']}\n"
+                f"Skipped (AQ.com unavailable, no strike): {results['skipped']}\n"
+                f"Roles Removed: {results['removed']}\n"
+                f"Duration: {results['duration']:.1f}s ({results['throughput']:.1f} users/s)"
+            )
+    except Exception as e:
+        logger.error(f"Error running verification check for {guild.name}: {e}")
+
+
 @tasks.loop(time=time(hour=0, minute=0, tzinfo=timezone.utc))
 async def daily_verification_check():
-    """Daily task that runs at 12:00 AM UTC to check all verified users"""
-    try:
-        logger.info("Starting daily verification check...")
+    """
+    Daily task that runs at 12:00 AM UTC to check all verified users
 
-        # Run checks for all guilds the bot is in
-        for guild in bot.guilds:
-            try:
+    Its CharPage fetches are background work: interactive lookups (/char,
+    the verification modal, /wiki) are always served first.
+    """
+    with fetch_priority(BACKGROUND):
+        try:
+            logger.info("Starting daily verification check...")
+
+            # Planning phase: collect every (guild, user, IGN) to check across all guilds
+            guilds = []
+            all_data = await load_verified_users()
+            lookup = VerificationLookup()
+            total_targets = 0
+            for guild in bot.guilds:
                 # Check if daily checks are enabled for this specific guild
-                if not is_daily_check_enabled_for_guild(guild.id):
+                if not await is_daily_check_enabled_for_guild(guild.id):
                     logger.info(f"Daily verification check is disabled for {guild.name} - skipping")
                     continue
 
-                results = await run_verification_check(guild)
-                logger.info(
-                    f"Verification check complete for {guild.name}: "
-                    f"Checked {results['checked']}, "
-                    f"Mismatches {results['mismatches']}, "
-                    f"Errors {results['errors']}, "
-                    f"Removed {results['removed']}"
-                )
-
-                # Send summary to logs channel
-                logs_channel = await get_or_create_verification_logs_channel(guild)
-                if logs_channel and results['checked'] > 0:
-                    await logs_channel.send(
-                        f"✅ **Daily Verification Check Complete**\n"
-                        f"Users Checked: {results['checked']}\n"
-                        f"Mismatches Found: {results['mismatches']}\n"
-                        f"Network Errors: {results['errors']}\n"
-                        f"Roles Removed: {results['removed']}"
-                    )
-            except Exception as e:
-                logger.error(f"Error running verification check for {guild.name}: {e}")
+                plan = await plan_verification_check(guild, all_data)
+                guilds.append((guild, plan))
+                targets = plan[1]
+                total_targets += len(targets)
+                # Start fetching each distinct IGN once; guilds sharing an IGN reuse the result
+                for _, user_data, _ in targets:
+                    lookup.prefetch(user_data.get("ign", ""))
+
+            logger.info(
+                f"Planned daily verification check: {total_targets} users across {len(guilds)} guilds, "
+                f"{lookup.fetched} distinct IGNs"
+            )
 
-        logger.info("Daily verification check completed for all guilds")
-    except Exception as e:
-        logger.error(f"Error in daily verification check task: {e}")
+            # Run checks for all guilds concurrently, writing verified_users.json once for all of them
+            batch = VerifiedUsersBatch()
+            try:
+                await asyncio.gather(*(run_daily_check_for_guild(guild, lookup, batch, plan) for guild, plan in guilds))
+            finally:
+                await batch.flush()
+            logger.info(f"Verified users saved: {batch.flushes} flushes, {batch.bytes_written} bytes written")
+            logger.info(f"Storage write latency: {write_stats.snapshot()}")
+
+            logger.info("Daily verification check completed for all guilds")
+            logger.info(f"CharPage lookups: {lookup.fetched} fetched, {lookup.shared} reused for duplicate IGNs, "
+                        f"{lookup.retried} retried after an AQ.com outage, {lookup.unavailable} skipped (AQ.com unavailable)")
+            logger.info(f"Upstream rate limits: {guard_stats()}")
+            logger.info(f"CharPage queue wait by class: {charpage_guard.scheduler.stats()}")
+            logger.info(f"CharPage cache stats: {charpage_cache.stats()}")
+        except Exception as e:
+            logger.error(f"Error in daily verification check task: {e}")
 
 @daily_verification_check.before_loop
 async def before_daily_verification_check():
@@ -692,15 +801,29 @@ async def before_daily_verification_check():
     logger.info("Daily verification check task initialized")
 
 
-def get_user_stats(user_id, guild_id):
+# Last readiness reported by the character data service (None until first probed)
+char_data_ready = None
+
+
+@tasks.loop(seconds=CHAR_DATA_HEALTH_INTERVAL)
+async def char_data_health_check():
+    """Probe the character data service and log when it becomes ready or stops being ready"""
+    global char_data_ready
+    health = await get_client().health()
+    ready = bool(health.get("ready"))
+    if ready != char_data_ready:
+        if ready:
+            logger.info(f"✓ Character data service is ready (PID {health.get('pid', '?')})")
+        else:
+            reasons = ", ".join(health.get("reasons") or []) or "unknown"
+            logger.warning(f"⚠️ Character data service is not ready: {reasons}")
+    char_data_ready = ready
+
+
+async def get_user_stats(user_id, guild_id):
     """Get user statistics (per-server)"""
-    points_data = load_points()
     user_id_str = str(user_id)
-    guild_id_str = str(guild_id)
-
-    # Get guild data
-    guild_data = points_data.get(guild_id_str, {})
-    guild_users = guild_data.get("users", {})
+    guild_users = await storage.guild_points(guild_id)
 
     if user_id_str not in guild_users:
         return {
@@ -770,16 +893,17 @@ BOT_STATUS_TYPE = os.getenv("BOT_STATUS_TYPE", "listening").lower()
 # Custom bot class to cleanup resources on shutdown
 class VerificationBot(commands.Bot):
     async def close(self):
-        global http_session
-        if http_session is not None:
-            await http_session.close()
-            http_session = None
-            logger.info("✓ Closed aiohttp session")
+        logger.info(f"Upstream HTTP client stats: {http_client_stats()}")
+        await close_http_clients()
+        logger.info("✓ Closed upstream HTTP clients")
+        logger.info(f"Character data pool stats: {get_client().stats()}")
+        await close_clients()
+        await storage.close()
+        logger.info(f"✓ Closed {storage.name} storage (write latency: {write_stats.snapshot()})")
         await super().close()
 
 
 bot = VerificationBot(command_prefix="!", intents=intents)
-http_session = None
 
 
 class FinishVerificationView(ui.View):
@@ -803,7 +927,7 @@ class FinishVerificationView(ui.View):
                 return
 
             # Check if configured verified role exists
-            role_name = get_verified_role_name(interaction.guild.id)
+            role_name = await get_verified_role_name(interaction.guild.id)
             verified_role = discord.utils.get(interaction.guild.roles, name=role_name)
             if not verified_role:
                 await interaction.response.send_message(
@@ -845,7 +969,7 @@ class FinishVerificationView(ui.View):
             if nickname_changed or role_assigned:
                 # Save user to verified_users.json with the correct guild_id
                 guild_id = self.guild_id if self.guild_id else interaction.guild.id
-                add_verified_user(self.user.id, self.ign, self.guild if self.guild else None, self.ccid, guild_id)
+                await add_verified_user(self.user.id, self.ign, self.guild if self.guild else None, self.ccid, guild_id)
 
                 success_msg = f"✅ Verification complete!\n"
                 if nickname_changed:
@@ -948,11 +1072,7 @@ class VerificationModal(ui.Modal, title="Character Verification"):
 
             char_id = user_ign
 
-            if http_session is None:
-                await interaction.followup.send("❌ Bot is still starting up. Please try again in a moment.", ephemeral=True)
-                return
-
-            info = await get_character_info_async(char_id, http_session)
+            info = await fetch_identity(char_id)
 
             page_name = info.get("name", "").strip() if info.get("name") else ""
             page_guild = info.get("guild", "").strip() if info.get("guild") else ""
@@ -983,7 +1103,7 @@ class VerificationModal(ui.Modal, title="Character Verification"):
             embed.add_field(name="User", value=f"{interaction.user.mention} ({interaction.user.name})", inline=False)
 
             # Check if this is a re-verification
-            existing_data = get_verified_user(interaction.user.id, interaction.guild.id)
+            existing_data = await get_verified_user(interaction.user.id, interaction.guild.id)
             if existing_data:
                 reverif_msg = f"User was previously verified with:\nIGN: `{existing_data.get('ign')}`\nGuild: `{existing_data.get('guild') or '(none)'}`"
                 if existing_data.get('ccid'):
@@ -1534,14 +1654,7 @@ async def create_wiki_embed(wiki_data):
 
 @bot.event
 async def on_ready():
-    global http_session
     try:
-        if http_session is None:
-            http_session = aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=10),
-                connector=aiohttp.TCPConnector(limit=10, ttl_dns_cache=300)
-            )
-
         guild_ids_env = os.getenv("GUILD_IDS")
         if guild_ids_env:
             guild_ids = [gid.strip() for gid in guild_ids_env.split(',') if gid.strip()]
@@ -1604,6 +1717,9 @@ async def on_ready():
             daily_verification_check.start()
             logger.info("✓ Daily verification check task started")
 
+        if not char_data_health_check.is_running():
+            char_data_health_check.start()
+
     except Exception as e:
         logger.error(f"Error in on_ready: {e}", exc_info=True)
 
@@ -1631,7 +1747,7 @@ async def deployverification(interaction: discord.Interaction, channel: discord.
         logs_channel = await get_or_create_verification_logs_channel(interaction.guild)
 
         # Check if configured verified role exists and warn admin if not
-        role_name = get_verified_role_name(interaction.guild.id)
+        role_name = await get_verified_role_name(interaction.guild.id)
         verified_role = discord.utils.get(interaction.guild.roles, name=role_name)
 
         response_msg = f"✅ Verification embed deployed to {channel.mention}"
@@ -1655,7 +1771,7 @@ async def setverifiedrole(interaction: discord.Interaction, role_name: str):
     """Set the verified role name for this server (Admin only)"""
     try:
         # Set the role name in config
-        set_verified_role_name(interaction.guild.id, role_name)
+        await set_verified_role_name(interaction.guild.id, role_name)
 
         # Check if the role exists and provide appropriate feedback
         role = discord.utils.get(interaction.guild.roles, name=role_name)
@@ -1686,28 +1802,28 @@ async def verificationcheck(interaction: discord.Interaction, action: Literal["e
     guild_id = interaction.guild.id
 
     if action == "enable":
-        update_guild_verification_config(guild_id, {"daily_check_enabled": True})
+        await update_guild_verification_config(guild_id, {"daily_check_enabled": True})
         await interaction.response.send_message(
             f"✅ Daily verification checks have been **enabled** for **{interaction.guild.name}**.",
             ephemeral=True
         )
 
     elif action == "disable":
-        update_guild_verification_config(guild_id, {"daily_check_enabled": False})
+        await update_guild_verification_config(guild_id, {"daily_check_enabled": False})
         await interaction.response.send_message(
             f"⚠️ Daily verification checks have been **disabled** for **{interaction.guild.name}**.",
             ephemeral=True
         )
 
     elif action == "status":
-        config = get_guild_verification_config(guild_id)
+        config = await get_guild_verification_config(guild_id)
         status = "✅ Enabled" if config.get("daily_check_enabled", True) else "❌ Disabled"
         last_check = config.get("last_check_time", "Never")
         total_checks = config.get("total_checks_run", 0)
         users_removed = config.get("users_removed_total", 0)
 
         # Get verified user count for this specific guild
-        all_data = load_verified_users()
+        all_data = await load_verified_users()
         guild_id_str = str(guild_id)
         guild_data = all_data.get(guild_id_str, {})
         verified_users = guild_data.get("users", {})
@@ -1729,7 +1845,10 @@ async def verificationcheck(interaction: discord.Interaction, action: Literal["e
         await interaction.response.defer(ephemeral=True)
         try:
             # Import the run_verification_check function that we'll create next
-            results = await run_verification_check(interaction.guild)
+            # Don't hold the interaction for long if AQ.com is down: skip instead of pausing for an hour.
+            # The sweep is background work, like the daily check.
+            with fetch_priority(BACKGROUND):
+                results = await run_verification_check(interaction.guild, VerificationLookup(pause_limit=60))
 
             embed = discord.Embed(
                 title="✅ Verification Check Complete",
@@ -1738,7 +1857,10 @@ async def verificationcheck(interaction: discord.Interaction, action: Literal["e
             embed.add_field(name="Users Checked", value=str(results["checked"]), inline=True)
             embed.add_field(name="Mismatches Found", value=str(results["mismatches"]), inline=True)
             embed.add_field(name="Network Errors", value=str(results["errors"]), inline=True)
+            if results["skipped"]:
+                embed.add_field(name="Skipped (AQ.com down)", value=str(results["skipped"]), inline=True)
             embed.add_field(name="Roles Removed", value=str(results["removed"]), inline=True)
+            embed.add_field(name="Duration", value=f"{results['duration']:.1f}s ({results['throughput']:.1f} users/s)", inline=True)
 
             await interaction.followup.send(embed=embed, ephemeral=True)
         except Exception as e:
@@ -2728,7 +2850,7 @@ class ReplacementBossesView(ui.View):
             left_points = sum(BOSS_POINTS.get(boss, 0) for boss in bosses_covered_by_left)
 
             if left_points > 0 or len(bosses_covered_by_left) > 0:
-                new_total = add_points(left_id, left_points, list(bosses_covered_by_left), interaction.guild.id)
+                new_total = await add_points(left_id, left_points, list(bosses_covered_by_left), interaction.guild.id)
                 people_who_left[left_id] = {
                     'mention': left_mention,
                     'bosses_covered': list(bosses_covered_by_left),
@@ -2756,12 +2878,12 @@ class ReplacementBossesView(ui.View):
                 reward_info = replacement_rewards[helper_id]
                 points = reward_info['points']
                 bosses = list(reward_info['bosses'])
-                new_total = add_points(helper_id, points, bosses, interaction.guild.id)
+                new_total = await add_points(helper_id, points, bosses, interaction.guild.id)
                 helper_rewards.append(f"{helper_mention}: +{points} points (Total: {new_total})")
             else:
                 # This helper was NOT a replacement - award ALL bosses
                 total_points = sum(BOSS_POINTS.get(boss, 0) for boss in all_bosses)
-                new_total = add_points(helper_id, total_points, list(all_bosses), interaction.guild.id)
+                new_total = await add_points(helper_id, total_points, list(all_bosses), interaction.guild.id)
                 helper_rewards.append(f"{helper_mention}: +{total_points} points (Total: {new_total})")
 
         # Add people who left to helper rewards
@@ -2895,7 +3017,7 @@ class HelperView(ui.View):
                 unfilled_replacement['replacement_mention'] = user_mention
 
             # Track ticket join
-            track_ticket_join(user_id, interaction.guild.id)
+            await track_ticket_join(user_id, interaction.guild.id)
 
             # Update the button label to show count
             for item in self.children:
@@ -3044,7 +3166,7 @@ class HelperView(ui.View):
             # Award points to all helpers
             helper_rewards = []
             for helper_id, helper_mention in self.helpers:
-                new_total = add_points(helper_id, total_points, self.selected_bosses, interaction.guild.id)
+                new_total = await add_points(helper_id, total_points, self.selected_bosses, interaction.guild.id)
                 helper_rewards.append(f"{helper_mention}: +{total_points} points (Total: {new_total})")
 
             # Mark ticket as completed
@@ -3233,7 +3355,7 @@ class UltraWeekliesModal(ui.Modal, title="UltraWeeklies Request"):
             helper_view = HelperView(requester_id=interaction.user.id, selected_bosses=self.selected_bosses)
 
             # Track ticket creation
-            track_ticket_created(interaction.user.id, "UltraWeeklies", interaction.guild.id)
+            await track_ticket_created(interaction.user.id, "UltraWeeklies", interaction.guild.id)
 
             # Send embed to the new channel with helper button
             await new_channel.send(embed=embed, view=helper_view)
@@ -3618,7 +3740,7 @@ class UltraDailiesModal(ui.Modal, title="UltraDailies 4-Man Request"):
             helper_view = DailiesHelperView(requester_id=interaction.user.id, selected_bosses=self.selected_bosses)
 
             # Track ticket creation
-            track_ticket_created(interaction.user.id, "UltraDailies4Man", interaction.guild.id)
+            await track_ticket_created(interaction.user.id, "UltraDailies4Man", interaction.guild.id)
 
             # Send embed to the new channel with helper button
             await new_channel.send(embed=embed, view=helper_view)
@@ -3704,7 +3826,7 @@ class DailiesHelperView(ui.View):
                 unfilled_replacement['replacement_mention'] = user_mention
 
             # Track ticket join
-            track_ticket_join(user_id, interaction.guild.id)
+            await track_ticket_join(user_id, interaction.guild.id)
 
             # Update the button label to show count
             for item in self.children:
@@ -3853,7 +3975,7 @@ class DailiesHelperView(ui.View):
             # Award points to all helpers
             helper_rewards = []
             for helper_id, helper_mention in self.helpers:
-                new_total = add_points(helper_id, total_points, self.selected_bosses, interaction.guild.id)
+                new_total = await add_points(helper_id, total_points, self.selected_bosses, interaction.guild.id)
                 helper_rewards.append(f"{helper_mention}: +{total_points} points (Total: {new_total})")
 
             # Mark ticket as completed
@@ -4147,7 +4269,7 @@ class Ultra7ManModal(ui.Modal, title="UltraDailies 7-Man Request"):
             helper_view = SevenManHelperView(requester_id=interaction.user.id, selected_bosses=self.selected_bosses)
 
             # Track ticket creation
-            track_ticket_created(interaction.user.id, "UltraDailies7Man", interaction.guild.id)
+            await track_ticket_created(interaction.user.id, "UltraDailies7Man", interaction.guild.id)
 
             # Send embed to the new channel with helper button
             await new_channel.send(embed=embed, view=helper_view)
@@ -4233,7 +4355,7 @@ class SevenManHelperView(ui.View):
                 unfilled_replacement['replacement_mention'] = user_mention
 
             # Track ticket join
-            track_ticket_join(user_id, interaction.guild.id)
+            await track_ticket_join(user_id, interaction.guild.id)
 
             # Update the button label to show count
             for item in self.children:
@@ -4382,7 +4504,7 @@ class SevenManHelperView(ui.View):
             # Award points to all helpers
             helper_rewards = []
             for helper_id, helper_mention in self.helpers:
-                new_total = add_points(helper_id, total_points, self.selected_bosses, interaction.guild.id)
+                new_total = await add_points(helper_id, total_points, self.selected_bosses, interaction.guild.id)
                 helper_rewards.append(f"{helper_mention}: +{total_points} points (Total: {new_total})")
 
             # Mark ticket as completed
@@ -4811,7 +4933,7 @@ class TempleShrineDailiesModal(ui.Modal, title="TempleShrine Dailies Request"):
             )
 
             # Track ticket creation
-            track_ticket_created(interaction.user.id, "TempleShrineDailies", interaction.guild.id)
+            await track_ticket_created(interaction.user.id, "TempleShrineDailies", interaction.guild.id)
 
             await new_channel.send(embed=embed, view=helper_view)
 
@@ -4937,7 +5059,7 @@ class TempleShrineSpammingModal(ui.Modal, title="TempleShrine Spamming Request")
             )
 
             # Track ticket creation
-            track_ticket_created(interaction.user.id, "TempleShrineSpamming", interaction.guild.id)
+            await track_ticket_created(interaction.user.id, "TempleShrineSpamming", interaction.guild.id)
 
             await new_channel.send(embed=embed, view=helper_view)
 
@@ -5011,7 +5133,7 @@ class TempleShrineHelperView(ui.View):
                 unfilled_replacement['replacement_id'] = user_id
                 unfilled_replacement['replacement_mention'] = user_mention
 
-            track_ticket_join(user_id, interaction.guild.id)
+            await track_ticket_join(user_id, interaction.guild.id)
 
             # Update the button label to show count
             for item in self.children:
@@ -5158,7 +5280,7 @@ class TempleShrineHelperView(ui.View):
 
                 helper_rewards = []
                 for helper_id, helper_mention in self.helpers:
-                    new_total = add_points(helper_id, total_points, boss_names, interaction.guild.id)
+                    new_total = await add_points(helper_id, total_points, boss_names, interaction.guild.id)
                     helper_rewards.append(f"{helper_mention}: +{total_points} points (Total: {new_total})")
 
                 self.ticket_completed = True
@@ -5293,7 +5415,7 @@ class RemoveHelperSpammingModal(ui.Modal, title="Remove Helper - Spamming"):
                         # Add boss names for tracking
                         boss_names.extend([boss_key] * kills)
 
-                add_points(helper_to_remove[0], total_points, boss_names, interaction.guild.id)
+                await add_points(helper_to_remove[0], total_points, boss_names, interaction.guild.id)
 
             # Remove helper from list
             self.helper_view.helpers.remove(helper_to_remove)
@@ -5404,7 +5526,7 @@ class RemoveHelperDailiesView(ui.View):
                     boss_names.append(boss_key)
 
                 if boss_names:
-                    add_points(helper_to_remove[0], points, boss_names, interaction.guild.id)
+                    await add_points(helper_to_remove[0], points, boss_names, interaction.guild.id)
 
             # Remove helper from list
             self.helper_view.helpers.remove(helper_to_remove)
@@ -5507,7 +5629,7 @@ class CompleteSpammingModal(ui.Modal, title="Complete Spamming Ticket"):
 
             helper_rewards = []
             for helper_id, helper_mention in self.helper_view.helpers:
-                new_total = add_points(helper_id, total_points, boss_names, interaction.guild.id)
+                new_total = await add_points(helper_id, total_points, boss_names, interaction.guild.id)
                 helper_rewards.append(f"{helper_mention}: +{total_points} points (Total: {new_total})")
 
             self.helper_view.ticket_completed = True
@@ -5719,7 +5841,7 @@ class ReplacementSidesView(ui.View):
             left_points = sum(BOSS_POINTS.get(side, 0) for side in sides_covered_by_left)
 
             if left_points > 0 or len(sides_covered_by_left) > 0:
-                new_total = add_points(left_id, left_points, list(sides_covered_by_left), interaction.guild.id)
+                new_total = await add_points(left_id, left_points, list(sides_covered_by_left), interaction.guild.id)
                 people_who_left[left_id] = {
                     'mention': left_mention,
                     'sides_covered': list(sides_covered_by_left),
@@ -5746,12 +5868,12 @@ class ReplacementSidesView(ui.View):
                 reward_info = replacement_rewards[helper_id]
                 points = reward_info['points']
                 sides = list(reward_info['sides'])
-                new_total = add_points(helper_id, points, sides, interaction.guild.id)
+                new_total = await add_points(helper_id, points, sides, interaction.guild.id)
                 helper_rewards.append(f"{helper_mention}: +{points} points (Total: {new_total})")
             else:
                 # This helper was NOT a replacement - award ALL sides
                 total_points = sum(BOSS_POINTS.get(side, 0) for side in all_sides)
-                new_total = add_points(helper_id, total_points, list(all_sides), interaction.guild.id)
+                new_total = await add_points(helper_id, total_points, list(all_sides), interaction.guild.id)
                 helper_rewards.append(f"{helper_mention}: +{total_points} points (Total: {new_total})")
 
         # Add people who left to helper rewards
@@ -6094,7 +6216,7 @@ class CompleteTotalKillCountModal(ui.Modal, title="Total Kill Counts"):
                     boss_names.extend([boss_key] * kills)
 
             if left_points > 0:
-                new_total = add_points(left_id, left_points, boss_names, interaction.guild.id)
+                new_total = await add_points(left_id, left_points, boss_names, interaction.guild.id)
                 people_who_left[left_id] = {
                     'mention': left_mention,
                     'kills': kills_by_left,
@@ -6134,7 +6256,7 @@ class CompleteTotalKillCountModal(ui.Modal, title="Total Kill Counts"):
                 reward_info = replacement_rewards[helper_id]
                 points = reward_info['points']
                 boss_names = reward_info['boss_names']
-                new_total = add_points(helper_id, points, boss_names, interaction.guild.id)
+                new_total = await add_points(helper_id, points, boss_names, interaction.guild.id)
                 helper_rewards.append(f"{helper_mention}: +{points} points (Total: {new_total})")
             else:
                 # This helper was NOT a replacement - award ALL kills
@@ -6148,7 +6270,7 @@ class CompleteTotalKillCountModal(ui.Modal, title="Total Kill Counts"):
                         total_points += side_points
                         all_boss_names.extend([boss_key] * kills)
 
-                new_total = add_points(helper_id, total_points, all_boss_names, interaction.guild.id)
+                new_total = await add_points(helper_id, total_points, all_boss_names, interaction.guild.id)
                 helper_rewards.append(f"{helper_mention}: +{total_points} points (Total: {new_total})")
 
         # Add people who left to helper rewards
@@ -6428,12 +6550,8 @@ async def wiki(interaction: discord.Interaction, query: str):
 async def leaderboard_command(interaction: discord.Interaction):
     """View the top helpers leaderboard for this server"""
     try:
-        all_points_data = load_points()
-
         # Get this guild's data
-        guild_id_str = str(interaction.guild.id)
-        guild_data = all_points_data.get(guild_id_str, {})
-        points_data = guild_data.get("users", {})
+        points_data = await storage.guild_points(interaction.guild.id)
 
         if not points_data:
             await interaction.response.send_message("No helper data yet! Be the first to help with tickets.", ephemeral=True)
@@ -6513,10 +6631,7 @@ async def leaderboard_command(interaction: discord.Interaction):
             )
 
         # Add Top Requesters section (per-server)
-        all_requester_data = load_requester_stats()
-        guild_id_str = str(interaction.guild.id)
-        guild_requester_data = all_requester_data.get(guild_id_str, {})
-        requester_data = guild_requester_data.get("users", {})
+        requester_data = await storage.guild_requester_stats(interaction.guild.id)
 
         if requester_data:
             # Build list of (user_id, tickets_created)
@@ -6583,18 +6698,8 @@ async def resetleaderboard_command(interaction: discord.Interaction):
                     await button_interaction.response.send_message("Only the command user can confirm.", ephemeral=True)
                     return
 
-                # Reset helper points for THIS server only
-                all_points_data = load_points()
-                guild_id_str = str(interaction.guild.id)
-                if guild_id_str in all_points_data:
-                    all_points_data[guild_id_str] = {"users": {}}
-                    save_points(all_points_data)
-
-                # Reset requester stats for THIS server only
-                all_requester_data = load_requester_stats()
-                if guild_id_str in all_requester_data:
-                    all_requester_data[guild_id_str] = {"users": {}}
-                    save_requester_stats(all_requester_data)
+                # Reset helper points and requester stats for THIS server only
+                await storage.reset_leaderboard(interaction.guild.id)
 
                 self.confirmed = True
                 self.stop()
@@ -6636,7 +6741,7 @@ async def myscore_command(interaction: discord.Interaction):
     """View your helper score and statistics for this server"""
     try:
         user_id = interaction.user.id
-        stats = get_user_stats(user_id, interaction.guild.id)
+        stats = await get_user_stats(user_id, interaction.guild.id)
 
         total_points = stats["total_points"]
         bosses = stats["bosses"]
@@ -1,27 +1,81 @@
+import argparse
 import asyncio
 import httpx
 import json
+import math
 import os
-import re
-from urllib.parse import parse_qs, unquote
+import signal
+import socket
+import stat
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from char_protocol import (
+    FORMAT_NEGOTIATION_VERSION, PREAMBLE_SIZE, PROTOCOL_VERSION, FrameReader, ProtocolError,
+    choose_format, encode_frame, is_framed, parse_preamble, preamble,
+)
+from admission import AdmissionControl, ServiceBusy
+from charpage_cache import TTLCache, normalize_ign
+from flashvars import decode_flashvars, find_flashvars
+from http_clients import close_http_clients, get_http_client, http_client_stats
+from metrics import LoopLagMonitor, Registry, start_http_server
+from fetch_scheduler import BACKGROUND, INTERACTIVE, PRIORITIES, fetch_priority
+from supervisor import Supervisor
+from upstream_guard import STATE_VALUES, CircuitOpen, guard_stats
+from dotenv import load_dotenv
+
+# Same .env as the bot, so both sides agree on CHAR_DATA_HOST/PORT/SOCKET
+load_dotenv()
 
 HOST = os.environ.get("CHAR_DATA_HOST", "127.0.0.1")
 PORT = int(os.environ.get("CHAR_DATA_PORT", "4568"))
+# Optional Unix domain socket served next to TCP, for a bot on the same host
+SOCKET_PATH = os.environ.get("CHAR_DATA_SOCKET") or None
+
+# Prometheus metrics and health probes on a side port (0 disables; worker N of a
+# multi-worker service uses port + N). Not ready while the event loop lags more than this.
+METRICS_HOST = os.environ.get("CHAR_DATA_METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.environ.get("CHAR_DATA_METRICS_PORT", "4569"))
+READY_MAX_LAG = float(os.environ.get("CHAR_DATA_READY_MAX_LAG", "1.0"))
+
+# Worker processes sharing the port (1 = single process), and how often workers report stats
+WORKERS = max(1, int(os.environ.get("CHAR_DATA_WORKERS", "1")))
+STATS_INTERVAL = float(os.environ.get("CHAR_DATA_STATS_INTERVAL", "5"))
+
+# Lookup results are cached per IGN; "does not exist" answers get their own, shorter-lived cache
+RESULT_CACHE_TTL = float(os.environ.get("CHAR_DATA_CACHE_TTL", "60"))
+RESULT_CACHE_SIZE = int(os.environ.get("CHAR_DATA_CACHE_SIZE", "1024"))
+NEGATIVE_CACHE_TTL = float(os.environ.get("CHAR_DATA_NEGATIVE_TTL", "15"))
+NEGATIVE_CACHE_SIZE = int(os.environ.get("CHAR_DATA_NEGATIVE_CACHE_SIZE", "1024"))
+
+# Upper bound on one CharPage fetch (connect + response), whatever the client's deadline
+UPSTREAM_TIMEOUT = float(os.environ.get("CHAR_DATA_UPSTREAM_TIMEOUT", "10"))
+
+# Admission control: upstream fetches at once, fetches allowed to queue, smallest retry hint
+MAX_CONCURRENCY = max(1, int(os.environ.get("CHAR_DATA_MAX_CONCURRENCY", "16")))
+MAX_QUEUE = max(0, int(os.environ.get("CHAR_DATA_MAX_QUEUE", "64")))
+RETRY_AFTER_MS = int(os.environ.get("CHAR_DATA_RETRY_AFTER_MS", "250"))
+
+# Batch requests: CharPage fetches in flight per batch, and the largest accepted batch
+BATCH_CONCURRENCY = max(1, int(os.environ.get("CHAR_DATA_BATCH_CONCURRENCY", "8")))
+BATCH_MAX_NAMES = int(os.environ.get("CHAR_DATA_BATCH_MAX_NAMES", "1000"))
 
 
 def _extract(parsed_vars: dict, key: str, default: str = "N/A") -> str:
     """
     Helper to safely fetch a single FlashVars value.
 
-    FlashVars are returned as lists and sometimes include placeholders like
-    "none". Treat empty strings and placeholder values as missing so the bot
-    can display a consistent "N/A" marker.
+    FlashVars sometimes include placeholders like "none". Treat empty strings
+    and placeholder values as missing so the bot can display a consistent
+    "N/A" marker.
     """
-    values = parsed_vars.get(key)
-    if not values:
+    value = parsed_vars.get(key)
+    if not value:
         return default
 
-    value = values[0].strip()
+    value = value.strip()
     if not value:
         return default
 
@@ -31,101 +85,788 @@ def _extract(parsed_vars: dict, key: str, default: str = "N/A") -> str:
     return value
 
 
-async def get_char_data(char_name: str):
-    """Fetches character data from the AQW character page."""
-    try:
-        url = "http://account.aq.com/CharPage"
-        params = {"id": char_name}
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/107.0.0.0 Safari/537.36'
-        }
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params, headers=headers, follow_redirects=True)
-            response.raise_for_status()
+INACTIVE_ERROR = "Character is inactive or does not exist."
+
+# Successful lookups only; errors are shared with coalesced callers but not stored here
+result_cache = TTLCache(
+    maxsize=RESULT_CACHE_SIZE,
+    ttl=RESULT_CACHE_TTL,
+    ttl_for=lambda data: 0 if "error" in data else RESULT_CACHE_TTL,
+    # A fetch every caller has given up on (deadline passed) is cancelled
+    cancel_abandoned=True,
+)
+# Characters that do not exist (or are wandering in the Void)
+negative_cache = TTLCache(maxsize=NEGATIVE_CACHE_SIZE, ttl=NEGATIVE_CACHE_TTL)
+
+admission = AdmissionControl(MAX_CONCURRENCY, MAX_QUEUE, RETRY_AFTER_MS)
+# Framed connections by the payload format they negotiated (connections that never ask stay JSON)
+connection_formats = {}
+BUSY_ERROR = "The character data service is busy. Please try again shortly."
+TIMEOUT_ERROR = "Timed out fetching the character page."
+DEADLINE_ERROR = "Deadline exceeded before the lookup finished."
+UNAVAILABLE_ERROR = "The AQW character page is not responding right now. Please try again in a minute."
+
+
+class DeadlineExceeded(Exception):
+    """The client's deadline for a lookup passed; its result would be thrown away."""
+
+
+# Deadlines of the callers currently waiting on each in-flight fetch (inf for a caller without one);
+# each caller adds its own and removes it when it stops waiting
+_fetch_deadlines = {}
+
+
+def _guard_stat(section, field, convert=float):
+    return lambda: {(host,): convert(stats[section][field]) for host, stats in guard_stats().items()}
+
+
+def _queue_stat(field, scale=1):
+    def collect():
+        queues = {"admission": admission.stats()["classes"]}
+        queues.update((host, stats["queue"]) for host, stats in guard_stats().items())
+        return {(queue, name): stats[field] * scale
+                for queue, classes in queues.items() for name, stats in classes.items()}
+    return collect
 
-        html_content = response.text
+
+def _cache_stat(field):
+    return lambda: {(name,): cache.stats()[field] for name, cache in
+                    (("result", result_cache), ("negative", negative_cache))}
+
+
+registry = Registry()
+requests_total = registry.counter(
+    "char_data_requests_total", "Requests answered, by op and outcome", ("op", "status"))
+request_seconds = registry.histogram(
+    "char_data_request_duration_seconds", "Time to answer a request, by op", ("op",))
+requests_in_flight = registry.gauge("char_data_requests_in_flight", "Requests being handled")
+connections_open = registry.gauge("char_data_connections_open", "Open client connections")
+upstream_seconds = registry.histogram(
+    "char_data_upstream_duration_seconds", "CharPage fetch and parse time (cache misses only)")
+upstream_errors = registry.counter(
+    "char_data_upstream_errors_total", "Failed CharPage lookups, by class", ("kind",))
+requests_expired = registry.counter(
+    "char_data_deadline_expired_total",
+    "Lookups whose client deadline passed: on arrival, or while waiting for the result", ("stage",))
+upstream_abandoned = registry.counter(
+    "char_data_upstream_abandoned_total",
+    "Upstream work dropped because every caller's deadline passed: in the admission queue, "
+    "during the fetch, or before parsing", ("stage",))
+upstream_wasted_seconds = registry.counter(
+    "char_data_upstream_wasted_seconds_total", "Time spent on upstream fetches nobody was waiting for")
+registry.counter("char_data_cache_hits_total", "Cache hits", ("cache",), collect=_cache_stat("hits"))
+registry.counter("char_data_cache_misses_total", "Cache misses", ("cache",), collect=_cache_stat("misses"))
+registry.counter("char_data_cache_coalesced_total", "Lookups that joined an in-flight fetch", ("cache",),
+                 collect=_cache_stat("coalesced"))
+registry.gauge("char_data_cache_hit_ratio", "Hits (including coalesced) per lookup", ("cache",),
+               collect=_cache_stat("hit_rate"))
+registry.gauge("char_data_cache_entries", "Entries in the cache", ("cache",), collect=_cache_stat("size"))
+registry.gauge("char_data_admission_active", "Upstream fetches holding a slot",
+               collect=lambda: {(): admission.active})
+registry.gauge("char_data_admission_queue_depth", "Upstream fetches waiting for a slot",
+               collect=lambda: {(): admission.waiting})
+registry.counter("char_data_admission_rejected_total", "Lookups refused as busy",
+                 collect=lambda: {(): admission.rejected})
+registry.gauge("char_data_upstream_rate_limit", "Current request rate allowed per upstream host (per second)",
+               ("host",), collect=_guard_stat("limiter", "rate"))
+registry.gauge("char_data_upstream_breaker_state", "Circuit breaker per upstream host (0 closed, 1 half-open, 2 open)",
+               ("host",), collect=_guard_stat("breaker", "state", STATE_VALUES.get))
+registry.counter("char_data_upstream_breaker_opened_total", "Times the upstream circuit breaker opened",
+                 ("host",), collect=_guard_stat("breaker", "opened"))
+registry.counter("char_data_upstream_breaker_rejected_total", "Requests refused while the breaker was open",
+                 ("host",), collect=_guard_stat("breaker", "rejected"))
+registry.gauge("char_data_queue_waiting", "Fetches waiting, by queue (admission or upstream host) and class",
+               ("queue", "class"), collect=_queue_stat("queued"))
+registry.counter("char_data_queue_granted_total", "Fetches let through, by queue and class",
+                 ("queue", "class"), collect=_queue_stat("granted"))
+registry.gauge("char_data_queue_wait_avg_seconds", "Average wait in the queue, by queue and class",
+               ("queue", "class"), collect=_queue_stat("wait_avg_ms", 0.001))
+registry.gauge("char_data_queue_wait_p95_seconds", "95th percentile wait over recent fetches, by queue and class",
+               ("queue", "class"), collect=_queue_stat("wait_p95_ms", 0.001))
+loop_lag = LoopLagMonitor(0.5, registry.histogram(
+    "char_data_event_loop_lag_seconds", "How late the event loop runs a 0.5s timer",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)))
+# Set once the service's listeners are up
+serving = False
+
+
+def error_kind(error: str) -> str:
+    """Class of an upstream error message, for the error counter."""
+    if error == INACTIVE_ERROR:
+        return "not_found"
+    if error == TIMEOUT_ERROR:
+        return "timeout"
+    if error == UNAVAILABLE_ERROR:
+        return "circuit_open"
+    if error.startswith("HTTP error"):
+        return "http_status"
+    if error.startswith("Network error"):
+        return "network"
+    if error.startswith("Could not find flashvars"):
+        return "parse"
+    return "exception"
+
+
+async def fetch_page(char_name: str):
+    """Fetch a CharPage (bounded by CHAR_DATA_UPSTREAM_TIMEOUT); returns (status_code, html)."""
+    url = "http://account.aq.com/CharPage"
+    params = {"id": char_name}
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/107.0.0.0 Safari/537.36'
+    }
+
+    client = get_http_client(url)
+    response = await client.get(url, params=params, headers=headers, timeout=UPSTREAM_TIMEOUT,
+                                follow_redirects=True)
+    return response.status_code, response.text
+
+
+async def get_char_data(char_name: str, expired=None):
+    """
+    Fetches character data from the AQW character page (uncached; see lookup_char_data).
+
+    `expired` is checked once the page has arrived; if it returns True the
+    page is not parsed and DeadlineExceeded is raised.
+    """
+    try:
+        status, html_content = await fetch_page(char_name)
+        if expired is not None and expired():
+            raise DeadlineExceeded(char_name)
+        if status >= 400:
+            return {"error": f"HTTP error occurred: {status}"}
 
         # The flashvars can be in a <param> tag or an <embed> tag.
-        # Let's try to find it in either, using a regex for flexibility.
-        match = re.search(r'flashvars="([^"]+)"', html_content, re.IGNORECASE)
-        if not match:
-            # Fallback for the <param name="FlashVars" ...> format
-            match = re.search(r'<param name="FlashVars" value="([^"]+)"', html_content, re.IGNORECASE)
+        flash_vars_str = find_flashvars(html_content)
 
-        if not match:
+        if not flash_vars_str:
             if "is wandering in the Void" in html_content:
-                return {"error": "Character is inactive or does not exist."}
+                return {"error": INACTIVE_ERROR}
             return {"error": "Could not find flashvars in the page. The page structure may have changed."}
 
-        flash_vars_str = match.group(1)
-        
         # The string is HTML-encoded (&amp;) and URL-encoded.
-        decoded_vars = unquote(flash_vars_str.replace("&amp;", "&"))
-        
-        # The decoded string is like a query string, so we can parse it
-        parsed_vars = parse_qs(decoded_vars)
+        decoded = decode_flashvars(flash_vars_str)
+        parsed_vars = decoded["flashvars"]
+        equipment = decoded["equipment"]
+        cosmetics = decoded["cosmetics"]
 
         # Extracting specific data points
-        # The values in parsed_vars are lists, so we take the first element
         data = {
             "name": _extract(parsed_vars, "strName", char_name),
             "level": _extract(parsed_vars, "intLevel"),
             "class": _extract(parsed_vars, "strClassName"),
-            "helm": _extract(parsed_vars, "strHelmName"),
-            "armor": _extract(parsed_vars, "strArmorName"),
-            "cape": _extract(parsed_vars, "strCapeName"),
-            "weapon": _extract(parsed_vars, "strWeaponName"),
-            "pet": _extract(parsed_vars, "strPetName"),
+            "helm": _extract(equipment, "Helm"),
+            "armor": _extract(equipment, "Armor"),
+            "cape": _extract(equipment, "Cape"),
+            "weapon": _extract(equipment, "Weapon"),
+            "pet": _extract(equipment, "Pet"),
             # Cosmetic slots surfaced to the Discord bot
-            "co_armor": _extract(parsed_vars, "strCustArmorName"),
-            "co_helm": _extract(parsed_vars, "strCustHelmName"),
-            "co_cape": _extract(parsed_vars, "strCustCapeName"),
-            "co_weapon": _extract(parsed_vars, "strCustWeaponName"),
-            "co_pet": _extract(parsed_vars, "strCustPetName"),
+            "co_armor": _extract(cosmetics, "Armor"),
+            "co_helm": _extract(cosmetics, "Helm"),
+            "co_cape": _extract(cosmetics, "Cape"),
+            "co_weapon": _extract(cosmetics, "Weapon"),
+            "co_pet": _extract(cosmetics, "Pet"),
         }
         return data
 
+    except DeadlineExceeded:
+        raise
     except httpx.HTTPStatusError as e:
         return {"error": f"HTTP error occurred: {e.response.status_code}"}
+    except httpx.TimeoutException:
+        return {"error": TIMEOUT_ERROR}
+    except CircuitOpen:
+        return {"error": UNAVAILABLE_ERROR}
+    except httpx.TransportError as e:
+        return {"error": f"Network error fetching the character page: {e}"}
     except Exception as e:
         return {"error": f"An unexpected error occurred: {str(e)}"}
 
-async def handle_client(reader, writer):
-    """Handles incoming client connections."""
-    data = await reader.read(1024)
-    message = data.decode().strip()
-    addr = writer.get_extra_info('peername')
-    print(f"Received '{message}' from {addr}")
+async def lookup_char_data(char_name: str, deadline=None):
+    """
+    Character data through the service's caches.
 
-    if not message:
-        writer.close()
-        await writer.wait_closed()
+    Successful results are cached for CHAR_DATA_CACHE_TTL seconds and
+    characters that do not exist for CHAR_DATA_NEGATIVE_TTL seconds.
+    Concurrent lookups of the same IGN share one upstream fetch. Other
+    errors (HTTP failures, timeouts) are never cached.
+
+    Upstream fetches go through admission control; raises ServiceBusy when
+    its wait queue is full (cache hits are always served).
+
+    `deadline` (time.monotonic()) is when the client stops waiting; raises
+    DeadlineExceeded once it passes. A shared fetch is cancelled when every
+    caller waiting on it has given up, and a page that arrives after the
+    latest of their deadlines is not parsed.
+    """
+    key = normalize_ign(char_name)
+    data = negative_cache.get(key)
+    if data is not None:
+        return data
+    if deadline is not None and time.monotonic() >= deadline:
+        requests_expired.inc(stage="arrival")
+        raise DeadlineExceeded(char_name)
+
+    def expired():
+        # Past the latest deadline of the callers still waiting (or nobody is waiting any more)
+        return time.monotonic() >= max(_fetch_deadlines.get(key, ()), default=-math.inf)
+
+    async def fetch():
+        stage, started = "queued", None
+        try:
+            async with admission.slot():
+                stage, started = "fetch", time.perf_counter()
+                data = await get_char_data(char_name, expired)
+        except asyncio.CancelledError:
+            upstream_abandoned.inc(stage=stage)
+            if started is not None:
+                upstream_wasted_seconds.inc(time.perf_counter() - started)
+            raise
+        except DeadlineExceeded:
+            upstream_abandoned.inc(stage="parse")
+            upstream_wasted_seconds.inc(time.perf_counter() - started)
+            raise
+        upstream_seconds.observe(time.perf_counter() - started)
+        if "error" in data:
+            upstream_errors.inc(kind=error_kind(data["error"]))
+        return data
+
+    waiter_deadline = math.inf if deadline is None else deadline
+    _fetch_deadlines.setdefault(key, []).append(waiter_deadline)
+    try:
+        if deadline is None:
+            data = await result_cache.get_or_fetch(key, fetch)
+        else:
+            data = await asyncio.wait_for(result_cache.get_or_fetch(key, fetch), deadline - time.monotonic())
+    except asyncio.TimeoutError:
+        requests_expired.inc(stage="waiting")
+        raise DeadlineExceeded(char_name) from None
+    finally:
+        waiting = _fetch_deadlines[key]
+        waiting.remove(waiter_deadline)
+        if not waiting:
+            del _fetch_deadlines[key]
+
+    if data.get("error") == INACTIVE_ERROR:
+        negative_cache.set(key, data)
+    return data
+
+
+def service_stats():
+    """Counters reported by the "stats" op."""
+    return {
+        "result_cache": result_cache.stats(),
+        "negative_cache": negative_cache.stats(),
+        "admission": admission.stats(),
+        "negotiated_formats": dict(connection_formats),
+        "deadlines": {
+            "expired": {stage: requests_expired.get(stage=stage) for stage in ("arrival", "waiting")},
+            "abandoned": {stage: upstream_abandoned.get(stage=stage) for stage in ("queued", "fetch", "parse")},
+            "wasted_seconds": round(upstream_wasted_seconds.get(), 3),
+        },
+        "http": http_client_stats(),
+        "upstream_guards": guard_stats(),
+    }
+
+
+def health_status():
+    """Liveness/readiness reported by the "health" op and /readyz."""
+    reasons = []
+    if not serving:
+        reasons.append("not listening yet")
+    if admission.full():
+        reasons.append("admission queue is full")
+    if loop_lag.lag > READY_MAX_LAG:
+        reasons.append(f"event loop lagging {loop_lag.lag:.2f}s")
+    return {
+        "live": True,
+        "ready": not reasons,
+        "reasons": reasons,
+        "pid": os.getpid(),
+        "in_flight": int(requests_in_flight.get()),
+        "queue_depth": admission.waiting,
+        "event_loop_lag_ms": round(loop_lag.lag * 1000, 2),
+    }
+
+
+def busy_reply(e: ServiceBusy, **fields):
+    """Frame telling the client to retry after the hinted delay."""
+    return {"status": "busy", "error": BUSY_ERROR, "retry_after_ms": e.retry_after_ms, **fields}
+
+
+def request_deadline(request):
+    """Deadline (time.monotonic()) from the client's remaining budget, "timeout_ms"; None if not sent."""
+    timeout_ms = request.get("timeout_ms")
+    if not isinstance(timeout_ms, (int, float)) or isinstance(timeout_ms, bool):
+        return None
+    return time.monotonic() + max(timeout_ms, 0) / 1000
+
+
+def request_priority(request, default):
+    """Fetch class asked for by a request ("priority"), or the op's default."""
+    priority = request.get("priority")
+    return priority if priority in PRIORITIES else default
+
+
+async def _op_lookup(request, send):
+    name = str(request.get("name", "")).strip()
+    if not name:
+        await send({"status": "error", "error": "Missing 'name'"})
+        return
+    try:
+        with fetch_priority(request_priority(request, INTERACTIVE)):
+            data = await lookup_char_data(name, request_deadline(request))
+    except ServiceBusy as e:
+        await send(busy_reply(e))
+        return
+    except DeadlineExceeded:
+        await send({"status": "error", "error": DEADLINE_ERROR})
+        return
+    await send({"status": "ok", "data": data})
+
+
+async def _op_batch(request, send):
+    """
+    Look up many names, streaming one frame per name as it completes, then a "done" frame.
+
+    Names refused by admission control get a "busy" frame with a retry hint.
+    "timeout_ms" applies to each name from when its lookup starts (the client
+    times out between frames, not on the whole batch). Batches are background
+    work unless the request says "priority": "interactive".
+    """
+    names = request.get("names")
+    if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+        await send({"status": "error", "error": "'names' must be a list of strings"})
         return
+    names = list(dict.fromkeys(name.strip() for name in names if name.strip()))
+    if len(names) > BATCH_MAX_NAMES:
+        await send({"status": "error", "error": f"Batch of {len(names)} names exceeds {BATCH_MAX_NAMES}"})
+        return
+
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def lookup(name):
+        async with semaphore:
+            try:
+                data = await lookup_char_data(name, request_deadline(request))
+            except ServiceBusy as e:
+                await send(busy_reply(e, name=name))
+                return
+            except DeadlineExceeded:
+                data = {"error": DEADLINE_ERROR}
+        await send({"status": "ok", "name": name, "data": data})
+
+    with fetch_priority(request_priority(request, BACKGROUND)):
+        tasks = [asyncio.ensure_future(lookup(name)) for name in names]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        # The client went away (or we were cancelled); stop the remaining fetches
+        for task in tasks:
+            task.cancel()
+        raise
+
+    print(f"Sent batch of {len(names)} names (result cache: {result_cache.stats()})")
+    await send({"status": "done", "count": len(names)})
+
+
+async def _op_ping(request, send):
+    await send({"status": "ok", "data": "pong"})
+
+
+async def _op_health(request, send):
+    await send({"status": "ok", "data": health_status()})
+
+
+# Merged stats of all workers, pushed by the supervisor (multi-process mode only)
+cluster_stats = None
 
-    char_data = await get_char_data(message)
-    
-    response_data = json.dumps(char_data)
-    
-    writer.write(response_data.encode())
+
+async def _op_stats(request, send):
+    stats = service_stats()
+    if cluster_stats is not None:
+        stats["worker"] = {"pid": os.getpid()}
+        stats["cluster"] = cluster_stats
+    await send({"status": "ok", "data": stats})
+
+
+# Framed-protocol operations: op name -> handler(request, send)
+OPS = {
+    "lookup": _op_lookup,
+    "batch": _op_batch,
+    "ping": _op_ping,
+    "health": _op_health,
+    "stats": _op_stats,
+}
+
+
+async def handle_request(request, send):
+    """Run one framed request; every frame it sends is tagged with the request id."""
+    request_id = request.get("id")
+    handler = OPS.get(request.get("op"))
+    op = request.get("op") if handler else "unknown"
+    status = "error"
+
+    async def reply(message):
+        nonlocal status
+        status = message.get("status", status)
+        message["id"] = request_id
+        await send(message)
+
+    started = time.perf_counter()
+    requests_in_flight.inc()
+    try:
+        if handler is None:
+            await reply({"status": "error", "error": f"Unknown op '{request.get('op')}'"})
+            return
+        try:
+            await handler(request, reply)
+        except Exception as e:
+            await reply({"status": "error", "error": f"An unexpected error occurred: {str(e)}"})
+    finally:
+        requests_in_flight.dec()
+        # A batch ends with "done" once every name has been answered
+        requests_total.inc(op=op, status="ok" if status == "done" else status)
+        request_seconds.observe(time.perf_counter() - started, op=op)
+
+
+async def negotiate_format(request, send, frames, first):
+    """Answer a "hello" request and switch the connection to the chosen payload format."""
+    reply = {"id": request.get("id")}
+    if not first:
+        await send({**reply, "status": "error", "error": "'hello' must be the first request on a v2 connection"})
+        return
+    codec = choose_format(request.get("formats"))
+    await send({**reply, "status": "ok", "data": {"format": codec.name}})
+    frames.codec = codec
+    connection_formats[codec.name] = connection_formats.get(codec.name, 0) + 1
+
+
+async def serve_framed(frames, writer, version):
+    """Serve pipelined requests on one connection until the client closes it."""
+    addr = writer.get_extra_info('peername') or "local socket"
+    writer.write(preamble(version))
     await writer.drain()
+    print(f"Framed connection (v{version}) from {addr}")
 
-    print(f"Sent data for '{message}'")
-    writer.close()
-    await writer.wait_closed()
+    write_lock = asyncio.Lock()
+    in_flight = set()
+    served = 0
 
-async def main():
-    """Starts the TCP server."""
-    server = await asyncio.start_server(
-        handle_client, HOST, PORT)
+    async def send(message):
+        async with write_lock:
+            writer.write(encode_frame(message, frames.codec))
+            await writer.drain()
 
-    addr = server.sockets[0].getsockname()
-    print(f'Serving on {addr}')
+    async def run(request):
+        try:
+            await handle_request(request, send)
+        except (ConnectionError, OSError):
+            pass  # Client went away; nothing left to answer
 
-    async with server:
-        await server.serve_forever()
+    try:
+        while True:
+            request = await frames.read_frame()
+            if request is None:
+                break
+            if request.get("op") == "hello":
+                # Handled inline: the format must switch before the next frame is read
+                await negotiate_format(request, send, frames, first=not served and version >= FORMAT_NEGOTIATION_VERSION)
+                continue
+            served += 1
+            task = asyncio.create_task(run(request))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+    except (ProtocolError, ConnectionError, OSError) as e:
+        print(f"Closing framed connection from {addr}: {e}")
 
-if __name__ == "__main__":
+    # A client may half-close after its last request; finish what it asked for
+    if in_flight:
+        await asyncio.gather(*in_flight, return_exceptions=True)
+    print(f"Framed connection from {addr} closed (result cache: {result_cache.stats()})")
+
+
+async def handle_client(reader, writer):
+    """Handles incoming client connections (framed or legacy one-shot)."""
+    connections_open.inc()
+    try:
+        data = await reader.read(1024)
+
+        if is_framed(data):
+            while len(data) < PREAMBLE_SIZE:
+                more = await reader.read(PREAMBLE_SIZE - len(data))
+                if not more:
+                    return
+                data += more
+            version = min(parse_preamble(data[:PREAMBLE_SIZE]), PROTOCOL_VERSION)
+            await serve_framed(FrameReader(reader, data[PREAMBLE_SIZE:]), writer, version)
+            return
+
+        # Legacy one-shot mode: raw IGN in, one JSON document out
+        message = data.decode().strip()
+        addr = writer.get_extra_info('peername') or "local socket"
+        print(f"Received '{message}' from {addr}")
+
+        if not message:
+            return
+
+        started = time.perf_counter()
+        requests_in_flight.inc()
+        try:
+            char_data = await lookup_char_data(message)
+            status = "error" if "error" in char_data else "ok"
+        except ServiceBusy as e:
+            char_data = {"error": BUSY_ERROR, "retry_after_ms": e.retry_after_ms}
+            status = "busy"
+        finally:
+            requests_in_flight.dec()
+        requests_total.inc(op="legacy", status=status)
+        request_seconds.observe(time.perf_counter() - started, op="legacy")
+
+        response_data = json.dumps(char_data)
+
+        writer.write(response_data.encode())
+        await writer.drain()
+
+        print(f"Sent data for '{message}' (result cache: {result_cache.stats()})")
+    except (ProtocolError, ConnectionError, OSError) as e:
+        print(f"Client connection error: {e}")
+    finally:
+        connections_open.dec()
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+async def _metrics():
+    return 200, "text/plain; version=0.0.4", registry.render()
+
+
+async def _liveness():
+    # Answering at all means the event loop is running
+    return 200, "text/plain", "ok\n"
+
+
+async def _readiness():
+    health = health_status()
+    return (200 if health["ready"] else 503), "application/json", json.dumps(health) + "\n"
+
+
+async def start_metrics_server(host=METRICS_HOST, port=METRICS_PORT):
+    """Serve /metrics, /healthz and /readyz; returns None (with a warning) if the port is unavailable."""
+    try:
+        server = await start_http_server(
+            {"/metrics": _metrics, "/healthz": _liveness, "/readyz": _readiness}, host, port)
+    except OSError as e:
+        print(f"Warning: metrics endpoint disabled, cannot listen on {host}:{port}: {e}")
+        return None
+    print(f"Metrics on http://{host}:{port}/metrics (health: /healthz, /readyz)")
+    return server
+
+
+async def serve(host=HOST, port=PORT, sock=None, reuse_port=False, stop=None, unix_sock=None, metrics_port=None):
+    """
+    Run the TCP server (and the Unix socket server, if given) until `stop` is set (forever if not given).
+
+    `metrics_port` starts the metrics/health endpoint on METRICS_HOST.
+    """
+    global serving
+    loop_lag.start()
+    metrics_server = await start_metrics_server(METRICS_HOST, metrics_port) if metrics_port else None
+    if sock is not None:
+        servers = [await asyncio.start_server(handle_client, sock=sock)]
+    else:
+        servers = [await asyncio.start_server(handle_client, host, port, reuse_port=reuse_port or None)]
+    if unix_sock is not None:
+        # The socket file belongs to whoever bound it (the supervisor, in multi-worker mode)
+        keep_file = {"cleanup_socket": False} if sys.version_info >= (3, 13) else {}
+        servers.append(await asyncio.start_unix_server(handle_client, sock=unix_sock, **keep_file))
+
+    for server in servers:
+        addr = server.sockets[0].getsockname()
+        print(f'Serving on {addr} (PID {os.getpid()})')
+    serving = True
+
+    try:
+        if stop is None:
+            await asyncio.gather(*(server.serve_forever() for server in servers))
+        else:
+            await stop.wait()
+    finally:
+        serving = False
+        if metrics_server is not None:
+            servers.append(metrics_server)
+        for server in servers:
+            server.close()
+            await server.wait_closed()
+        await loop_lag.stop()
+        await close_http_clients()
+
+
+def _unix_socket(path):
+    """Bind the service's Unix socket, replacing a stale socket file left by a previous run."""
+    if os.path.exists(path):
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            raise RuntimeError(f"{path} exists and is not a socket")
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+        except OSError:
+            os.unlink(path)  # Nobody is listening; left over from a previous run
+        else:
+            raise RuntimeError(f"Another service is already listening on {path}")
+        finally:
+            probe.close()
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(path)
+    sock.listen(socket.SOMAXCONN)
+    sock.setblocking(False)
+    return sock
+
+
+def _remove_socket_file(path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+async def _report_stats(conn, interval, stop):
+    """Send this worker's stats to the supervisor and keep the merged stats it replies with."""
+    loop = asyncio.get_running_loop()
+
+    def receive():
+        global cluster_stats
+        try:
+            cluster_stats = conn.recv()
+        except (EOFError, OSError):
+            loop.remove_reader(conn.fileno())
+            stop.set()  # Supervisor is gone; don't linger as an orphan
+
+    loop.add_reader(conn.fileno(), receive)
+    try:
+        while not stop.is_set():
+            try:
+                conn.send(service_stats())
+            except OSError:
+                stop.set()
+                break
+            await asyncio.sleep(interval)
+    finally:
+        if not conn.closed:
+            loop.remove_reader(conn.fileno())
+
+
+async def _run_worker(conn, host, port, sock, unix_sock, metrics_port):
+    stop = asyncio.Event()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+    reporter = asyncio.create_task(_report_stats(conn, STATS_INTERVAL, stop))
+    try:
+        await serve(host, port, sock=sock, reuse_port=sock is None, stop=stop, unix_sock=unix_sock,
+                    metrics_port=metrics_port)
+    finally:
+        reporter.cancel()
+
+
+def _worker_main(worker_id, conn, host, port, sock, unix_sock, metrics_port):
+    """Entry point of a worker process (forked by the supervisor)."""
+    # Ctrl+C reaches the whole process group; the supervisor stops workers with SIGTERM
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    # Each worker has its own metrics, so each gets its own metrics port
+    metrics_port = metrics_port + worker_id if metrics_port else None
+    asyncio.run(_run_worker(conn, host, port, sock, unix_sock, metrics_port))
+
+
+def _listen_socket(host, port, reuse_port):
+    """
+    Bind the service port in the supervisor.
+
+    With SO_REUSEPORT this only checks the port is free (each worker binds
+    its own socket and the kernel balances connections between them);
+    otherwise the returned socket is inherited by every worker.
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    if reuse_port:
+        sock.close()
+        return None
+    sock.listen(socket.SOMAXCONN)
+    sock.setblocking(False)
+    return sock
+
+
+def run_workers(workers, host=HOST, port=PORT, path=None, metrics_port=None):
+    """
+    Serve with `workers` processes sharing the port, restarting any that die.
+
+    The Unix socket, if any, is bound here and shared by every worker. Worker
+    N serves its metrics on metrics_port + N.
+    """
+    reuse_port = hasattr(socket, "SO_REUSEPORT")
+    sock = _listen_socket(host, port, reuse_port)
+    unix_sock = _unix_socket(path) if path else None
+    mode = "SO_REUSEPORT" if reuse_port else "shared listening socket"
+    print(f"Starting {workers} workers on {host}:{port} ({mode})" + (f" and {path}" if path else ""))
+    try:
+        Supervisor(_worker_main, workers, args=(host, port, sock, unix_sock, metrics_port),
+                   name="char-data-worker").run()
+    finally:
+        if path:
+            _remove_socket_file(path)
+
+
+def probe(metrics_port=METRICS_PORT, timeout=2.0):
+    """Ask a running service whether it is ready; prints the answer."""
+    if not metrics_port:
+        print("Metrics endpoint is disabled (CHAR_DATA_METRICS_PORT=0); cannot probe")
+        return False
+    host = "127.0.0.1" if METRICS_HOST in ("", "0.0.0.0") else METRICS_HOST
+    url = f"http://{host}:{metrics_port}/readyz"
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            print(response.read().decode().strip())
+            return True
+    except urllib.error.HTTPError as e:
+        print(e.read().decode().strip())
+    except (urllib.error.URLError, OSError) as e:
+        print(f"Service not reachable at {url}: {e}")
+    return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Character data TCP service")
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                        help="worker processes sharing the port (default: CHAR_DATA_WORKERS or 1)")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--socket", default=SOCKET_PATH,
+                        help="also listen on this Unix socket path (default: CHAR_DATA_SOCKET)")
+    parser.add_argument("--metrics-port", type=int, default=METRICS_PORT,
+                        help="metrics/health port, 0 to disable (default: CHAR_DATA_METRICS_PORT or 4569)")
+    parser.add_argument("--probe", action="store_true",
+                        help="check that a running service is ready (via /readyz) and exit 0 if so, 1 if not")
+    args = parser.parse_args(argv)
+
+    if args.probe:
+        sys.exit(0 if probe(args.metrics_port) else 1)
+    if args.workers > 1:
+        run_workers(args.workers, args.host, args.port, args.socket, args.metrics_port)
+        return
+    unix_sock = _unix_socket(args.socket) if args.socket else None
     try:
-        asyncio.run(main())
+        asyncio.run(serve(args.host, args.port, unix_sock=unix_sock, metrics_port=args.metrics_port))
     except KeyboardInterrupt:
         print("Server stopped.")
+    finally:
+        if unix_sock is not None:
+            _remove_socket_file(args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Wire protocol for the character data TCP service.
+
+`char_data_scraper.py` (server) and `scanner_client.py` (client) speak two
+modes on the same port:
+
+Legacy one-shot mode (still accepted):
+    The client writes the raw IGN, the server replies with one JSON document
+    and closes the connection.
+
+Framed mode (version 1 and later):
+    The client opens with a 5-byte preamble, MAGIC + version byte. The server
+    answers with the same preamble carrying the version it will speak. After
+    that both sides exchange frames: a 4-byte big-endian length followed by a
+    UTF-8 JSON object. MAGIC starts with a NUL byte, which never appears in an
+    IGN, so the server can tell the two modes apart from the first read.
+
+    Requests carry a client-chosen id; the server handles requests on one
+    connection concurrently and tags every response with the request id, so
+    responses may arrive in any order:
+
+        -> {"id": 7, "op": "lookup", "name": "Artix"}
+        -> {"id": 8, "op": "ping"}
+        <- {"id": 8, "status": "ok", "data": "pong"}
+        <- {"id": 7, "status": "ok", "data": {"name": "Artix", ...}}
+        <- {"id": 9, "status": "error", "error": "Unknown op 'foo'"}
+
+Payload formats (version 2):
+    Frames are JSON unless the client negotiates another format. A version 2
+    client may open with a "hello" request listing the formats it wants, in
+    order of preference; the server answers (in JSON) with the first one it
+    supports, and both sides switch for every later frame:
+
+        -> {"id": 1, "op": "hello", "formats": ["msgpack", "json"]}
+        <- {"id": 1, "status": "ok", "data": {"format": "msgpack"}}
+
+    "msgpack" is a compact binary encoding (pip install msgpack). JSON frames
+    are encoded and decoded with orjson when it is installed, which is
+    byte-compatible with the standard json module, so it needs no
+    negotiation. Version 1 peers never send "hello" and always speak JSON.
+"""
+
+import asyncio
+import json
+import struct
+from typing import Any, Callable, Dict, List, Optional
+
+
+MAGIC = b"\x00CDP"
+PROTOCOL_VERSION = 2
+# First version that understands the "hello" format negotiation
+FORMAT_NEGOTIATION_VERSION = 2
+PREAMBLE_SIZE = len(MAGIC) + 1
+
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+_LENGTH = struct.Struct(">I")
+
+
+class ProtocolError(Exception):
+    """The peer sent something that is not valid framed-protocol data."""
+
+
+class Codec:
+    """A frame payload format: dumps(message) -> bytes, loads(bytes) -> message."""
+
+    def __init__(self, name: str, dumps: Callable[[Dict[str, Any]], bytes], loads: Callable[[bytes], Any]):
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+
+    def __repr__(self):
+        return f"Codec({self.name!r})"
+
+
+def _json_codec() -> Codec:
+    try:
+        import orjson
+    except ImportError:
+        return Codec("json", lambda message: json.dumps(message, separators=(",", ":")).encode(), json.loads)
+    return Codec("json", lambda message: orjson.dumps(message, option=orjson.OPT_NON_STR_KEYS), orjson.loads)
+
+
+def _msgpack_codec() -> Optional[Codec]:
+    try:
+        import msgpack
+    except ImportError:
+        return None
+    return Codec(
+        "msgpack",
+        lambda message: msgpack.packb(message, use_bin_type=True),
+        lambda payload: msgpack.unpackb(payload, raw=False, strict_map_key=False),
+    )
+
+
+JSON = _json_codec()
+# Formats installed on this host, by name
+CODECS: Dict[str, Codec] = {codec.name: codec for codec in (JSON, _msgpack_codec()) if codec is not None}
+FORMATS = ("json", "msgpack")
+
+
+def available_formats() -> List[str]:
+    """List the payload formats usable on this host."""
+    return list(CODECS)
+
+
+def resolve_format(name: Optional[str]) -> Codec:
+    """Map a configured format name to a codec that is usable here (JSON if not)."""
+    name = (name or JSON.name).strip().lower()
+    if name not in FORMATS:
+        print(f"Warning: Unknown CHAR_DATA_FORMAT '{name}', using json")
+        return JSON
+    if name not in CODECS:
+        print(f"Warning: CHAR_DATA_FORMAT '{name}' is not installed, using json")
+        return JSON
+    return CODECS[name]
+
+
+def choose_format(requested: Any) -> Codec:
+    """Pick the first requested format this host supports (server side of "hello")."""
+    if isinstance(requested, list):
+        for name in requested:
+            if isinstance(name, str) and name in CODECS:
+                return CODECS[name]
+    return JSON
+
+
+def preamble(version: int = PROTOCOL_VERSION) -> bytes:
+    """Bytes opening a framed connection at the given version."""
+    return MAGIC + bytes([version])
+
+
+def parse_preamble(data: bytes) -> int:
+    """Return the version announced by a preamble."""
+    if len(data) != PREAMBLE_SIZE or not data.startswith(MAGIC):
+        raise ProtocolError(f"Invalid preamble {data!r}")
+    return data[-1]
+
+
+def is_framed(first_bytes: bytes) -> bool:
+    """True if a connection's first bytes open the framed protocol."""
+    return first_bytes[:1] == MAGIC[:1]
+
+
+def encode_frame(message: Dict[str, Any], codec: Codec = JSON) -> bytes:
+    """Serialize one message as a length-prefixed frame."""
+    payload = codec.dumps(message)
+    if len(payload) > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Frame of {len(payload)} bytes exceeds {MAX_FRAME_SIZE}")
+    return _LENGTH.pack(len(payload)) + payload
+
+
+class FrameReader:
+    """
+    Reads frames from a stream.
+
+    `buffered` holds bytes already read from the stream (the server reads the
+    start of a connection before it knows which mode the client speaks).
+    `codec` decodes payloads and may be switched once a format is negotiated.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, buffered: bytes = b"", codec: Codec = JSON):
+        self._reader = reader
+        self._buffered = buffered
+        self.codec = codec
+
+    async def readexactly(self, n: int) -> bytes:
+        head, self._buffered = self._buffered[:n], self._buffered[n:]
+        if len(head) == n:
+            return head
+        return head + await self._reader.readexactly(n - len(head))
+
+    async def read_frame(self) -> Optional[Dict[str, Any]]:
+        """Return the next message, or None when the peer closed between frames."""
+        try:
+            header = await self.readexactly(_LENGTH.size)
+        except asyncio.IncompleteReadError as e:
+            if not e.partial:
+                return None
+            raise ProtocolError("Connection closed inside a frame header") from e
+
+        (length,) = _LENGTH.unpack(header)
+        if length > MAX_FRAME_SIZE:
+            raise ProtocolError(f"Frame of {length} bytes exceeds {MAX_FRAME_SIZE}")
+
+        try:
+            payload = await self.readexactly(length)
+        except asyncio.IncompleteReadError as e:
+            raise ProtocolError("Connection closed inside a frame") from e
+
+        try:
+            message = self.codec.loads(payload)
+        except (ValueError, TypeError) as e:
+            # JSONDecodeError, UnicodeDecodeError and msgpack's errors are all ValueErrors
+            raise ProtocolError(f"Invalid {self.codec.name} frame payload: {e}") from e
+        if not isinstance(message, dict):
+            raise ProtocolError("Frame payload is not an object")
+        return message
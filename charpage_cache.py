@@ -0,0 +1,214 @@
+"""
+Shared CharPage cache for the scrapers.
+
+The verification modal, the daily verification check and `/char` all fetch
+`account.aq.com/CharPage` for the same IGNs within seconds of each other.
+This module keeps one small in-process cache in front of those fetches:
+
+- Entries are keyed by the normalized IGN (case and whitespace insensitive)
+- Each entry expires after a configurable TTL
+- The cache is size-bounded and evicts the least recently used entry
+- Concurrent misses for the same key share one in-flight fetch (single-flight),
+  which runs at the most urgent fetch class among the callers waiting for
+  it (see fetch_scheduler.start_shared)
+
+TTLCache itself is generic; the scraper service uses it to cache parsed
+lookup results (see char_data_scraper.py).
+
+Configuration (environment variables):
+- CHARPAGE_CACHE_TTL: seconds a fetched page stays fresh (default 60, 0 disables storage)
+- CHARPAGE_CACHE_SIZE: maximum number of cached pages (default 512)
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fetch_scheduler import SharedPriority, current_priority, start_shared
+
+CHARPAGE_CACHE_TTL = float(os.environ.get("CHARPAGE_CACHE_TTL", "60"))
+CHARPAGE_CACHE_SIZE = int(os.environ.get("CHARPAGE_CACHE_SIZE", "512"))
+
+_MISSING = object()
+
+
+def normalize_ign(ign: str) -> str:
+    """Normalize an IGN for use as a cache key ("  Some  Hero " -> "some hero")."""
+    return " ".join(ign.lower().split()) if ign else ""
+
+
+class TTLCache:
+    """
+    Size-bounded LRU cache with per-entry expiry and single-flight fetches.
+
+    Args:
+        maxsize: Maximum number of stored entries
+        ttl: Default lifetime of an entry in seconds
+        ttl_for: Optional callable returning the lifetime for a fetched value.
+            Returning 0 (or less) shares the value with coalesced callers but
+            does not store it.
+        cancel_abandoned: Cancel an in-flight fetch once every caller waiting
+            for it has been cancelled (e.g. their deadlines passed), instead
+            of letting it finish to fill the cache.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: float = 60.0,
+                 ttl_for: Optional[Callable[[Any], float]] = None, cancel_abandoned: bool = False):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.cancel_abandoned = cancel_abandoned
+        self._ttl_for = ttl_for
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._priorities: Dict[asyncio.Future, SharedPriority] = {}
+        self._waiters: Dict[asyncio.Future, int] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.abandoned = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return _MISSING
+
+        self._entries.move_to_end(key)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a fresh cached value without fetching (counted as a hit or miss)."""
+        value = self._lookup(key)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Store a value, evicting the least recently used entries if full."""
+        if ttl is None:
+            ttl = self._ttl_for(value) if self._ttl_for else self.ttl
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: str):
+        """Drop a cached value (an in-flight fetch is left alone)."""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def fetching(self, key: str) -> bool:
+        """True while a fetch for `key` is in flight."""
+        return key in self._inflight
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached value for `key`, fetching it on a miss.
+
+        Concurrent callers that miss on the same key await the same fetch.
+        The fetch runs as its own task so a cancelled caller does not cancel
+        the lookup for everyone else. Exceptions are propagated to every
+        waiting caller and are never cached. With cancel_abandoned, the
+        fetch is cancelled when the last caller waiting for it is cancelled.
+
+        The fetch runs at the fetch class of its most urgent caller: an
+        interactive caller joining a background fetch promotes it.
+        """
+        value = self._lookup(key)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            self._priorities[task].join(current_priority())
+        else:
+            self.misses += 1
+            task, shared = start_shared(fetch())
+            self._priorities[task] = shared
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._fetch_done(key, done))
+
+        if not self.cancel_abandoned:
+            return await asyncio.shield(task)
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():
+                    # Every caller gave up; nobody is left to use the result
+                    task.cancel()
+                    self.abandoned += 1
+
+    def _fetch_done(self, key: str, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        self._priorities.pop(task, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        self.set(key, task.result())
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters used to size the cache (hit rate counts coalesced calls as hits)."""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "abandoned": self.abandoned,
+            "inflight": len(self._inflight),
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
+
+
+# CharPage responses are (status_code, html) pairs. Only successful pages are
+# stored; other statuses are still shared with coalesced callers.
+charpage_cache = TTLCache(
+    maxsize=CHARPAGE_CACHE_SIZE,
+    ttl=CHARPAGE_CACHE_TTL,
+    ttl_for=lambda response: CHARPAGE_CACHE_TTL if response[0] == 200 else 0,
+)
+
+
+async def fetch_charpage(ign: str, fetch: Callable[[], Awaitable[Tuple[int, str]]]) -> Tuple[int, str]:
+    """
+    Fetch a CharPage through the shared cache.
+
+    Args:
+        ign: The character name as entered by the user
+        fetch: Coroutine factory performing the HTTP request and returning
+            (status_code, html)
+
+    Returns:
+        The (status_code, html) pair, possibly from cache
+    """
+    return await charpage_cache.get_or_fetch(normalize_ign(ign), fetch)
@@ -0,0 +1,280 @@
+"""
+Priority scheduling for upstream fetches.
+
+Interactive lookups (/char, the verification modal, /wiki) and background
+work (the daily verification sweep, batch lookups in the scraper service)
+share the same upstream capacity: each host's rate limit (upstream_guard.py)
+and, in the scraper service, the admission slots (admission.py). Both hand
+out capacity through a priority queue instead of first come, first served:
+
+- A waiting interactive request is always served before any background one,
+  whenever it arrived; within a class requests are served in arrival order
+- Background work only gets capacity no interactive request is waiting for
+- Only interactive requests are refused when their wait would exceed the
+  request's timeout; background work waits for its turn
+
+The class is carried in a context variable, so it follows a call into
+every coroutine and task it starts without being passed through the scraper
+functions. Anything not marked is interactive:
+
+    with fetch_priority(BACKGROUND):
+        await run_daily_sweep()
+
+A fetch shared by several callers (the single-flight fetches of
+charpage_cache.TTLCache) is started with start_shared() and runs at the
+most urgent class among its callers: when an interactive caller joins a
+background fetch, the fetch is promoted, and its requests already waiting
+in a queue move up to the interactive class (keeping their place by
+arrival).
+
+Wait time in the queue is recorded per class (FetchScheduler.stats()).
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Dict, Iterator, List, Optional, Tuple
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+# Lower rank is served first
+PRIORITIES = {INTERACTIVE: 0, BACKGROUND: 1}
+
+_priority: ContextVar[str] = ContextVar("fetch_priority", default=INTERACTIVE)
+_shared: ContextVar[Optional["SharedPriority"]] = ContextVar("shared_fetch", default=None)
+
+
+def current_priority() -> str:
+    """The fetch class of the running code (INTERACTIVE unless marked otherwise)."""
+    priority = _priority.get()
+    shared = _shared.get()
+    if shared is not None and PRIORITIES[shared.priority] < PRIORITIES[priority]:
+        return shared.priority
+    return priority
+
+
+@contextmanager
+def fetch_priority(priority: str) -> Iterator[None]:
+    """Run the block (and the tasks it starts) with the given fetch class."""
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown fetch priority {priority!r}")
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class WaitStats:
+    """Queue wait times of one fetch class."""
+
+    def __init__(self, sample_size: int = 1024):
+        self.granted = 0
+        self.rejected = 0
+        self.queued = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._recent: deque = deque(maxlen=sample_size)
+
+    def record(self, waited: float):
+        self.granted += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        self._recent.append(waited)
+
+    def stats(self) -> Dict[str, Any]:
+        recent = sorted(self._recent)
+        p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0.0
+        return {
+            "granted": self.granted,
+            "rejected": self.rejected,
+            "queued": self.queued,
+            "wait_avg_ms": round(self.wait_total / self.granted * 1000, 2) if self.granted else 0.0,
+            "wait_p95_ms": round(p95 * 1000, 2),
+            "wait_max_ms": round(self.wait_max * 1000, 2),
+        }
+
+
+class SharedPriority:
+    """
+    Fetch class of work awaited by several callers: the most urgent class
+    among them. Waiters the work has queued (in any PriorityQueue) and
+    shared fetches it started itself are promoted along with it.
+    """
+
+    def __init__(self, priority: str):
+        self.priority = priority
+        self._queued: List[Tuple["PriorityQueue", asyncio.Future]] = []
+        self._children: List["SharedPriority"] = []
+
+    def join(self, priority: str):
+        """Another caller awaits the work; raise its class to `priority` if that is more urgent."""
+        if PRIORITIES[priority] >= PRIORITIES[self.priority]:
+            return
+        self.priority = priority
+        for queue, future in self._queued:
+            if not future.done():
+                queue.promote(future, priority)
+        for child in self._children:
+            child.join(priority)
+
+    def _track(self, queue: "PriorityQueue", future: asyncio.Future):
+        self._queued = [(q, f) for q, f in self._queued if not f.done()]
+        self._queued.append((queue, future))
+
+
+def start_shared(work: Awaitable[Any]) -> Tuple[asyncio.Future, SharedPriority]:
+    """
+    Run `work` as a task shared by several callers, at the fetch class of
+    the caller starting it. Call join() on the returned SharedPriority for
+    every caller that awaits the task later.
+    """
+    shared = SharedPriority(current_priority())
+    parent = _shared.get()
+    if parent is not None:
+        parent._children.append(shared)
+
+    async def run():
+        _shared.set(shared)  # Only in this task's copy of the context
+        return await work
+
+    return asyncio.ensure_future(run()), shared
+
+
+def class_stats() -> Dict[str, WaitStats]:
+    """Fresh per-class wait stats, one entry per fetch class."""
+    return {name: WaitStats() for name in PRIORITIES}
+
+
+class PriorityQueue:
+    """
+    Waiters ordered by (class rank, arrival). Holds futures that the owner
+    resolves when it grants the waiter capacity.
+    """
+
+    def __init__(self):
+        # [rank, arrival, future]; the future is None once the entry was re-pushed by promote()
+        self._heap: List[list] = []
+        self._seq = itertools.count()
+
+    @staticmethod
+    def _waiting(entry: list) -> bool:
+        return entry[2] is not None and not entry[2].done()
+
+    def __len__(self) -> int:
+        return sum(1 for entry in self._heap if self._waiting(entry))
+
+    def push(self, priority: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, [PRIORITIES[priority], next(self._seq), future])
+        shared = _shared.get()
+        if shared is not None:
+            shared._track(self, future)
+        return future
+
+    def promote(self, future: asyncio.Future, priority: str):
+        """Move a waiter up to a more urgent class, keeping its arrival order."""
+        rank = PRIORITIES[priority]
+        for entry in self._heap:
+            if entry[2] is future:
+                if rank < entry[0]:
+                    entry[2] = None
+                    heapq.heappush(self._heap, [rank, entry[1], future])
+                return
+
+    def peek(self) -> Optional[asyncio.Future]:
+        """The next waiter to serve (dropping cancelled ones), or None."""
+        while self._heap and not self._waiting(self._heap[0]):
+            heapq.heappop(self._heap)
+        return self._heap[0][2] if self._heap else None
+
+    def pop(self) -> Optional[asyncio.Future]:
+        future = self.peek()
+        if future is not None:
+            heapq.heappop(self._heap)
+        return future
+
+    def ahead_of(self, priority: str) -> int:
+        """Waiters that would be served before a new arrival of this class."""
+        rank = PRIORITIES[priority]
+        return sum(1 for entry in self._heap if entry[0] <= rank and self._waiting(entry))
+
+
+class FetchScheduler:
+    """
+    Hands out a rate limiter's tokens in priority order.
+
+    Args:
+        limiter: Token source with delay() (seconds until a token is
+            available), take() and rate (tokens per second); see
+            upstream_guard.AdaptiveRateLimiter
+    """
+
+    def __init__(self, limiter):
+        self.limiter = limiter
+        self.classes = class_stats()
+        self._queue = PriorityQueue()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def acquire(self, priority: Optional[str] = None, max_wait: Optional[float] = None) -> float:
+        """
+        Wait for a token in priority order; returns the time waited.
+
+        Raises asyncio.TimeoutError (without taking a token) if an
+        interactive request's expected wait exceeds `max_wait` seconds.
+        """
+        priority = priority or current_priority()
+        stats = self.classes[priority]
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Waiters and the dispatcher of a previous event loop can never be served
+            self._loop, self._queue, self._dispatcher = loop, PriorityQueue(), None
+
+        if self._queue.peek() is None and self.limiter.delay() <= 0:
+            self.limiter.take()
+            stats.record(0.0)
+            return 0.0
+
+        if max_wait is not None and priority == INTERACTIVE:
+            expected = self.limiter.delay() + self._queue.ahead_of(priority) / self.limiter.rate
+            if expected > max_wait:
+                stats.rejected += 1
+                raise asyncio.TimeoutError()
+
+        started = time.monotonic()
+        future = self._queue.push(priority)
+        stats.queued += 1
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = loop.create_task(self._dispatch())
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.limiter.refund()  # Granted just as the waiter was cancelled
+            raise
+        finally:
+            stats.queued -= 1
+        waited = time.monotonic() - started
+        stats.record(waited)
+        return waited
+
+    async def _dispatch(self):
+        while self._queue.peek() is not None:
+            delay = self.limiter.delay()
+            if delay > 0:
+                # Whoever is at the head after the sleep (maybe a newer interactive request) goes next
+                await asyncio.sleep(delay)
+                continue
+            future = self._queue.pop()
+            if future is not None:
+                self.limiter.take()
+                future.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Wait times per fetch class."""
+        return {name: stats.stats() for name, stats in self.classes.items()}
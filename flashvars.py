@@ -0,0 +1,96 @@
+"""
+FlashVars decoder shared by scraper.py and char_data_scraper.py
+
+The CharPage embeds the character's Flash parameters as one long
+`key=value&key=value` attribute. This module locates that attribute with
+precompiled patterns and decodes it in a single pass, filling the equipped
+and cosmetic slots through a lookup table instead of one regex per slot.
+"""
+
+import re
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import unquote_plus
+
+
+# The flashvars can be in an <embed flashvars="..."> or a <param name="FlashVars" value="..."> tag.
+# The exact-case pattern is tried first since a case-insensitive scan of the whole page is far slower.
+_FLASHVARS_EXACT_RE = re.compile(r'flashvars="([^"]+)"')
+FLASHVARS_RE = re.compile(r'flashvars="([^"]+)"', re.IGNORECASE)
+PARAM_FLASHVARS_RE = re.compile(r'<param name="FlashVars" value="([^"]+)"', re.IGNORECASE)
+
+# FlashVars key -> (section, slot)
+SLOT_TABLE: Dict[str, Tuple[str, str]] = {
+    'strWeaponName': ('equipment', 'Weapon'),
+    'strArmorName': ('equipment', 'Armor'),
+    'strHelmName': ('equipment', 'Helm'),
+    'strCapeName': ('equipment', 'Cape'),
+    'strPetName': ('equipment', 'Pet'),
+    'strMiscName': ('equipment', 'Misc'),
+    'strCustWeaponName': ('cosmetics', 'Weapon'),
+    'strCustArmorName': ('cosmetics', 'Armor'),
+    'strCustHelmName': ('cosmetics', 'Helm'),
+    'strCustCapeName': ('cosmetics', 'Cape'),
+    'strCustPetName': ('cosmetics', 'Pet'),
+}
+
+
+def find_flashvars(html: str) -> Optional[str]:
+    """
+    Return the raw (still encoded) FlashVars attribute from CharPage HTML.
+
+    Args:
+        html: The HTML content of the CharPage
+
+    Returns:
+        The attribute value, or None if the page has no FlashVars
+    """
+    match = _FLASHVARS_EXACT_RE.search(html) or FLASHVARS_RE.search(html)
+    if not match:
+        match = PARAM_FLASHVARS_RE.search(html)
+    return match.group(1) if match else None
+
+
+def _decode(value: str) -> str:
+    # Most values are plain words; skip the decoder when there is nothing to decode
+    if '%' in value or '+' in value:
+        return unquote_plus(value)
+    return value
+
+
+def decode_flashvars(raw: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Decode a FlashVars attribute in one pass.
+
+    Args:
+        raw: The attribute as found in the page (HTML- and URL-encoded)
+
+    Returns:
+        dict with:
+        - 'flashvars': every key with a non-empty value other than "none"
+        - 'equipment': equipped item names by slot (Weapon, Armor, ...)
+        - 'cosmetics': cosmetic item names by slot
+    """
+    values: Dict[str, str] = {}
+    sections: Dict[str, Dict[str, str]] = {'equipment': {}, 'cosmetics': {}}
+
+    for param in raw.replace('&amp;', '&').split('&'):
+        key, sep, value = param.partition('=')
+        if not sep or not value:
+            continue
+
+        decoded = _decode(value)
+        if value != 'none':
+            values[key] = decoded
+
+        slot = SLOT_TABLE.get(key)
+        if slot:
+            section = sections[slot[0]]
+            # Keep the first occurrence, matching the old per-slot re.search
+            if slot[1] not in section:
+                section[slot[1]] = decoded
+
+    return {
+        'flashvars': values,
+        'equipment': sections['equipment'],
+        'cosmetics': sections['cosmetics'],
+    }
@@ -0,0 +1,69 @@
+"""
+HTML parser backend selection for the scrapers.
+
+Every scraper walks pages with the BeautifulSoup API (find, next_sibling,
+get_text, ...), so a backend here is a BeautifulSoup tree builder:
+
+- "html.parser": pure Python, always available (default)
+- "lxml": C parser, several times faster (pip install lxml)
+- "html5lib": browser-grade parsing, slower than the default (pip install html5lib)
+
+The backend is chosen with the HTML_PARSER environment variable. A backend
+that is not installed falls back to "html.parser" with a warning, so setting
+HTML_PARSER=lxml on a host without lxml never breaks lookups.
+
+Compare backends on saved pages with benchmarks/bench_parsers.py before
+switching; it also checks that the parsed fields stay identical.
+"""
+
+import os
+from typing import List, Optional
+
+from bs4 import BeautifulSoup, FeatureNotFound
+
+
+DEFAULT_BACKEND = "html.parser"
+BACKENDS = ("html.parser", "lxml", "html5lib")
+
+
+def backend_available(name: str) -> bool:
+    """Return True if BeautifulSoup can build trees with the given backend."""
+    try:
+        BeautifulSoup("", name)
+    except FeatureNotFound:
+        return False
+    return True
+
+
+def available_backends() -> List[str]:
+    """List the known backends installed on this host."""
+    return [name for name in BACKENDS if backend_available(name)]
+
+
+def resolve_backend(name: Optional[str]) -> str:
+    """Map a configured backend name to one that is usable here."""
+    name = (name or DEFAULT_BACKEND).strip().lower()
+    if name not in BACKENDS:
+        print(f"Warning: Unknown HTML_PARSER '{name}', using {DEFAULT_BACKEND}")
+        return DEFAULT_BACKEND
+    if not backend_available(name):
+        print(f"Warning: HTML_PARSER '{name}' is not installed, using {DEFAULT_BACKEND}")
+        return DEFAULT_BACKEND
+    return name
+
+
+HTML_PARSER = resolve_backend(os.environ.get("HTML_PARSER", DEFAULT_BACKEND))
+
+
+def make_soup(html: str, backend: Optional[str] = None) -> BeautifulSoup:
+    """
+    Build a BeautifulSoup tree with the configured backend.
+
+    Args:
+        html: The page HTML
+        backend: Override the configured backend (must already be resolved)
+
+    Returns:
+        The parsed BeautifulSoup tree
+    """
+    return BeautifulSoup(html, backend or HTML_PARSER)
@@ -0,0 +1,180 @@
+"""
+Shared HTTP clients for the scrapers.
+
+Every scraper used to open its own httpx client per call, throwing away the
+TCP/TLS connection (and the DNS lookup) after a single request. This module
+keeps one keep-alive client per upstream origin (scheme + host + port) for
+the whole process, so lookups against account.aq.com or the wiki reuse warm
+connections:
+
+- Each origin gets its own connection pool with the limits below
+- HTTP/2 is negotiated when the `h2` package is installed (pip install h2);
+  the upstream falls back to HTTP/1.1 if it does not support it
+- Clients are created lazily on first use and bound to the running event
+  loop; a client left over from a loop that has since closed is replaced
+- close_http_clients() closes every client; the bot calls it from
+  VerificationBot.close() and the scraper service when it shuts down
+- Every request goes through its host's rate limiter and circuit breaker
+  (upstream_guard.py)
+
+get_sync_http_client() returns the same kind of pooled, guarded client for
+the few blocking callers (scraper.get_character_info).
+
+Configuration (environment variables):
+- HTTP_POOL_MAX_CONNECTIONS: connections per origin (default 20)
+- HTTP_POOL_MAX_KEEPALIVE: idle connections kept per origin (default 10)
+- HTTP_POOL_KEEPALIVE_EXPIRY: seconds an idle connection is kept (default 60)
+- HTTP_TIMEOUT: default request timeout in seconds (default 10); callers
+  can pass their own per request
+- HTTP_CLIENT_HTTP2: auto (default, use HTTP/2 when h2 is installed), 1 or 0
+"""
+
+import asyncio
+import importlib.util
+import os
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from upstream_guard import GuardedSyncTransport, GuardedTransport
+
+
+HTTP_POOL_MAX_CONNECTIONS = int(os.environ.get("HTTP_POOL_MAX_CONNECTIONS", "20"))
+HTTP_POOL_MAX_KEEPALIVE = int(os.environ.get("HTTP_POOL_MAX_KEEPALIVE", "10"))
+HTTP_POOL_KEEPALIVE_EXPIRY = float(os.environ.get("HTTP_POOL_KEEPALIVE_EXPIRY", "60"))
+HTTP_TIMEOUT = float(os.environ.get("HTTP_TIMEOUT", "10"))
+
+
+def h2_available() -> bool:
+    """Return True if httpx can speak HTTP/2 here (the h2 package is installed)."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def resolve_http2(setting: Optional[str]) -> bool:
+    """Map the HTTP_CLIENT_HTTP2 setting to whether HTTP/2 is enabled."""
+    setting = (setting or "auto").strip().lower()
+    if setting in ("0", "false", "no", "off"):
+        return False
+    if setting not in ("auto", "1", "true", "yes", "on"):
+        print(f"Warning: Unknown HTTP_CLIENT_HTTP2 '{setting}', using auto")
+    if h2_available():
+        return True
+    if setting != "auto":
+        print("Warning: HTTP_CLIENT_HTTP2 is set but h2 is not installed (pip install h2), using HTTP/1.1")
+    return False
+
+
+HTTP2 = resolve_http2(os.environ.get("HTTP_CLIENT_HTTP2"))
+
+
+def origin_of(url: str) -> str:
+    """Pool key for a URL: "https://account.aq.com/CharPage?id=x" -> "https://account.aq.com"."""
+    parts = urlsplit(url if "://" in url else f"https://{url}")
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}"
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=HTTP_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_POOL_MAX_KEEPALIVE,
+        keepalive_expiry=HTTP_POOL_KEEPALIVE_EXPIRY,
+    )
+
+
+class _Counter:
+    """Request hook counting what went through one origin's client."""
+
+    def __init__(self):
+        self.requests = 0
+        self.http_versions: Dict[str, int] = {}
+
+    async def on_response(self, response: httpx.Response):
+        self.count(response)
+
+    def count(self, response: httpx.Response):
+        self.requests += 1
+        version = response.http_version
+        self.http_versions[version] = self.http_versions.get(version, 0) + 1
+
+
+# origin -> (client, loop it was created on, counter)
+_clients: Dict[str, Tuple[httpx.AsyncClient, asyncio.AbstractEventLoop, _Counter]] = {}
+# origin -> (client, counter)
+_sync_clients: Dict[str, Tuple[httpx.Client, _Counter]] = {}
+_created = 0
+
+
+def get_http_client(url: str) -> httpx.AsyncClient:
+    """
+    Return the shared async client for the origin of `url`.
+
+    Must be called from a running event loop. Do not close the client; it
+    is closed by close_http_clients().
+    """
+    global _created
+    loop = asyncio.get_running_loop()
+    origin = origin_of(url)
+    entry = _clients.get(origin)
+    if entry is not None and entry[1] is loop and not entry[0].is_closed:
+        return entry[0]
+
+    # A client from a previous (now closed) loop cannot be reused or closed cleanly
+    counter = entry[2] if entry is not None else _Counter()
+    client = httpx.AsyncClient(
+        transport=GuardedTransport(httpx.AsyncHTTPTransport(http2=HTTP2, limits=_limits())),
+        timeout=HTTP_TIMEOUT,
+        event_hooks={"response": [counter.on_response]},
+    )
+    _clients[origin] = (client, loop, counter)
+    _created += 1
+    return client
+
+
+def get_sync_http_client(url: str) -> httpx.Client:
+    """Return the shared blocking client for the origin of `url` (for code outside the event loop)."""
+    global _created
+    origin = origin_of(url)
+    entry = _sync_clients.get(origin)
+    if entry is not None and not entry[0].is_closed:
+        return entry[0]
+
+    counter = entry[1] if entry is not None else _Counter()
+    client = httpx.Client(
+        transport=GuardedSyncTransport(httpx.HTTPTransport(http2=HTTP2, limits=_limits())),
+        timeout=HTTP_TIMEOUT,
+        event_hooks={"response": [counter.count]},
+    )
+    _sync_clients[origin] = (client, counter)
+    _created += 1
+    return client
+
+
+async def close_http_clients():
+    """Close every shared client (idle connections are closed right away)."""
+    loop = asyncio.get_running_loop()
+    clients = list(_clients.values())
+    sync_clients = list(_sync_clients.values())
+    _clients.clear()
+    _sync_clients.clear()
+    for client, client_loop, _ in clients:
+        if client_loop is loop:
+            await client.aclose()
+    for client, _ in sync_clients:
+        client.close()
+
+
+def http_client_stats() -> Dict[str, Any]:
+    """Shared client counters: requests and HTTP versions per origin."""
+    origins: Dict[str, Any] = {}
+    for origin, (_, _, counter) in _clients.items():
+        origins[origin] = {"requests": counter.requests, "http_versions": dict(counter.http_versions)}
+    for origin, (_, counter) in _sync_clients.items():
+        origins[f"{origin} (sync)"] = {"requests": counter.requests, "http_versions": dict(counter.http_versions)}
+    return {
+        "http2": HTTP2,
+        "clients_created": _created,
+        "max_connections": HTTP_POOL_MAX_CONNECTIONS,
+        "max_keepalive": HTTP_POOL_MAX_KEEPALIVE,
+        "origins": origins,
+    }
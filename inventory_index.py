@@ -0,0 +1,323 @@
+"""
+Compact in-memory character inventories.
+
+/CharPage/Inventory returns one JSON object per item, often thousands per
+character. Kept as decoded by json (a dict per item, with its own int and
+string objects) that costs several hundred bytes per item. CompactInventory
+stores the same data column by column instead:
+
+- Item names are interned, so the same name across characters is one string
+- Integer fields live in array('q') columns (8 bytes per item), boolean
+  fields in array('b') columns (1 byte per item)
+- Other string fields (item types, enhancements) are interned too, so each
+  column holds pointers to a handful of shared strings
+- A name -> position index (positions sorted by name, built on the first
+  lookup) answers find("item name") with a binary search instead of a scan
+
+The inventory still reads like the old list of dicts: len(), indexing,
+slicing and iteration build the item dicts on demand, so callers that only
+match names should use find() / `name in inventory` and never materialize
+them. It is not a list, though: use to_list() for a plain list of dicts
+(e.g. to modify it), and json.dumps(data, default=json_default) to
+serialize a result that contains one.
+
+read_inventory() fills one straight from a streamed HTTP body: array
+elements are decoded as soon as their bytes arrive and then dropped, so the
+whole response body and the full list of dicts are never held at once.
+
+`python benchmarks/bench_inventory.py` compares memory per character with
+the list of dicts.
+"""
+
+import json
+import sys
+from array import array
+from typing import Any, AsyncIterable, Dict, Iterable, Iterator, List, Optional
+
+# Keys that hold the item name, in order of preference
+NAME_KEYS = ("strName", "name")
+
+_WHITESPACE = " \t\n\r"
+
+
+def normalize_name(name: str) -> str:
+    """Lookup key for an item name: case and repeated whitespace ignored."""
+    return " ".join(name.split()).casefold()
+
+
+class _Column:
+    """
+    One field across every item. Held in an array while every value is an
+    int (array('q')) or every value is a bool (array('b')); becomes a list
+    (of interned strings, or whatever else the field holds) the first time
+    another value type shows up.
+    """
+
+    __slots__ = ("values", "kind", "missing")
+
+    def __init__(self):
+        self.values: Any = array("q")
+        # None until the first value, then "int", "bool" or "object"
+        self.kind: Optional[str] = None
+        # Positions of items that do not have this key
+        self.missing: Optional[set] = None
+
+    def append(self, value: Any, present: bool = True):
+        if not present:
+            self.missing = self.missing or set()
+            self.missing.add(len(self.values))
+            self.values.append(None if self.kind == "object" else 0)
+            return
+        if self.kind == "int" and type(value) is int and -2 ** 63 <= value < 2 ** 63:
+            self.values.append(value)
+            return
+        if self.kind != "object":
+            if isinstance(value, bool):
+                kind = "bool"
+            elif isinstance(value, int) and -2 ** 63 <= value < 2 ** 63:
+                kind = "int"
+            else:
+                kind = None
+            if kind is not None and self.kind in (None, kind):
+                if self.kind is None and kind == "bool":
+                    self.values = array("b", self.values)
+                self.kind = kind
+                self.values.append(value)
+                return
+            convert = bool if self.kind == "bool" else int
+            self.values = [convert(v) for v in self.values]
+            self.kind = "object"
+        self.values.append(sys.intern(value) if isinstance(value, str) else value)
+
+    def get(self, position: int) -> Any:
+        value = self.values[position]
+        return bool(value) if self.kind == "bool" else value
+
+    def has(self, position: int) -> bool:
+        return self.missing is None or position not in self.missing
+
+
+class CompactInventory:
+    """
+    A character's inventory stored column by column (see the module
+    docstring). Build one with add() / extend() or read_inventory().
+    """
+
+    def __init__(self, items: Iterable[Dict[str, Any]] = ()):
+        self._names: List[Optional[str]] = []
+        self._name_key: Optional[str] = None
+        self._columns: Dict[str, _Column] = {}
+        # Positions of the named items sorted by normalized name; built on the first lookup
+        self._order: Optional[array] = None
+        self.extend(items)
+
+    def add(self, item: Dict[str, Any]):
+        """Append one item (a dict as decoded from the inventory endpoint)."""
+        if not isinstance(item, dict):
+            raise ValueError("unexpected inventory item")
+        position = len(self._names)
+        if self._name_key is None:
+            self._name_key = next((key for key in NAME_KEYS if key in item), NAME_KEYS[0])
+
+        name = item.get(self._name_key)
+        named = isinstance(name, str)
+        # A missing or non-string name is kept as a regular field
+        self._names.append(sys.intern(name) if named else None)
+
+        columns = self._columns
+        filled = 0
+        for key, value in item.items():
+            if named and key == self._name_key:
+                continue
+            column = columns.get(key)
+            if column is None:
+                column = columns[sys.intern(key)] = _Column()
+                for _ in range(position):
+                    column.append(None, present=False)
+            column.append(value)
+            filled += 1
+        if filled < len(columns):
+            for column in columns.values():
+                if len(column.values) == position:
+                    column.append(None, present=False)
+        self._order = None
+
+    def extend(self, items: Iterable[Dict[str, Any]]):
+        for item in items:
+            self.add(item)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __getitem__(self, position):
+        """The item at `position` as a dict (built on each call); a slice gives a list of dicts."""
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self._names)))]
+        if position < 0:
+            position += len(self._names)
+        if not 0 <= position < len(self._names):
+            raise IndexError("inventory index out of range")
+        item: Dict[str, Any] = {}
+        name = self._names[position]
+        if name is not None:
+            item[self._name_key] = name
+        for key, column in self._columns.items():
+            if column.has(position):
+                item[key] = column.get(position)
+        return item
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for position in range(len(self._names)):
+            yield self[position]
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Every item as a plain dict, i.e. the list json decoded from the endpoint."""
+        return list(self)
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self.position(name) is not None
+
+    def names(self) -> List[str]:
+        """Every item name, in inventory order."""
+        return [name for name in self._names if name is not None]
+
+    def position(self, name: str) -> Optional[int]:
+        """Position of the first item named `name` (see normalize_name), or None."""
+        names = self._names
+        if self._order is None:
+            keys = {position: normalize_name(name) for position, name in enumerate(names) if name is not None}
+            # sorted() is stable, so duplicates of a name keep their inventory order
+            self._order = array("l", sorted(keys, key=keys.__getitem__))
+        order = self._order
+        key = normalize_name(name)
+        low, high = 0, len(order)
+        while low < high:
+            middle = (low + high) // 2
+            if normalize_name(names[order[middle]]) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(order) and normalize_name(names[order[low]]) == key:
+            return order[low]
+        return None
+
+    def find(self, name: str) -> Optional[Dict[str, Any]]:
+        """The first item named `name` as a dict, or None if the character does not have it."""
+        position = self.position(name)
+        return None if position is None else self[position]
+
+    def value(self, position: int, key: str, default: Any = None) -> Any:
+        """One field of one item without building the item dict."""
+        if key == self._name_key and self._names[position] is not None:
+            return self._names[position]
+        column = self._columns.get(key)
+        if column is None or not column.has(position):
+            return default
+        return column.get(position)
+
+    def nbytes(self) -> int:
+        """
+        Approximate memory held by this inventory, counting each distinct
+        string once (interned strings shared with other inventories included).
+        """
+        seen = set()
+
+        def size(obj):
+            if id(obj) in seen:
+                return 0
+            seen.add(id(obj))
+            return sys.getsizeof(obj)
+
+        total = size(self) + size(self._names) + size(self._columns)
+        total += size(self._order) if self._order is not None else 0
+        total += sum(size(name) for name in self._names if name is not None)
+        for key, column in self._columns.items():
+            total += size(key) + size(column) + size(column.values)
+            total += size(column.missing) if column.missing is not None else 0
+            if isinstance(column.values, list):
+                total += sum(size(value) for value in column.values)
+        return total
+
+
+def json_default(obj: Any) -> Any:
+    """json.dumps `default` hook writing a CompactInventory as its list of items."""
+    if isinstance(obj, CompactInventory):
+        return obj.to_list()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class _ArrayDecoder:
+    """
+    Incremental decoder for a top-level JSON array. feed() takes text as it
+    arrives and returns the elements completed by it; only the unfinished
+    tail (at most one element) is kept between calls.
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._started = False
+        self._expect_comma = False
+        self._done = False
+        self._count = 0
+
+    def feed(self, text: str, final: bool = False) -> List[Any]:
+        buffer = self._buffer + text
+        position = 0
+        elements = []
+        while True:
+            while position < len(buffer) and buffer[position] in _WHITESPACE:
+                position += 1
+            if position >= len(buffer):
+                break
+            char = buffer[position]
+            if self._done:
+                raise ValueError("unexpected data after the inventory list")
+            if not self._started:
+                if char != "[":
+                    raise ValueError("unexpected data format")
+                self._started = True
+                position += 1
+            elif char == "]" and (self._expect_comma or not self._count):
+                self._done = True
+                position += 1
+            elif char == ",":
+                if not self._expect_comma:
+                    raise ValueError("malformed inventory list")
+                self._expect_comma = False
+                position += 1
+            elif self._expect_comma:
+                raise ValueError("malformed inventory list")
+            else:
+                try:
+                    element, end = self._decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if final:
+                        raise ValueError("malformed inventory list")
+                    break  # The element is not complete yet
+                if end == len(buffer) and not final and char not in '{["':
+                    break  # A number or literal may continue in the next chunk
+                elements.append(element)
+                self._count += 1
+                self._expect_comma = True
+                position = end
+        self._buffer = buffer[position:]
+        if final and not self._done:
+            raise ValueError("truncated inventory list")
+        return elements
+
+
+async def read_inventory(chunks: AsyncIterable[str]) -> CompactInventory:
+    """
+    Build a CompactInventory from the text of a JSON list as it arrives
+    (e.g. httpx's response.aiter_text()).
+
+    Raises:
+        ValueError: The body is not a JSON list of objects
+    """
+    inventory = CompactInventory()
+    decoder = _ArrayDecoder()
+    async for text in chunks:
+        inventory.extend(decoder.feed(text))
+    inventory.extend(decoder.feed("", final=True))
+    return inventory
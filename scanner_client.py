@@ -1,44 +1,669 @@
 #!/usr/bin/env python3
 """
 Character data client for the scraper TCP service.
+
+Lookups go over a small pool of warm framed connections (see
+char_protocol.py), so a burst of `/char` commands shares a few sockets and
+their requests are pipelined. If the service only speaks the legacy one-shot
+protocol, the client falls back to a connection per lookup.
+
+Pool configuration (environment variables):
+- CHAR_DATA_POOL_MIN: connections kept open even when idle (default 1)
+- CHAR_DATA_POOL_MAX: maximum open connections (default 4)
+- CHAR_DATA_POOL_IDLE_TIMEOUT: seconds before an idle connection above the
+  minimum is closed (default 300)
+- CHAR_DATA_POOL_MAX_IN_FLIGHT: requests pipelined on one connection before
+  callers wait for a free slot (default 32)
+- CHAR_DATA_POOL_PROBE_INTERVAL: seconds between health probes of idle
+  connections (default 30)
+
+CHAR_DATA_FORMAT picks the payload format asked for on new connections:
+"json" (default) or "msgpack" (compact binary, needs `pip install msgpack`).
+Services that do not support it answer in JSON.
+
+Set CHAR_DATA_SOCKET to a Unix socket path to reach a service on the same
+host without going through TCP; otherwise CHAR_DATA_HOST/CHAR_DATA_PORT
+are used.
+
+Every lookup carries the time the client is still willing to wait
+("timeout_ms"), so the service stops work on requests nobody is waiting for.
+
+When the service answers "busy" it includes a retry hint; lookups wait that
+long and try again, up to CHAR_DATA_BUSY_RETRIES times (default 3) within
+the lookup timeout.
 """
 
 import os
 import json
 import asyncio
+import itertools
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from char_protocol import (
+    CODECS, FORMAT_NEGOTIATION_VERSION, JSON, PREAMBLE_SIZE, PROTOCOL_VERSION, Codec, FrameReader,
+    ProtocolError, encode_frame, parse_preamble, preamble, resolve_format,
+)
 
 HOST = os.environ.get("CHAR_DATA_HOST", "127.0.0.1")
 PORT = int(os.environ.get("CHAR_DATA_PORT", "4568"))
+# Unix domain socket path; takes precedence over HOST/PORT when set
+SOCKET_PATH = os.environ.get("CHAR_DATA_SOCKET") or None
+WIRE_FORMAT = resolve_format(os.environ.get("CHAR_DATA_FORMAT"))
+
+POOL_MIN_SIZE = int(os.environ.get("CHAR_DATA_POOL_MIN", "1"))
+POOL_MAX_SIZE = max(1, int(os.environ.get("CHAR_DATA_POOL_MAX", "4")))
+POOL_IDLE_TIMEOUT = float(os.environ.get("CHAR_DATA_POOL_IDLE_TIMEOUT", "300"))
+POOL_MAX_IN_FLIGHT = max(1, int(os.environ.get("CHAR_DATA_POOL_MAX_IN_FLIGHT", "32")))
+POOL_PROBE_INTERVAL = float(os.environ.get("CHAR_DATA_POOL_PROBE_INTERVAL", "30"))
+BUSY_RETRIES = max(0, int(os.environ.get("CHAR_DATA_BUSY_RETRIES", "3")))
+# One-shot lookups in flight at once when a batch falls back to the legacy protocol
+ONESHOT_BATCH_CONCURRENCY = 8
+
+UNAVAILABLE_ERROR = "The character data service is currently unavailable. Please try again later."
+BUSY_ERROR = "The character data service is busy. Please try again shortly."
+
+
+async def _open_stream(host: str, port: int, path: Optional[str], timeout: float):
+    """Open a stream to the service over its Unix socket if `path` is set, otherwise TCP."""
+    if path:
+        return await asyncio.wait_for(asyncio.open_unix_connection(path), timeout=timeout)
+    return await asyncio.wait_for(asyncio.open_connection(host, port), timeout=timeout)
+
+
+def _address(host: str, port: int, path: Optional[str]) -> str:
+    return path if path else f"{host}:{port}"
+
+
+class CharDataConnection:
+    """One framed connection carrying pipelined, out-of-order requests."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, version: int,
+                 codec: Codec = JSON):
+        self.version = version
+        self.codec = codec
+        self._writer = writer
+        self._frames = FrameReader(reader, codec=codec)
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._streams: Dict[int, asyncio.Queue] = {}
+        self._closed = False
+        self._read_task = asyncio.create_task(self._read_loop())
+
+        # Managed by CharDataClient's pool
+        self.leases = 0
+        self.last_used = time.monotonic()
+
+    @classmethod
+    async def open(cls, host: str = HOST, port: int = PORT, timeout: float = 15.0,
+                   path: Optional[str] = SOCKET_PATH, codec: Codec = WIRE_FORMAT) -> "CharDataConnection":
+        """
+        Connect and negotiate the framed protocol (ProtocolError if the service is legacy-only).
+
+        Asks for `codec` as the payload format when it is not JSON and the
+        service is new enough; falls back to JSON otherwise.
+        """
+        reader, writer = await _open_stream(host, port, path, timeout)
+        try:
+            writer.write(preamble(PROTOCOL_VERSION))
+            await writer.drain()
+            reply = await asyncio.wait_for(reader.read(PREAMBLE_SIZE), timeout=timeout)
+            while reply and len(reply) < PREAMBLE_SIZE:
+                more = await asyncio.wait_for(reader.read(PREAMBLE_SIZE - len(reply)), timeout=timeout)
+                if not more:
+                    break
+                reply += more
+            version = parse_preamble(reply)
+            if codec is not JSON and version >= FORMAT_NEGOTIATION_VERSION:
+                codec = await cls._negotiate_format(reader, writer, codec, timeout)
+            else:
+                codec = JSON
+        except BaseException:
+            writer.close()
+            raise
+        return cls(reader, writer, version, codec)
+
+    @staticmethod
+    async def _negotiate_format(reader, writer, codec: Codec, timeout: float) -> Codec:
+        """Send "hello" (in JSON) before any other request; returns the format the service chose."""
+        writer.write(encode_frame({"id": 0, "op": "hello", "formats": [codec.name, JSON.name]}))
+        await writer.drain()
+        reply = await asyncio.wait_for(FrameReader(reader).read_frame(), timeout=timeout)
+        if reply is None:
+            raise ConnectionError("Connection closed during format negotiation")
+        chosen = (reply.get("data") or {}).get("format") if reply.get("status") == "ok" else None
+        return CODECS.get(chosen, JSON)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending) + len(self._streams)
+
+    async def _send(self, message: Dict[str, Any], request_id: int):
+        if self._closed:
+            raise ConnectionError("Connection to the character data service is closed")
+        try:
+            self._writer.write(encode_frame({**message, "id": request_id}, self.codec))
+            await self._writer.drain()
+        except (ConnectionError, OSError):
+            self._closed = True
+            raise
+
+    async def request(self, message: Dict[str, Any], timeout: float = 15.0) -> Dict[str, Any]:
+        """Send one request and wait for its response frame."""
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            await self._send(message, request_id)
+            return await asyncio.wait_for(future, timeout=timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def stream(self, message: Dict[str, Any], timeout: float = 15.0) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Send one request and yield its response frames as they arrive.
+
+        The stream ends after the server's "done" or "error" frame.
+        `timeout` bounds the wait for each frame, not the whole stream.
+        """
+        request_id = next(self._ids)
+        frames: asyncio.Queue = asyncio.Queue()
+        self._streams[request_id] = frames
+        try:
+            await self._send(message, request_id)
+            while True:
+                frame = await asyncio.wait_for(frames.get(), timeout=timeout)
+                if isinstance(frame, Exception):
+                    raise frame
+                yield frame
+                if frame.get("status") in ("done", "error"):
+                    return
+        finally:
+            self._streams.pop(request_id, None)
+
+    async def _read_loop(self):
+        error: Exception = ConnectionError("Character data service closed the connection")
+        try:
+            while True:
+                message = await self._frames.read_frame()
+                if message is None:
+                    break
+                request_id = message.get("id")
+                frames = self._streams.get(request_id)
+                if frames is not None:
+                    frames.put_nowait(message)
+                    continue
+                future = self._pending.get(request_id)
+                if future is not None and not future.done():
+                    future.set_result(message)
+        except (ProtocolError, ConnectionError, OSError) as e:
+            error = ConnectionError(f"Character data connection failed: {e}")
+        finally:
+            self._closed = True
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            for frames in self._streams.values():
+                frames.put_nowait(error)
+            self._writer.close()
+
+    async def close(self):
+        self._closed = True
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+        await asyncio.gather(self._read_task, return_exceptions=True)
+
+
+def _unwrap(response: Dict[str, Any]) -> Dict[str, Any]:
+    if response.get("status") == "ok":
+        return response.get("data")
+    return {"error": response.get("error", "Failed to retrieve valid character data.")}
 
 
 class CharDataClient:
-    """Async client wrapper around the character data TCP service."""
+    """
+    Async client for the character data TCP service with a pool of warm connections.
 
-    def __init__(self, host: str = HOST, port: int = PORT, timeout: float = 15.0):
+    A lookup leases a connection: an idle one if available, otherwise a new
+    one while the pool is below `max_size`, otherwise the least busy one
+    with fewer than `max_in_flight` requests pipelined on it. When every
+    connection is full, callers wait and the wait time is recorded.
+
+    A background task probes idle connections with `ping`, closes the ones
+    that fail or sat idle past `idle_timeout` (never going below
+    `min_size`) and reopens connections up to `min_size`. Closed
+    connections are replaced on the next lookup, and a lookup that hits a
+    dead connection is retried once on a fresh one.
+    """
+
+    def __init__(self, host: str = HOST, port: int = PORT, timeout: float = 15.0,
+                 min_size: int = POOL_MIN_SIZE, max_size: int = POOL_MAX_SIZE,
+                 idle_timeout: float = POOL_IDLE_TIMEOUT, max_in_flight: int = POOL_MAX_IN_FLIGHT,
+                 probe_interval: float = POOL_PROBE_INTERVAL, path: Optional[str] = SOCKET_PATH,
+                 wire_format: Codec = WIRE_FORMAT):
         self.host = host
         self.port = port
+        self.path = path
+        self.wire_format = wire_format
+        self.address = _address(host, port, path)
         self.timeout = timeout
+        self.max_size = max_size
+        self.min_size = min(min_size, max_size)
+        self.idle_timeout = idle_timeout
+        self.max_in_flight = max_in_flight
+        self.probe_interval = probe_interval
+
+        self._connections: List[CharDataConnection] = []
+        self._opening = 0
+        self._waiting = 0
+        self._condition: Optional[asyncio.Condition] = None
+        self._maintenance: Optional[asyncio.Task] = None
+        self._legacy = False
+
+        self.acquires = 0
+        self.connects = 0
+        self.reconnects = 0
+        self.evictions = 0
+        self.probe_failures = 0
+        self.busy_retries = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _cond(self) -> asyncio.Condition:
+        # Created lazily so it belongs to the running event loop
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def _prune(self):
+        alive = [connection for connection in self._connections if not connection.closed]
+        if len(alive) != len(self._connections):
+            self._connections = alive
+
+    def _pick(self) -> Optional[CharDataConnection]:
+        idle = [c for c in self._connections if c.leases == 0]
+        if idle:
+            return idle[0]
+        if len(self._connections) + self._opening < self.max_size:
+            return None
+        available = [c for c in self._connections if c.leases < self.max_in_flight]
+        return min(available, key=lambda c: c.leases) if available else None
+
+    async def _open(self) -> CharDataConnection:
+        """Open a connection, marking the slot as taken while the handshake runs (lock held on entry)."""
+        cond = self._cond()
+        self._opening += 1
+        cond.release()
+        try:
+            connection = await CharDataConnection.open(self.host, self.port, self.timeout, self.path,
+                                                       self.wire_format)
+        finally:
+            await cond.acquire()
+            self._opening -= 1
+            cond.notify_all()
+        self._connections.append(connection)
+        self.connects += 1
+        return connection
+
+    async def _acquire(self) -> CharDataConnection:
+        cond = self._cond()
+        started = time.monotonic()
+        async with cond:
+            while True:
+                self._prune()
+                connection = self._pick()
+                if connection is not None:
+                    break
+                if len(self._connections) + self._opening < self.max_size:
+                    connection = await self._open()
+                    break
+                self._waiting += 1
+                try:
+                    await cond.wait()
+                finally:
+                    self._waiting -= 1
+            connection.leases += 1
 
-    async def get_char_data(self, char_name: str):
-        return await get_char_data(char_name, host=self.host, port=self.port, timeout=self.timeout)
+        waited = time.monotonic() - started
+        self.acquires += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+
+        if self._maintenance is None or self._maintenance.done():
+            self._maintenance = asyncio.create_task(self._maintain())
+        return connection
+
+    async def _release(self, connection: CharDataConnection):
+        async with self._cond():
+            connection.leases -= 1
+            connection.last_used = time.monotonic()
+            self._cond().notify_all()
+
+    async def request(self, message: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Send one framed request over a pooled connection (ProtocolError if the service is legacy-only)."""
+        timeout = self.timeout if timeout is None else timeout
+        for attempt in range(2):
+            connection = await self._acquire()
+            try:
+                return await connection.request(message, timeout=timeout)
+            except asyncio.TimeoutError:
+                raise
+            except (ConnectionError, OSError):
+                # The connection died under us; replace it and retry once
+                if attempt:
+                    raise
+                self.reconnects += 1
+            finally:
+                await self._release(connection)
+
+    async def _maintain(self):
+        """Probe idle connections, evict stale ones and keep `min_size` warm."""
+        while (self._connections or self.min_size) and not self._legacy:
+            await asyncio.sleep(self.probe_interval)
+            now = time.monotonic()
+
+            for connection in list(self._connections):
+                if connection.closed or connection.leases:
+                    continue
+                if now - connection.last_used > self.idle_timeout and len(self._connections) > self.min_size:
+                    self.evictions += 1
+                    self._connections.remove(connection)
+                    await connection.close()
+                    continue
+                try:
+                    await connection.request({"op": "ping"}, timeout=min(self.timeout, 5.0))
+                except (asyncio.TimeoutError, ConnectionError, OSError):
+                    self.probe_failures += 1
+                    if connection in self._connections:
+                        self._connections.remove(connection)
+                    await connection.close()
+
+            async with self._cond():
+                self._prune()
+                try:
+                    while len(self._connections) + self._opening < self.min_size:
+                        await self._open()
+                except (asyncio.TimeoutError, OSError, ProtocolError):
+                    pass  # Service is down; the next lookup reports it
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool counters: connections in use/idle, waiters and time spent waiting for a connection."""
+        connections = [c for c in self._connections if not c.closed]
+        in_use = sum(1 for c in connections if c.leases)
+        return {
+            "address": self.address,
+            # Format each open connection negotiated (the service may answer JSON to a msgpack request)
+            "formats": sorted({c.codec.name for c in connections}),
+            "size": len(connections),
+            "in_use": in_use,
+            "idle": len(connections) - in_use,
+            "in_flight": sum(c.leases for c in connections),
+            "waiting": self._waiting,
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "acquires": self.acquires,
+            "connects": self.connects,
+            "reconnects": self.reconnects,
+            "evictions": self.evictions,
+            "probe_failures": self.probe_failures,
+            "busy_retries": self.busy_retries,
+            "wait_avg_ms": round(self.wait_total / self.acquires * 1000, 2) if self.acquires else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 2),
+            "legacy": self._legacy,
+        }
+
+    async def get_char_data(self, char_name: str, timeout: Optional[float] = None):
+        """Look up one character, returning the data dict or {"error": ...}."""
+        timeout = self.timeout if timeout is None else timeout
+        if self._legacy:
+            return await get_char_data_oneshot(char_name, self.host, self.port, timeout, self.path)
+
+        deadline = time.monotonic() + timeout
+        for attempt in range(BUSY_RETRIES + 1):
+            remaining = max(deadline - time.monotonic(), 0.1)
+            try:
+                # The service gives up (and stops fetching) once our remaining budget is spent
+                response = await self.request(
+                    {"op": "lookup", "name": char_name, "timeout_ms": int(remaining * 1000)},
+                    timeout=remaining,
+                )
+            except ProtocolError:
+                print(f"Scanner service at {self.address} does not speak the framed protocol; using one-shot mode")
+                self._legacy = True
+                return await get_char_data_oneshot(char_name, self.host, self.port, timeout, self.path)
+            except asyncio.TimeoutError:
+                print(f"Timed out waiting for scanner data for '{char_name}'")
+                return {"error": "Failed to retrieve valid character data."}
+            except (ConnectionError, OSError) as e:
+                # Catches: ConnectionRefusedError, ConnectionResetError, socket.gaierror (DNS failures),
+                # and other network-related OSErrors
+                print(f"Error connecting to scanner service: {e}")
+                return {"error": UNAVAILABLE_ERROR}
+
+            if response.get("status") != "busy" or attempt == BUSY_RETRIES:
+                break
+            # Service is shedding load: wait as long as it asked, if the deadline allows
+            delay = response.get("retry_after_ms", 250) / 1000
+            if time.monotonic() + delay >= deadline:
+                break
+            self.busy_retries += 1
+            await asyncio.sleep(delay)
+        return _unwrap(response)
+
+    async def iter_char_data(self, names: Iterable[str],
+                             timeout: Optional[float] = None) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Look up many characters in one batch request.
+
+        Yields (name, data) pairs as the service finishes each name, so the
+        order is not preserved. Duplicate and blank names are dropped. Every
+        name is yielded exactly once; failures are yielded as {"error": ...}.
+        Names the service refused as busy are requested again after its
+        retry hint, up to CHAR_DATA_BUSY_RETRIES rounds.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        remaining = list(dict.fromkeys(name.strip() for name in names if name and name.strip()))
+        finished = set()
+
+        for busy_round in range(BUSY_RETRIES + 1):
+            if not remaining or self._legacy:
+                break
+
+            busy: Dict[str, int] = {}
+            async for name, data, retry_after_ms in self._stream_batch(remaining, timeout):
+                if retry_after_ms is not None:
+                    busy[name] = retry_after_ms
+                else:
+                    finished.add(name)
+                    yield name, data
+
+            if self._legacy:
+                break
+            remaining = [name for name in remaining if name in busy]
+            if remaining and busy_round < BUSY_RETRIES:
+                self.busy_retries += 1
+                await asyncio.sleep(max(busy.values()) / 1000)
+        else:
+            for name in remaining:
+                yield name, {"error": BUSY_ERROR}
+            return
+
+        # Legacy service: one connection per name, a few at a time
+        remaining = [name for name in remaining if name not in finished]
+        semaphore = asyncio.Semaphore(ONESHOT_BATCH_CONCURRENCY)
+
+        async def lookup(name):
+            async with semaphore:
+                return name, await get_char_data_oneshot(name, self.host, self.port, timeout, self.path)
+
+        for done in asyncio.as_completed([lookup(name) for name in remaining]):
+            yield await done
+
+    async def _stream_batch(self, names: List[str], timeout: float):
+        """
+        Run one batch request, yielding (name, data, retry_after_ms) per name.
+
+        retry_after_ms is None for a result and the service's hint for a name
+        refused as busy. If the connection drops mid-batch, the names still
+        outstanding are requested again once on a fresh connection. Sets the
+        client to legacy mode (yielding nothing) if the service has no framed
+        protocol.
+        """
+        for attempt in range(2):
+            try:
+                connection = await self._acquire()
+            except ProtocolError:
+                print(f"Scanner service at {self.address} does not speak the framed protocol; using one-shot mode")
+                self._legacy = True
+                return
+            except (asyncio.TimeoutError, OSError) as e:
+                print(f"Error connecting to scanner service: {e}")
+                for name in names:
+                    yield name, {"error": UNAVAILABLE_ERROR}, None
+                return
+
+            outstanding = set(names)
+            try:
+                message = {"op": "batch", "names": names, "timeout_ms": int(timeout * 1000)}
+                async for frame in connection.stream(message, timeout=timeout):
+                    name = frame.get("name")
+                    status = frame.get("status")
+                    if status in ("ok", "busy") and name in outstanding:
+                        outstanding.discard(name)
+                        if status == "busy":
+                            yield name, None, frame.get("retry_after_ms", 250)
+                        else:
+                            yield name, frame.get("data"), None
+                    elif status == "error":
+                        for name in names:
+                            if name in outstanding:
+                                yield name, {"error": frame.get("error", "Failed to retrieve valid character data.")}, None
+                        return
+                return
+            except asyncio.TimeoutError:
+                print(f"Timed out waiting for scanner batch data ({len(outstanding)} names outstanding)")
+                for name in names:
+                    if name in outstanding:
+                        yield name, {"error": "Failed to retrieve valid character data."}, None
+                return
+            except (ConnectionError, OSError) as e:
+                print(f"Scanner connection error during batch: {e}")
+                names = [name for name in names if name in outstanding]
+                if attempt:
+                    for name in names:
+                        yield name, {"error": UNAVAILABLE_ERROR}, None
+                    return
+                self.reconnects += 1
+            finally:
+                await self._release(connection)
+
+    async def get_char_data_batch(self, names: Iterable[str],
+                                  timeout: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """Look up many characters in one batch request; returns {name: data}."""
+        return {name: data async for name, data in self.iter_char_data(names, timeout=timeout)}
+
+    async def service_stats(self) -> Dict[str, Any]:
+        """Fetch the service's counters (cache hit rates, ...) with the "stats" op."""
+        try:
+            return _unwrap(await self.request({"op": "stats"}))
+        except ProtocolError:
+            return {"error": "The character data service does not support stats."}
+        except (asyncio.TimeoutError, ConnectionError, OSError) as e:
+            print(f"Error fetching scanner service stats: {e}")
+            return {"error": UNAVAILABLE_ERROR}
+
+    async def health(self, timeout: float = 3.0) -> Dict[str, Any]:
+        """
+        Ask the service whether it is live and ready ({"live", "ready", "reasons", ...}).
+
+        Never raises: an unreachable service is reported as not live. Services
+        without the "health" op (older framed or legacy one-shot) count as
+        ready once they accept a connection.
+        """
+        if not self._legacy:
+            try:
+                response = await self.request({"op": "health"}, timeout=timeout)
+            except ProtocolError:
+                self._legacy = True
+            except asyncio.TimeoutError:
+                return {"live": False, "ready": False, "reasons": [f"no answer within {timeout:.0f}s"]}
+            except (ConnectionError, OSError) as e:
+                return {"live": False, "ready": False, "reasons": [f"unreachable: {e}"]}
+            else:
+                if response.get("status") == "ok":
+                    return response["data"]
+                return {"live": True, "ready": True, "reasons": []}
+
+        try:
+            _, writer = await _open_stream(self.host, self.port, self.path, timeout)
+        except (asyncio.TimeoutError, OSError) as e:
+            return {"live": False, "ready": False, "reasons": [f"unreachable: {e}"]}
+        writer.close()
+        return {"live": True, "ready": True, "reasons": []}
 
     async def __call__(self, char_name: str):
         """Allow instances to be called directly for backwards compatibility."""
         return await self.get_char_data(char_name)
 
+    async def close(self):
+        """Stop the maintenance task and close every pooled connection."""
+        if self._maintenance is not None:
+            self._maintenance.cancel()
+            await asyncio.gather(self._maintenance, return_exceptions=True)
+            self._maintenance = None
+        connections, self._connections = self._connections, []
+        await asyncio.gather(*(c.close() for c in connections), return_exceptions=True)
+
+
+# Shared clients (and their pools) per service address
+_clients: Dict[Tuple[str, int, Optional[str]], CharDataClient] = {}
+
 
-async def get_char_data(char_name: str, host: str = HOST, port: int = PORT, timeout: float = 15.0):
+def get_client(host: str = HOST, port: int = PORT, path: Optional[str] = SOCKET_PATH) -> CharDataClient:
+    """Return the shared pooled client for a service address."""
+    key = (host, port, path)
+    client = _clients.get(key)
+    if client is None:
+        client = _clients[key] = CharDataClient(host, port, path=path)
+    return client
+
+
+async def close_clients():
+    """Close every shared client (call on shutdown)."""
+    clients = list(_clients.values())
+    _clients.clear()
+    await asyncio.gather(*(client.close() for client in clients), return_exceptions=True)
+
+
+async def get_char_data(char_name: str, host: str = HOST, port: int = PORT, timeout: float = 15.0,
+                        path: Optional[str] = SOCKET_PATH):
     """Connects to the scanner service and retrieves character data."""
+    return await get_client(host, port, path).get_char_data(char_name, timeout=timeout)
+
+
+async def get_char_data_batch(names: Iterable[str], host: str = HOST, port: int = PORT,
+                              timeout: float = 15.0, path: Optional[str] = SOCKET_PATH) -> Dict[str, Dict[str, Any]]:
+    """Retrieves character data for many names over one batch request; returns {name: data}."""
+    return await get_client(host, port, path).get_char_data_batch(names, timeout=timeout)
+
+
+async def get_char_data_oneshot(char_name: str, host: str = HOST, port: int = PORT, timeout: float = 15.0,
+                                path: Optional[str] = SOCKET_PATH):
+    """Legacy lookup: one connection per request, raw name in, JSON until EOF out."""
     try:
-        reader, writer = await asyncio.wait_for(
-            asyncio.open_connection(host, port),
-            timeout=timeout
-        )
+        reader, writer = await _open_stream(host, port, path, timeout)
     except (asyncio.TimeoutError, OSError) as e:
         # Catches: ConnectionRefusedError, ConnectionResetError, socket.gaierror (DNS failures),
         # and other network-related OSErrors
         print(f"Error connecting to scanner service: {e}")
-        return {"error": "The character data service is currently unavailable. Please try again later."}
+        return {"error": UNAVAILABLE_ERROR}
 
     writer.write(char_name.encode())
     await writer.drain()
@@ -61,4 +686,3 @@ async def get_char_data(char_name: str, host: str = HOST, port: int = PORT, time
         await writer.wait_closed()
 
     return char_data
-
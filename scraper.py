@@ -6,6 +6,8 @@ This module combines multiple parsing strategies for robust character data extra
 2. HTML label parsing: Extracts level, class, faction, guild from div.card-body labels (MultusAQW approach)
 3. Fallback parsing: Uses _first_text_by_label for additional robustness
 4. API endpoints: Fetches badges and inventory counts from CharPage JSON endpoints
+   (concurrently, each with its own deadline; see ScrapeOptions to skip them).
+   The inventory is streamed into a CompactInventory (inventory_index.py)
 
 Improvements over base implementation:
 - Cleaner ccid extraction using regex helper
@@ -15,20 +17,43 @@ Improvements over base implementation:
 - Validation of JSON response formats
 """
 
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, Tuple, Union
+import os
 import re
-import requests
-from urllib.parse import unquote_plus
 from bs4 import BeautifulSoup
 from bs4.element import NavigableString
-import aiohttp
 import asyncio
 import httpx
+from html import unescape
 from urllib.parse import quote, urlparse, urlunparse
 
+from charpage_cache import fetch_charpage
+from flashvars import decode_flashvars, find_flashvars
+from html_parser import make_soup
+from http_clients import close_http_clients, get_http_client, get_sync_http_client
+from inventory_index import CompactInventory, read_inventory
+
 
 BASE = "https://account.aq.com/CharPage"
 
+# Parse only the header/card-body region in parse_character_info (set to 0 to always parse the full page)
+TARGETED_PARSE = os.environ.get("CHARPAGE_TARGETED_PARSE", "1") != "0"
+
+# Deadline for each CharPage JSON endpoint (badges, inventory) fetched by scrape_character
+SUBRESOURCE_TIMEOUT = 10.0
+
+_H1_RE = re.compile(r'<h1[\s>]', re.IGNORECASE)
+_CARD_BODY_RE = re.compile(r'<div\b[^>]*\bclass="[^"]*\bcard-body\b[^"]*"[^>]*>', re.IGNORECASE)
+_DIV_TAG_RE = re.compile(r'<(/?)div\b[^>]*>', re.IGNORECASE)
+
+# Identity fast path (parse_identity)
+_IDENTITY_NAME_RE = re.compile(r'<h1\b[^>]*>(.*?)</h1>', re.IGNORECASE | re.DOTALL)
+_IDENTITY_GUILD_RE = re.compile(
+    r'<label\b[^>]*>\s*Guild\s*:?\s*</label>\s*(?:<a\b[^>]*>(.*?)</a>|([^<]*))',
+    re.IGNORECASE | re.DOTALL
+)
+_TAG_RE = re.compile(r'<[^>]+>')
+
 
 def extract_ccid(html: str) -> Optional[int]:
     """
@@ -94,87 +119,84 @@ def _first_text_by_label(soup: BeautifulSoup, label: str) -> Optional[str]:
     return None
 
 
-def get_character_info(char_id: str) -> Dict[str, Optional[str]]:
-    params = {"id": char_id}
-    try:
-        resp = requests.get(BASE, params=params, timeout=10)
-    except Exception as e:
-        raise RuntimeError(f"Network error when fetching character page: {e}")
-    if resp.status_code != 200:
-        raise RuntimeError(f"Character page returned status {resp.status_code}")
+def _div_end(html: str, start: int) -> Optional[int]:
+    """End of the </div> closing the div whose opening tag ends at `start`, or None."""
+    depth = 1
+    for tag in _DIV_TAG_RE.finditer(html, start):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            return tag.end()
+    return None
 
-    html = resp.text
-    soup = BeautifulSoup(html, "html.parser")
 
-    result = {
-        "name": None,
-        "guild": None,
-        "class": None,
-        "level": None,
-        "experience": None,
-        "health": None,
-        "mana": None,
-        "raw_html": html
-    }
+def locate_charpage_fragment(html: str) -> Optional[Tuple[int, int, str]]:
+    """
+    Locate the character header and its div.card-body in the raw CharPage HTML.
 
-    for tagname in ("h1", "h2", "h3", "title"):
-        t = soup.find(tagname)
-        if t and t.text.strip():
-            text = t.text.strip()
-            if len(text) <= 40:  # heuristic length
-                result["name"] = text
-                break
+    Two layouts are recognised:
+    - "enclosing": the first <h1> sits inside a card-body; the fragment is the
+      outermost card-body containing it
+    - "following": the first <h1> comes before the card-body; the fragment
+      runs from the <h1> to the closing tag of the card-body that follows it
 
-    if not result["name"]:
-        result["name"] = _first_text_by_label(soup, "Character") or _first_text_by_label(soup, "Name")
+    Returns:
+        (start, end, layout) of the fragment, or None if it cannot be found
+    """
+    header = _H1_RE.search(html)
+    if not header:
+        return None
 
-    result["guild"] = _first_text_by_label(soup, "Guild")
-    if not result["guild"]:
-        # Only match guild in proper HTML structure, not in item filenames
-        m = re.search(r"Guild[:\s]*<[^>]*>([^<]+)</", html, re.I)
-        if m:
-            guild_text = m.group(1).strip()
-            # Filter out empty values and common placeholder text
-            if guild_text and guild_text not in ('---', 'None', 'N/A'):
-                result["guild"] = guild_text
-    # Removed overly-greedy fallback regex that was matching item filenames like "GuildBigCloak-8May14.swf"
+    for card_body in _CARD_BODY_RE.finditer(html, 0, header.start()):
+        end = _div_end(html, card_body.end())
+        if end is not None and end > header.start():
+            return card_body.start(), end, "enclosing"
 
-    result["class"] = _first_text_by_label(soup, "Class")
+    card_body = _CARD_BODY_RE.search(html, header.start())
+    if not card_body:
+        return None
+    end = _div_end(html, card_body.end())
+    if end is None:
+        return None
+    return header.start(), end, "following"
 
-    level_text = _first_text_by_label(soup, "Level")
-    if level_text:
-        m = re.search(r"\d+", level_text)
-        if m:
-            result["level"] = m.group(0)
 
-    result["experience"] = _first_text_by_label(soup, "Experience") or _first_text_by_label(soup, "EXP")
+def _charpage_fragment(html: str) -> Optional[str]:
+    """The header/card-body slice of the CharPage (see locate_charpage_fragment), or None."""
+    location = locate_charpage_fragment(html)
+    if location is None:
+        return None
+    start, end, _ = location
+    return html[start:end]
 
-    result["health"] = _first_text_by_label(soup, "Health") or _first_text_by_label(soup, "HP")
 
-    result["mana"] = _first_text_by_label(soup, "Mana") or _first_text_by_label(soup, "MP")
+def parse_character_info(html: str, targeted: Optional[bool] = None) -> Dict[str, Optional[str]]:
+    """
+    Parse name, guild, class, level and stats from CharPage HTML.
 
-    for key in result:
-        if key not in ("raw_html", "ccid"):
-            val = result[key]
-            result[key] = val.strip() if val and val.strip() else None
+    In targeted mode only the header and div.card-body fragment is built into
+    a tree, which is several times cheaper than parsing the whole page. The
+    full page is parsed when the fragment cannot be located or has no name.
 
-    return result
+    Args:
+        html: The HTML content of the CharPage
+        targeted: Parse only the header/card-body fragment (defaults to CHARPAGE_TARGETED_PARSE)
 
+    Returns:
+        dict with the parsed fields, the ccid and the raw HTML
+    """
+    if targeted is None:
+        targeted = TARGETED_PARSE
 
-async def get_character_info_async(char_id: str, session: aiohttp.ClientSession) -> Dict[str, Optional[str]]:
-    params = {"id": char_id}
-    try:
-        async with session.get(BASE, params=params, timeout=aiohttp.ClientTimeout(total=5)) as resp:
-            if resp.status != 200:
-                raise RuntimeError(f"Character page returned status {resp.status}")
-            html = await resp.text()
-    except asyncio.TimeoutError:
-        raise RuntimeError(f"Timeout when fetching character page (server took too long)")
-    except Exception as e:
-        raise RuntimeError(f"Network error when fetching character page: {e}")
+    fragment = _charpage_fragment(html) if targeted else None
+    if fragment is not None:
+        result = _extract_character_info(make_soup(fragment), html)
+        if result["name"]:
+            return result
+
+    return _extract_character_info(make_soup(html), html)
 
-    soup = BeautifulSoup(html, "html.parser")
 
+def _extract_character_info(soup: BeautifulSoup, html: str) -> Dict[str, Optional[str]]:
     result = {
         "name": None,
         "guild": None,
@@ -234,6 +256,97 @@ async def get_character_info_async(char_id: str, session: aiohttp.ClientSession)
     return result
 
 
+def get_character_info(char_id: str) -> Dict[str, Optional[str]]:
+    params = {"id": char_id}
+    try:
+        resp = get_sync_http_client(BASE).get(BASE, params=params, timeout=10, follow_redirects=True)
+    except Exception as e:
+        raise RuntimeError(f"Network error when fetching character page: {e}")
+    if resp.status_code != 200:
+        raise RuntimeError(f"Character page returned status {resp.status_code}")
+
+    html = resp.text
+    return parse_character_info(html)
+
+
+async def _fetch_charpage_async(char_id: str) -> str:
+    params = {"id": char_id}
+
+    async def _fetch():
+        resp = await get_http_client(BASE).get(BASE, params=params, timeout=5, follow_redirects=True)
+        return resp.status_code, resp.text
+
+    try:
+        status, html = await fetch_charpage(char_id, _fetch)
+        if status != 200:
+            raise RuntimeError(f"Character page returned status {status}")
+    except (asyncio.TimeoutError, httpx.TimeoutException):
+        raise RuntimeError(f"Timeout when fetching character page (server took too long)")
+    except Exception as e:
+        raise RuntimeError(f"Network error when fetching character page: {e}")
+
+    return html
+
+
+async def get_character_info_async(char_id: str) -> Dict[str, Optional[str]]:
+    html = await _fetch_charpage_async(char_id)
+    return parse_character_info(html)
+
+
+def _clean_fragment(fragment: str) -> str:
+    return unescape(_TAG_RE.sub('', fragment)).strip()
+
+
+def parse_identity(html: str) -> Dict[str, Any]:
+    """
+    Extract only the name, guild and ccid from CharPage HTML.
+
+    Uses compiled regexes over the raw text and falls back to the soup parser
+    (parse_character_info) when the header or the Guild label is not found.
+    The guild is the text shown after the label, as parse_character_info
+    returns it ("None" stays "None"); an empty or placeholder value
+    (":", "---") is left to the soup parser, which looks further.
+
+    Args:
+        html: The HTML content of the CharPage
+
+    Returns:
+        dict with 'name', 'guild' and 'ccid' (each may be None)
+    """
+    name_match = _IDENTITY_NAME_RE.search(html)
+    guild_match = _IDENTITY_GUILD_RE.search(html)
+    if name_match and guild_match:
+        name = _clean_fragment(name_match.group(1))
+        guild_text = guild_match.group(1) if guild_match.group(1) is not None else guild_match.group(2)
+        guild = _clean_fragment(guild_text)
+
+        if name and len(name) <= 40 and guild and guild not in (':', '---'):
+            return {"name": name, "guild": guild, "ccid": extract_ccid(html)}
+
+    info = parse_character_info(html)
+    return {"name": info["name"], "guild": info["guild"], "ccid": info["ccid"]}
+
+
+async def fetch_identity(char_id: str) -> Dict[str, Any]:
+    """
+    Fetch only the name, guild and ccid of a character (verification fast path).
+
+    The CharPage request goes through the shared account.aq.com client
+    (http_clients.py).
+
+    Args:
+        char_id: The character IGN
+
+    Returns:
+        dict with 'name', 'guild' and 'ccid'
+
+    Raises:
+        RuntimeError: If the CharPage could not be fetched
+    """
+    html = await _fetch_charpage_async(char_id)
+    return parse_identity(html)
+
+
 def get_value_after_label(label) -> Union[str, Dict[str, str], None]:
     """
     Get the value after a label element.
@@ -290,17 +403,248 @@ def get_value_after_label(label) -> Union[str, Dict[str, str], None]:
     return None
 
 
-async def scrape_character(username: str) -> Optional[Dict[str, Any]]:
+def parse_character_page(html: str, username: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse the /char data (labels, FlashVars items, badge, ccid) from CharPage HTML.
+    Badge and inventory counts are left at 0; they come from separate endpoints.
+
+    Args:
+        html: The HTML content of the CharPage
+        username: The character username that was looked up (used in log messages)
+
+    Returns:
+        dict with character data or None if the page has no character header
+    """
+    soup = make_soup(html)
+
+    # Extract character name from h1
+    name_elem = soup.find('h1')
+    if not name_elem:
+        print(f'Warning: No h1 element found for character {username}')
+        return None
+
+    name = name_elem.get_text(strip=True)
+
+    tagline_elem = soup.find('h4')
+    tagline = tagline_elem.get_text(strip=True) if tagline_elem else ''
+
+    character_data: Dict[str, Any] = {
+        'name': name,
+        'tagline': tagline,
+        'level': None,
+        'class': None,
+        'faction': None,
+        'guild': None,
+        'equipment': {},
+        'cosmetics': {},
+        'badge': None,
+        'character_image': None,
+        'badges_count': 0,
+        'inventory_count': 0,
+        'ccid': None,  # Character ID (unique identifier)
+        'flashvars': {}  # Store all FlashVars for downstream consumers
+    }
+
+    # Parse FlashVars to get both equipped and cosmetics items
+    flashvars_raw = find_flashvars(html)
+    if flashvars_raw:
+        character_data.update(decode_flashvars(flashvars_raw))
+
+    # Parse labels using improved method (inspired by MultusAQW)
+    # Try div.card-body label approach first (more robust)
+    card_body = soup.find('div', class_='card-body')
+    if card_body:
+        labels = card_body.find_all('label')
+        label_data = {}
+
+        for label in labels:
+            label_text = label.get_text(strip=True).rstrip(':')
+            value = get_value_after_label(label)
+
+            if value:
+                if isinstance(value, str):
+                    label_data[label_text] = value
+                elif isinstance(value, dict):
+                    label_data[label_text] = value
+
+        # Map parsed data
+        if 'Level' in label_data:
+            character_data['level'] = label_data['Level'] if isinstance(label_data['Level'], str) else label_data['Level']['text']
+        if 'Class' in label_data:
+            character_data['class'] = label_data['Class']
+        if 'Faction' in label_data:
+            character_data['faction'] = label_data['Faction'] if isinstance(label_data['Faction'], str) else label_data['Faction']['text']
+        if 'Guild' in label_data:
+            character_data['guild'] = label_data['Guild'] if isinstance(label_data['Guild'], str) else label_data['Guild']['text']
+    else:
+        # Fallback to old method if card-body not found
+        labels = soup.find_all('label')
+
+        for label in labels:
+            label_text = label.get_text(strip=True).rstrip(':')
+            value = get_value_after_label(label)
+
+            if not value:
+                continue
+
+            if label_text == 'Level':
+                character_data['level'] = value if isinstance(value, str) else value['text']
+            elif label_text == 'Class':
+                if isinstance(value, dict):
+                    character_data['class'] = {'text': value['text'], 'url': value['url']}
+                else:
+                    character_data['class'] = value
+            elif label_text == 'Faction':
+                character_data['faction'] = value if isinstance(value, str) else value['text']
+            elif label_text == 'Guild':
+                character_data['guild'] = value if isinstance(value, str) else value['text']
+
+    # Equipment and cosmetics are now parsed from FlashVars above
+
+    badge_images = soup.find_all('img')
+    for img in badge_images:
+        src = img.get('src')
+        if src and isinstance(src, str) and 'badges' in src:
+            if not src.startswith('http'):
+                src = 'https://game.aq.com' + src
+            character_data['badge'] = src
+            break
+
+    # Note: Character visual image is dynamically generated by Flash/JavaScript
+    # and cannot be extracted without browser automation (Playwright)
+    # which requires system dependencies not available in this environment
+
+    # Extract ccid using improved regex method
+    ccid = extract_ccid(html)
+    if ccid:
+        character_data['ccid'] = ccid
+
+    return character_data
+
+
+class ScrapeOptions:
+    """
+    What scrape_character fetches besides the CharPage itself.
+
+    Args:
+        badges: Fetch /CharPage/Badges for badges_count
+        inventory: Fetch /CharPage/Inventory for inventory_count and inventory_items
+            (a CompactInventory)
+        badges_timeout: Deadline for the badges request in seconds
+        inventory_timeout: Deadline for the inventory request in seconds
+    """
+
+    def __init__(self, badges: bool = True, inventory: bool = True,
+                 badges_timeout: float = SUBRESOURCE_TIMEOUT, inventory_timeout: float = SUBRESOURCE_TIMEOUT):
+        self.badges = badges
+        self.inventory = inventory
+        self.badges_timeout = badges_timeout
+        self.inventory_timeout = inventory_timeout
+
+
+# Only the CharPage: no badge or inventory requests
+PAGE_ONLY = ScrapeOptions(badges=False, inventory=False)
+
+
+async def _fetch_json_list(client: httpx.AsyncClient, url: str, headers: Dict[str, str], timeout: float) -> list:
+    """
+    GET a CharPage JSON endpoint that returns a list, within `timeout` seconds
+    (including any wait for the rate limiter).
+
+    Raises:
+        asyncio.TimeoutError: The deadline passed
+        RuntimeError: Non-200 status
+        ValueError: The body is not a JSON list
+    """
+    response = await asyncio.wait_for(client.get(url, headers=headers, timeout=timeout), timeout)
+    if response.status_code != 200:
+        raise RuntimeError(f'status {response.status_code}')
+    data = response.json()
+    if not isinstance(data, list):
+        raise ValueError('unexpected data format')
+    return data
+
+
+async def _fetch_inventory(client: httpx.AsyncClient, url: str, headers: Dict[str, str],
+                           timeout: float) -> CompactInventory:
+    """
+    Stream /CharPage/Inventory into a CompactInventory within `timeout`
+    seconds; items are indexed as they arrive instead of decoding the whole
+    body into a list of dicts first.
+
+    Raises:
+        asyncio.TimeoutError: The deadline passed
+        RuntimeError: Non-200 status
+        ValueError: The body is not a JSON list of items
+    """
+    async def _stream():
+        async with client.stream('GET', url, headers=headers, timeout=timeout) as response:
+            if response.status_code != 200:
+                raise RuntimeError(f'status {response.status_code}')
+            return await read_inventory(response.aiter_text())
+
+    return await asyncio.wait_for(_stream(), timeout)
+
+
+async def _fetch_subresources(client: httpx.AsyncClient, ccid: int, headers: Dict[str, str],
+                              character_data: Dict[str, Any], options: ScrapeOptions, username: str):
+    """
+    Fetch the badges and inventory endpoints concurrently into character_data.
+
+    A sub-resource that fails or misses its deadline leaves its fields at
+    their defaults and is listed in character_data['subresource_errors'];
+    the others are still filled in.
+    """
+    jobs = {}
+    if options.badges:
+        jobs['badges'] = _fetch_json_list(
+            client, f'https://account.aq.com/CharPage/Badges?ccid={ccid}', headers, options.badges_timeout)
+    if options.inventory:
+        jobs['inventory'] = _fetch_inventory(
+            client, f'https://account.aq.com/CharPage/Inventory?ccid={ccid}', headers, options.inventory_timeout)
+
+    results = await asyncio.gather(*jobs.values(), return_exceptions=True)
+    for name, result in zip(jobs, results):
+        if isinstance(result, BaseException):
+            if isinstance(result, asyncio.TimeoutError):
+                timeout = options.badges_timeout if name == 'badges' else options.inventory_timeout
+                error = f'timed out after {timeout:g}s'
+            else:
+                error = str(result) or type(result).__name__
+            character_data.setdefault('subresource_errors', {})[name] = error
+            print(f'Error fetching {name} for {username}: {error}')
+        elif name == 'badges':
+            character_data['badges_count'] = len(result)
+        else:
+            character_data['inventory_count'] = len(result)
+            character_data['inventory_items'] = result  # CompactInventory, for OCR matching (find() by name)
+
+
+async def scrape_character(username: str, options: Optional[ScrapeOptions] = None) -> Optional[Dict[str, Any]]:
     """
     Scrape character data from account.aq.com for /char command
     Combines FlashVars parsing with HTML label extraction for robustness
-    
+
+    Once the CharPage is parsed, the badges and inventory endpoints are
+    fetched concurrently, each with its own deadline. If one of them fails
+    the result is still returned, with that sub-resource's fields left at 0
+    and the failure listed under 'subresource_errors'.
+
     Args:
         username: The character username to look up
-        
+        options: Which sub-resources to fetch and their deadlines (default:
+            both, SUBRESOURCE_TIMEOUT each). Pass PAGE_ONLY to skip them.
+
     Returns:
-        dict with character data or None if not found
+        dict with character data or None if not found. 'inventory_items' is
+        an inventory_index.CompactInventory, not a list: it supports len(),
+        indexing, slicing, iteration and find(name) / `name in ...`; call
+        to_list() for a plain list of dicts, and pass
+        default=inventory_index.json_default to json.dumps.
     """
+    if options is None:
+        options = ScrapeOptions()
+
     url = f'https://account.aq.com/CharPage?id={username}'
     
     headers = {
@@ -308,206 +652,29 @@ async def scrape_character(username: str) -> Optional[Dict[str, Any]]:
     }
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url, headers=headers)
-            
-            if response.status_code == 404:
-                return None
-                
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Extract character name from h1
-            name_elem = soup.find('h1')
-            if not name_elem:
-                print(f'Warning: No h1 element found for character {username}')
-                return None
-            
-            name = name_elem.get_text(strip=True)
-            
-            tagline_elem = soup.find('h4')
-            tagline = tagline_elem.get_text(strip=True) if tagline_elem else ''
-            
-            character_data: Dict[str, Any] = {
-                'name': name,
-                'tagline': tagline,
-                'level': None,
-                'class': None,
-                'faction': None,
-                'guild': None,
-                'equipment': {},
-                'cosmetics': {},
-                'badge': None,
-                'character_image': None,
-                'badges_count': 0,
-                'inventory_count': 0,
-                'ccid': None,  # Character ID (unique identifier)
-                'flashvars': {}  # Store all FlashVars for downstream consumers
-            }
-            
-            # Parse FlashVars to get both equipped and cosmetics items
-            flashvars_match = re.search(r'flashvars="([^"]+)"', response.text, re.IGNORECASE)
-            if flashvars_match:
-                flashvars_raw = flashvars_match.group(1)
-                # Decode HTML entities
-                flashvars_raw = flashvars_raw.replace('&amp;', '&')
-                
-                # Parse all FlashVars into a dict for any downstream tooling
-                for param in flashvars_raw.split('&'):
-                    if '=' in param:
-                        key, value = param.split('=', 1)
-                        if value and value != 'none':
-                            # URL-decode the value so downstream consumers get clean strings
-                            character_data['flashvars'][key] = unquote_plus(value)
-                
-                # Parse equipped items (names and files) - URL decode all values
-                equipped_weapon = re.search(r'strWeaponName=([^&]+)', flashvars_raw)
-                equipped_armor = re.search(r'strArmorName=([^&]+)', flashvars_raw)
-                equipped_helm = re.search(r'strHelmName=([^&]+)', flashvars_raw)
-                equipped_cape = re.search(r'strCapeName=([^&]+)', flashvars_raw)
-                equipped_pet = re.search(r'strPetName=([^&]+)', flashvars_raw)
-                equipped_misc = re.search(r'strMiscName=([^&]+)', flashvars_raw)
-
-                if equipped_weapon and equipped_weapon.group(1):
-                    character_data['equipment']['Weapon'] = unquote_plus(equipped_weapon.group(1))
-                if equipped_armor and equipped_armor.group(1):
-                    character_data['equipment']['Armor'] = unquote_plus(equipped_armor.group(1))
-                if equipped_helm and equipped_helm.group(1):
-                    character_data['equipment']['Helm'] = unquote_plus(equipped_helm.group(1))
-                if equipped_cape and equipped_cape.group(1):
-                    character_data['equipment']['Cape'] = unquote_plus(equipped_cape.group(1))
-                if equipped_pet and equipped_pet.group(1):
-                    character_data['equipment']['Pet'] = unquote_plus(equipped_pet.group(1))
-                if equipped_misc and equipped_misc.group(1):
-                    character_data['equipment']['Misc'] = unquote_plus(equipped_misc.group(1))
-                
-                # Parse cosmetics items (strCust prefix)
-                cosmetic_weapon = re.search(r'strCustWeaponName=([^&]+)', flashvars_raw)
-                cosmetic_armor = re.search(r'strCustArmorName=([^&]+)', flashvars_raw)
-                cosmetic_helm = re.search(r'strCustHelmName=([^&]+)', flashvars_raw)
-                cosmetic_cape = re.search(r'strCustCapeName=([^&]+)', flashvars_raw)
-                cosmetic_pet = re.search(r'strCustPetName=([^&]+)', flashvars_raw)
-                
-                if cosmetic_weapon and cosmetic_weapon.group(1):
-                    character_data['cosmetics']['Weapon'] = unquote_plus(cosmetic_weapon.group(1))
-                if cosmetic_armor and cosmetic_armor.group(1):
-                    character_data['cosmetics']['Armor'] = unquote_plus(cosmetic_armor.group(1))
-                if cosmetic_helm and cosmetic_helm.group(1):
-                    character_data['cosmetics']['Helm'] = unquote_plus(cosmetic_helm.group(1))
-                if cosmetic_cape and cosmetic_cape.group(1):
-                    character_data['cosmetics']['Cape'] = unquote_plus(cosmetic_cape.group(1))
-                if cosmetic_pet and cosmetic_pet.group(1):
-                    character_data['cosmetics']['Pet'] = unquote_plus(cosmetic_pet.group(1))
-            
-            # Parse labels using improved method (inspired by MultusAQW)
-            # Try div.card-body label approach first (more robust)
-            card_body = soup.find('div', class_='card-body')
-            if card_body:
-                labels = card_body.find_all('label')
-                label_data = {}
-                
-                for label in labels:
-                    label_text = label.get_text(strip=True).rstrip(':')
-                    value = get_value_after_label(label)
-                    
-                    if value:
-                        if isinstance(value, str):
-                            label_data[label_text] = value
-                        elif isinstance(value, dict):
-                            label_data[label_text] = value
-                
-                # Map parsed data
-                if 'Level' in label_data:
-                    character_data['level'] = label_data['Level'] if isinstance(label_data['Level'], str) else label_data['Level']['text']
-                if 'Class' in label_data:
-                    character_data['class'] = label_data['Class']
-                if 'Faction' in label_data:
-                    character_data['faction'] = label_data['Faction'] if isinstance(label_data['Faction'], str) else label_data['Faction']['text']
-                if 'Guild' in label_data:
-                    character_data['guild'] = label_data['Guild'] if isinstance(label_data['Guild'], str) else label_data['Guild']['text']
-            else:
-                # Fallback to old method if card-body not found
-                labels = soup.find_all('label')
-                
-                for label in labels:
-                    label_text = label.get_text(strip=True).rstrip(':')
-                    value = get_value_after_label(label)
-                    
-                    if not value:
-                        continue
-                    
-                    if label_text == 'Level':
-                        character_data['level'] = value if isinstance(value, str) else value['text']
-                    elif label_text == 'Class':
-                        if isinstance(value, dict):
-                            character_data['class'] = {'text': value['text'], 'url': value['url']}
-                        else:
-                            character_data['class'] = value
-                    elif label_text == 'Faction':
-                        character_data['faction'] = value if isinstance(value, str) else value['text']
-                    elif label_text == 'Guild':
-                        character_data['guild'] = value if isinstance(value, str) else value['text']
-            
-            # Equipment and cosmetics are now parsed from FlashVars above
-            
-            badge_images = soup.find_all('img')
-            for img in badge_images:
-                src = img.get('src')
-                if src and isinstance(src, str) and 'badges' in src:
-                    if not src.startswith('http'):
-                        src = 'https://game.aq.com' + src
-                    character_data['badge'] = src
-                    break
-            
-            # Note: Character visual image is dynamically generated by Flash/JavaScript
-            # and cannot be extracted without browser automation (Playwright)
-            # which requires system dependencies not available in this environment
-            
-            # Extract ccid using improved regex method
-            ccid = extract_ccid(response.text)
-            if ccid:
-                character_data['ccid'] = ccid
-                # Fetch badges count
-                try:
-                    badges_response = await client.get(
-                        f'https://account.aq.com/CharPage/Badges?ccid={ccid}',
-                        headers=headers,
-                        timeout=10.0
-                    )
-                    if badges_response.status_code == 200:
-                        try:
-                            badges_data = badges_response.json()
-                            if isinstance(badges_data, list):
-                                character_data['badges_count'] = len(badges_data)
-                            else:
-                                print(f'Unexpected badges data format for {username}')
-                        except Exception as json_err:
-                            print(f'Error parsing badges JSON for {username}: {json_err}')
-                except Exception as e:
-                    print(f'Error fetching badges for {username}: {e}')
-                
-                # Fetch inventory count
-                try:
-                    inventory_response = await client.get(
-                        f'https://account.aq.com/CharPage/Inventory?ccid={ccid}',
-                        headers=headers,
-                        timeout=10.0
-                    )
-                    if inventory_response.status_code == 200:
-                        try:
-                            inventory_data = inventory_response.json()
-                            if isinstance(inventory_data, list):
-                                character_data['inventory_count'] = len(inventory_data)
-                                character_data['inventory_items'] = inventory_data  # Store full inventory for OCR matching
-                            else:
-                                print(f'Unexpected inventory data format for {username}')
-                        except Exception as json_err:
-                            print(f'Error parsing inventory JSON for {username}: {json_err}')
-                except Exception as e:
-                    print(f'Error fetching inventory for {username}: {e}')
-            
-            return character_data
+        client = get_http_client(url)
+
+        async def _fetch():
+            page = await client.get(url, headers=headers, timeout=30.0)
+            return page.status_code, page.text
+
+        status, html = await fetch_charpage(username, _fetch)
+
+        if status == 404:
+            return None
+
+        if status != 200:
+            raise RuntimeError(f'Character page returned status {status}')
+        
+        character_data = parse_character_page(html, username)
+        if character_data is None:
+            return None
+
+        ccid = character_data['ccid']
+        if ccid and (options.badges or options.inventory):
+            await _fetch_subresources(client, ccid, headers, character_data, options, username)
+
+        return character_data
         
     except httpx.HTTPStatusError as e:
         if e.response.status_code == 404:
@@ -524,10 +691,12 @@ if __name__ == "__main__":
     if len(sys.argv) >= 2:
         cid = sys.argv[1]
         async def test():
-            async with aiohttp.ClientSession() as session:
-                info = await get_character_info_async(cid, session)
+            try:
+                info = await get_character_info_async(cid)
                 print("Name:", info['name'])
                 print("Guild:", info['guild'])
+            finally:
+                await close_http_clients()
         asyncio.run(test())
     else:
         print("Usage: python scraper.py <char_id>")
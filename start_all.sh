@@ -44,6 +44,29 @@ start_component() {
     echo ""
 }
 
+# Wait for the scraper's readiness probe (/readyz on its metrics port) before starting the bot
+wait_for_scraper() {
+    local timeout="${SCRAPER_READY_TIMEOUT:-30}"
+    local pid
+    pid="$(cat "$PID_DIR/scraper.pid")"
+
+    for _ in $(seq 1 "$timeout"); do
+        if "$PYTHON_BIN" "$PROJECT_ROOT/char_data_scraper.py" --probe > /dev/null 2>&1; then
+            echo "✓ scraper service is ready"
+            echo ""
+            return 0
+        fi
+        if ! kill -0 "$pid" 2>/dev/null; then
+            echo "⚠️  scraper service exited during startup; see $LOG_DIR/scraper.log"
+            echo ""
+            return 0
+        fi
+        sleep 1
+    done
+    echo "⚠️  scraper service not ready after ${timeout}s; starting the bot anyway"
+    echo ""
+}
+
 echo "🚀 Starting AQW Verification Bot System"
 echo "========================================"
 
@@ -53,12 +76,14 @@ kill_with_pid_file "$PID_DIR/scraper.pid" "scraper"
 start_component "scraper service" "$LOG_DIR/scraper.log" "$PID_DIR/scraper.pid" \
     "$PYTHON_BIN" "$PROJECT_ROOT/char_data_scraper.py"
 
+wait_for_scraper
+
 start_component "Discord bot" "$LOG_DIR/bot.log" "$PID_DIR/bot.pid" \
     "$PYTHON_BIN" "$PROJECT_ROOT/bot.py"
 
 echo ""
 echo "📊 System Status:"
-echo "   Scraper Service: see $LOG_DIR/scraper.log"
+echo "   Scraper Service: see $LOG_DIR/scraper.log ($PYTHON_BIN char_data_scraper.py --probe checks readiness)"
 echo "   Bot: see $LOG_DIR/bot.log"
 echo ""
 echo "Use 'tail -f <logfile>' for live logs. ✨"
@@ -0,0 +1,606 @@
+"""
+Storage backends for helper points, requester stats and verified users.
+
+The bot keeps three per-server tables:
+
+- helper points: total points, boss kills and ticket counts per helper
+- requester stats: tickets created per requester, by ticket type
+- verified users: the IGN/Guild record checked by the daily verification
+
+Two interchangeable backends are provided:
+
+- "json": the original helper_points.json / requester_stats.json /
+  verified_users.json files, rewritten atomically on every change (default)
+- "sqlite": one SQLite database in WAL mode with every table keyed by
+  (guild_id, user_id). Point and ticket increments are single-row UPSERTs,
+  so a button click no longer reads and rewrites a whole file.
+
+The first time the SQLite backend opens a new database it imports the
+existing JSON files. The import can also be run by hand:
+
+    python storage.py import [--force]
+
+The bot talks to the backend through AsyncStorage, which runs every read,
+serialization and disk write on one dedicated writer thread so interaction
+handlers never block the event loop on file I/O. Running everything on one
+thread also keeps read-modify-write updates from interleaving. Write
+latency is recorded per file in `write_stats`.
+
+Configuration (environment variables):
+- STORAGE_BACKEND: "json" (default) or "sqlite"
+- STORAGE_DB_PATH: SQLite database file (default bot_data.db next to bot.py)
+"""
+
+import asyncio
+import functools
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+
+BASE_DIR = Path(__file__).parent
+POINTS_FILE = BASE_DIR / "helper_points.json"
+REQUESTER_FILE = BASE_DIR / "requester_stats.json"
+VERIFIED_USERS_FILE = BASE_DIR / "verified_users.json"
+
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "json").strip().lower()
+STORAGE_DB_PATH = Path(os.environ.get("STORAGE_DB_PATH", str(BASE_DIR / "bot_data.db")))
+
+# (guild_id, user_id) -> user record, or None to delete the record
+VerifiedUserChanges = Dict[Tuple[str, str], Optional[Dict[str, Any]]]
+
+
+class WriteStats:
+    """Per-file write counters and latency (serialization + write + fsync + rename)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._files: Dict[str, Dict[str, float]] = {}
+
+    @contextmanager
+    def timed(self, name: str):
+        """Time a write to `name`; the block may set `bytes` on the yielded dict."""
+        sample = {"bytes": 0}
+        started = time.perf_counter()
+        yield sample
+        self.record(name, time.perf_counter() - started, sample["bytes"])
+
+    def record(self, name: str, seconds: float, nbytes: int = 0):
+        with self._lock:
+            entry = self._files.setdefault(name, {"writes": 0, "bytes": 0, "total_s": 0.0, "max_s": 0.0, "last_s": 0.0})
+            entry["writes"] += 1
+            entry["bytes"] += nbytes
+            entry["total_s"] += seconds
+            entry["max_s"] = max(entry["max_s"], seconds)
+            entry["last_s"] = seconds
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Writes, bytes and average/max/last latency in milliseconds, per file."""
+        with self._lock:
+            return {
+                name: {
+                    "writes": entry["writes"],
+                    "bytes": entry["bytes"],
+                    "avg_ms": round(entry["total_s"] / entry["writes"] * 1000, 2),
+                    "max_ms": round(entry["max_s"] * 1000, 2),
+                    "last_ms": round(entry["last_s"] * 1000, 2),
+                }
+                for name, entry in self._files.items()
+            }
+
+
+write_stats = WriteStats()
+
+
+def atomic_write_json(path: Path, data: Any) -> int:
+    """Write JSON to a temp file and rename it over `path`; returns bytes written."""
+    path = Path(path)
+    with write_stats.timed(path.name) as sample:
+        payload = json.dumps(data, indent=2).encode()
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        sample["bytes"] = len(payload)
+    return len(payload)
+
+
+def read_json(path: Path) -> Dict[str, Any]:
+    """Load a JSON file, treating a missing file as empty."""
+    if not path.exists():
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def helper_record(value: Any) -> Dict[str, Any]:
+    """Upgrade a stored helper entry (old files store just the point total)."""
+    if isinstance(value, (int, float)):
+        return {"total_points": value, "bosses": {}, "tickets_joined": 0, "tickets_completed": 0}
+    return value
+
+
+class JSONStorage:
+    """Storage backed by the original per-table JSON files."""
+
+    name = "json"
+
+    def __init__(self, points_file: Path = POINTS_FILE, requester_file: Path = REQUESTER_FILE,
+                 verified_users_file: Path = VERIFIED_USERS_FILE):
+        self.points_file = Path(points_file)
+        self.requester_file = Path(requester_file)
+        self.verified_users_file = Path(verified_users_file)
+
+    @staticmethod
+    def _guild_users(data: Dict[str, Any], guild_id: str) -> Dict[str, Any]:
+        return data.setdefault(guild_id, {"users": {}}).setdefault("users", {})
+
+    # ---- helper points ----
+
+    def guild_points(self, guild_id) -> Dict[str, Any]:
+        return read_json(self.points_file).get(str(guild_id), {}).get("users", {})
+
+    def add_points(self, guild_id, user_id, points, bosses: Iterable[str]):
+        data = read_json(self.points_file)
+        guild_users = self._guild_users(data, str(guild_id))
+        user = helper_record(guild_users.get(str(user_id), {"total_points": 0, "bosses": {}, "tickets_completed": 0}))
+        guild_users[str(user_id)] = user
+
+        user["total_points"] = user.get("total_points", 0) + points
+        user_bosses = user.setdefault("bosses", {})
+        for boss in bosses:
+            user_bosses[boss] = user_bosses.get(boss, 0) + 1
+        user["tickets_completed"] = user.get("tickets_completed", 0) + 1
+
+        atomic_write_json(self.points_file, data)
+        return user["total_points"]
+
+    def track_ticket_join(self, guild_id, user_id):
+        data = read_json(self.points_file)
+        guild_users = self._guild_users(data, str(guild_id))
+        user = helper_record(guild_users.get(str(user_id), {
+            "total_points": 0, "bosses": {}, "tickets_joined": 0, "tickets_completed": 0
+        }))
+        guild_users[str(user_id)] = user
+
+        user["tickets_joined"] = user.get("tickets_joined", 0) + 1
+        atomic_write_json(self.points_file, data)
+
+    # ---- requester stats ----
+
+    def guild_requester_stats(self, guild_id) -> Dict[str, Any]:
+        return read_json(self.requester_file).get(str(guild_id), {}).get("users", {})
+
+    def track_ticket_created(self, guild_id, user_id, ticket_type: str):
+        data = read_json(self.requester_file)
+        guild_users = self._guild_users(data, str(guild_id))
+        user = guild_users.setdefault(str(user_id), {"tickets_created": 0, "ticket_types": {}})
+
+        user["tickets_created"] = user.get("tickets_created", 0) + 1
+        ticket_types = user.setdefault("ticket_types", {})
+        ticket_types[ticket_type] = ticket_types.get(ticket_type, 0) + 1
+
+        atomic_write_json(self.requester_file, data)
+        return user["tickets_created"]
+
+    def reset_leaderboard(self, guild_id):
+        """Clear helper points and requester stats for one server."""
+        guild_id = str(guild_id)
+        for path in (self.points_file, self.requester_file):
+            data = read_json(path)
+            if guild_id in data:
+                data[guild_id] = {"users": {}}
+                atomic_write_json(path, data)
+
+    # ---- verified users ----
+
+    def load_verified_users(self) -> Dict[str, Any]:
+        return read_json(self.verified_users_file)
+
+    def get_verified_user(self, guild_id, user_id) -> Optional[Dict[str, Any]]:
+        guild = self.load_verified_users().get(str(guild_id), {})
+        return guild.get("users", {}).get(str(user_id))
+
+    def set_verified_user(self, guild_id, user_id, user_data: Dict[str, Any]) -> int:
+        return self.apply_verified_user_changes({(str(guild_id), str(user_id)): user_data})
+
+    def remove_verified_user(self, guild_id, user_id) -> bool:
+        data = self.load_verified_users()
+        guild_users = data.get(str(guild_id), {}).get("users", {})
+        if guild_users.pop(str(user_id), None) is None:
+            return False
+        atomic_write_json(self.verified_users_file, data)
+        return True
+
+    def apply_verified_user_changes(self, changes: VerifiedUserChanges) -> int:
+        """Apply staged updates/removals in one atomic rewrite; returns bytes written."""
+        data = self.load_verified_users()
+        for (guild_id, user_id), user_data in changes.items():
+            guild_users = self._guild_users(data, guild_id)
+            if user_data is None:
+                guild_users.pop(user_id, None)
+            else:
+                guild_users[user_id] = user_data
+        return atomic_write_json(self.verified_users_file, data)
+
+    def close(self):
+        pass
+
+
+class SQLiteStorage:
+    """Storage backed by a single SQLite database in WAL mode."""
+
+    name = "sqlite"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS helper_points (
+            guild_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            total_points INTEGER NOT NULL DEFAULT 0,
+            tickets_joined INTEGER NOT NULL DEFAULT 0,
+            tickets_completed INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (guild_id, user_id)
+        );
+        CREATE TABLE IF NOT EXISTS helper_bosses (
+            guild_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            boss TEXT NOT NULL,
+            kills INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (guild_id, user_id, boss)
+        );
+        CREATE TABLE IF NOT EXISTS requester_stats (
+            guild_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            tickets_created INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (guild_id, user_id)
+        );
+        CREATE TABLE IF NOT EXISTS requester_ticket_types (
+            guild_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            ticket_type TEXT NOT NULL,
+            tickets INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (guild_id, user_id, ticket_type)
+        );
+        CREATE TABLE IF NOT EXISTS verified_users (
+            guild_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (guild_id, user_id)
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    def __init__(self, db_path: Path = STORAGE_DB_PATH):
+        self.db_path = Path(db_path)
+        # Opened on the bot's thread, then used only from the AsyncStorage writer thread
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+
+    @contextmanager
+    def _write(self):
+        """One timed transaction."""
+        with write_stats.timed(self.db_path.name), self._conn:
+            yield
+
+    # ---- helper points ----
+
+    def guild_points(self, guild_id) -> Dict[str, Any]:
+        guild_id = str(guild_id)
+        users = {
+            user_id: {
+                "total_points": total_points,
+                "bosses": {},
+                "tickets_joined": tickets_joined,
+                "tickets_completed": tickets_completed,
+            }
+            for user_id, total_points, tickets_joined, tickets_completed in self._conn.execute(
+                "SELECT user_id, total_points, tickets_joined, tickets_completed "
+                "FROM helper_points WHERE guild_id = ?", (guild_id,)
+            )
+        }
+        for user_id, boss, kills in self._conn.execute(
+            "SELECT user_id, boss, kills FROM helper_bosses WHERE guild_id = ?", (guild_id,)
+        ):
+            if user_id in users:
+                users[user_id]["bosses"][boss] = kills
+        return users
+
+    def add_points(self, guild_id, user_id, points, bosses: Iterable[str]):
+        key = (str(guild_id), str(user_id))
+        with self._write():
+            self._conn.execute(
+                "INSERT INTO helper_points (guild_id, user_id, total_points, tickets_completed) "
+                "VALUES (?, ?, ?, 1) "
+                "ON CONFLICT (guild_id, user_id) DO UPDATE SET "
+                "total_points = total_points + excluded.total_points, "
+                "tickets_completed = tickets_completed + 1",
+                (*key, points),
+            )
+            self._conn.executemany(
+                "INSERT INTO helper_bosses (guild_id, user_id, boss, kills) VALUES (?, ?, ?, 1) "
+                "ON CONFLICT (guild_id, user_id, boss) DO UPDATE SET kills = kills + 1",
+                [(*key, boss) for boss in bosses],
+            )
+            row = self._conn.execute(
+                "SELECT total_points FROM helper_points WHERE guild_id = ? AND user_id = ?", key
+            ).fetchone()
+        return row[0]
+
+    def track_ticket_join(self, guild_id, user_id):
+        with self._write():
+            self._conn.execute(
+                "INSERT INTO helper_points (guild_id, user_id, tickets_joined) VALUES (?, ?, 1) "
+                "ON CONFLICT (guild_id, user_id) DO UPDATE SET tickets_joined = tickets_joined + 1",
+                (str(guild_id), str(user_id)),
+            )
+
+    # ---- requester stats ----
+
+    def guild_requester_stats(self, guild_id) -> Dict[str, Any]:
+        guild_id = str(guild_id)
+        users = {
+            user_id: {"tickets_created": tickets_created, "ticket_types": {}}
+            for user_id, tickets_created in self._conn.execute(
+                "SELECT user_id, tickets_created FROM requester_stats WHERE guild_id = ?", (guild_id,)
+            )
+        }
+        for user_id, ticket_type, tickets in self._conn.execute(
+            "SELECT user_id, ticket_type, tickets FROM requester_ticket_types WHERE guild_id = ?", (guild_id,)
+        ):
+            if user_id in users:
+                users[user_id]["ticket_types"][ticket_type] = tickets
+        return users
+
+    def track_ticket_created(self, guild_id, user_id, ticket_type: str):
+        key = (str(guild_id), str(user_id))
+        with self._write():
+            self._conn.execute(
+                "INSERT INTO requester_stats (guild_id, user_id, tickets_created) VALUES (?, ?, 1) "
+                "ON CONFLICT (guild_id, user_id) DO UPDATE SET tickets_created = tickets_created + 1",
+                key,
+            )
+            self._conn.execute(
+                "INSERT INTO requester_ticket_types (guild_id, user_id, ticket_type, tickets) VALUES (?, ?, ?, 1) "
+                "ON CONFLICT (guild_id, user_id, ticket_type) DO UPDATE SET tickets = tickets + 1",
+                (*key, ticket_type),
+            )
+            row = self._conn.execute(
+                "SELECT tickets_created FROM requester_stats WHERE guild_id = ? AND user_id = ?", key
+            ).fetchone()
+        return row[0]
+
+    def reset_leaderboard(self, guild_id):
+        """Clear helper points and requester stats for one server."""
+        with self._write():
+            for table in ("helper_points", "helper_bosses", "requester_stats", "requester_ticket_types"):
+                self._conn.execute(f"DELETE FROM {table} WHERE guild_id = ?", (str(guild_id),))
+
+    # ---- verified users ----
+
+    def load_verified_users(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {}
+        for guild_id, user_id, record in self._conn.execute(
+            "SELECT guild_id, user_id, data FROM verified_users"
+        ):
+            data.setdefault(guild_id, {"users": {}})["users"][user_id] = json.loads(record)
+        return data
+
+    def get_verified_user(self, guild_id, user_id) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute(
+            "SELECT data FROM verified_users WHERE guild_id = ? AND user_id = ?",
+            (str(guild_id), str(user_id)),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set_verified_user(self, guild_id, user_id, user_data: Dict[str, Any]) -> int:
+        return self.apply_verified_user_changes({(str(guild_id), str(user_id)): user_data})
+
+    def remove_verified_user(self, guild_id, user_id) -> bool:
+        with self._write():
+            cursor = self._conn.execute(
+                "DELETE FROM verified_users WHERE guild_id = ? AND user_id = ?",
+                (str(guild_id), str(user_id)),
+            )
+        return cursor.rowcount > 0
+
+    def apply_verified_user_changes(self, changes: VerifiedUserChanges) -> int:
+        """Apply staged updates/removals in one transaction; returns bytes of record data written."""
+        upserts = [
+            (guild_id, user_id, json.dumps(user_data))
+            for (guild_id, user_id), user_data in changes.items() if user_data is not None
+        ]
+        deletes = [key for key, user_data in changes.items() if user_data is None]
+        with self._write():
+            self._conn.executemany(
+                "INSERT INTO verified_users (guild_id, user_id, data) VALUES (?, ?, ?) "
+                "ON CONFLICT (guild_id, user_id) DO UPDATE SET data = excluded.data",
+                upserts,
+            )
+            self._conn.executemany(
+                "DELETE FROM verified_users WHERE guild_id = ? AND user_id = ?", deletes
+            )
+        return sum(len(record) for _, _, record in upserts)
+
+    # ---- JSON import ----
+
+    def imported(self) -> bool:
+        return self._conn.execute("SELECT 1 FROM meta WHERE key = 'json_imported'").fetchone() is not None
+
+    def import_json(self, points_file: Path = POINTS_FILE, requester_file: Path = REQUESTER_FILE,
+                    verified_users_file: Path = VERIFIED_USERS_FILE, replace: bool = False) -> Dict[str, int]:
+        """
+        Copy the JSON files into the database, replacing rows for the same
+        (guild_id, user_id). Returns the number of users imported per table.
+
+        With replace (import --force), the per-boss and per-ticket-type rows
+        of every guild in the files are deleted first, so counts that are no
+        longer in the JSON do not survive the import.
+        """
+        counts = {"helper_points": 0, "requester_stats": 0, "verified_users": 0}
+
+        with self._write():
+            for guild_id, guild in read_json(Path(points_file)).items():
+                if replace:
+                    self._conn.execute("DELETE FROM helper_bosses WHERE guild_id = ?", (guild_id,))
+                for user_id, value in guild.get("users", {}).items():
+                    user = helper_record(value)
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO helper_points "
+                        "(guild_id, user_id, total_points, tickets_joined, tickets_completed) VALUES (?, ?, ?, ?, ?)",
+                        (guild_id, user_id, user.get("total_points", 0),
+                         user.get("tickets_joined", 0), user.get("tickets_completed", 0)),
+                    )
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO helper_bosses (guild_id, user_id, boss, kills) VALUES (?, ?, ?, ?)",
+                        [(guild_id, user_id, boss, kills) for boss, kills in user.get("bosses", {}).items()],
+                    )
+                    counts["helper_points"] += 1
+
+            for guild_id, guild in read_json(Path(requester_file)).items():
+                if replace:
+                    self._conn.execute("DELETE FROM requester_ticket_types WHERE guild_id = ?", (guild_id,))
+                for user_id, user in guild.get("users", {}).items():
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO requester_stats (guild_id, user_id, tickets_created) VALUES (?, ?, ?)",
+                        (guild_id, user_id, user.get("tickets_created", 0)),
+                    )
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO requester_ticket_types "
+                        "(guild_id, user_id, ticket_type, tickets) VALUES (?, ?, ?, ?)",
+                        [(guild_id, user_id, ticket_type, tickets)
+                         for ticket_type, tickets in user.get("ticket_types", {}).items()],
+                    )
+                    counts["requester_stats"] += 1
+
+            for guild_id, guild in read_json(Path(verified_users_file)).items():
+                for user_id, user in guild.get("users", {}).items():
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO verified_users (guild_id, user_id, data) VALUES (?, ?, ?)",
+                        (guild_id, user_id, json.dumps(user)),
+                    )
+                    counts["verified_users"] += 1
+
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_imported', ?)",
+                               (json.dumps(counts),))
+
+        return counts
+
+    def close(self):
+        self._conn.close()
+
+
+class AsyncStorage:
+    """
+    Async front end for a storage backend.
+
+    Every call is queued to a single dedicated writer thread, so the event
+    loop only awaits the result. `run()` runs any other blocking persistence
+    helper (e.g. the bot's config files) on the same thread.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="storage-writer")
+
+    @property
+    def name(self) -> str:
+        return self.backend.name
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking function on the writer thread and await its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def guild_points(self, guild_id) -> Dict[str, Any]:
+        return await self.run(self.backend.guild_points, guild_id)
+
+    async def add_points(self, guild_id, user_id, points, bosses: Iterable[str]):
+        return await self.run(self.backend.add_points, guild_id, user_id, points, list(bosses))
+
+    async def track_ticket_join(self, guild_id, user_id):
+        await self.run(self.backend.track_ticket_join, guild_id, user_id)
+
+    async def guild_requester_stats(self, guild_id) -> Dict[str, Any]:
+        return await self.run(self.backend.guild_requester_stats, guild_id)
+
+    async def track_ticket_created(self, guild_id, user_id, ticket_type: str):
+        return await self.run(self.backend.track_ticket_created, guild_id, user_id, ticket_type)
+
+    async def reset_leaderboard(self, guild_id):
+        await self.run(self.backend.reset_leaderboard, guild_id)
+
+    async def load_verified_users(self) -> Dict[str, Any]:
+        return await self.run(self.backend.load_verified_users)
+
+    async def get_verified_user(self, guild_id, user_id) -> Optional[Dict[str, Any]]:
+        return await self.run(self.backend.get_verified_user, guild_id, user_id)
+
+    async def set_verified_user(self, guild_id, user_id, user_data: Dict[str, Any]) -> int:
+        return await self.run(self.backend.set_verified_user, guild_id, user_id, user_data)
+
+    async def remove_verified_user(self, guild_id, user_id) -> bool:
+        return await self.run(self.backend.remove_verified_user, guild_id, user_id)
+
+    async def apply_verified_user_changes(self, changes: VerifiedUserChanges) -> int:
+        return await self.run(self.backend.apply_verified_user_changes, dict(changes))
+
+    async def close(self):
+        """Finish queued writes, then close the backend."""
+        await self.run(self.backend.close)
+        self._executor.shutdown(wait=True)
+
+
+def open_storage(backend: Optional[str] = None, points_file: Path = POINTS_FILE,
+                 requester_file: Path = REQUESTER_FILE, verified_users_file: Path = VERIFIED_USERS_FILE,
+                 db_path: Path = STORAGE_DB_PATH):
+    """
+    Open the configured storage backend.
+
+    The SQLite backend imports the JSON files the first time it opens a
+    database, so switching STORAGE_BACKEND keeps existing data.
+    """
+    backend = backend or STORAGE_BACKEND
+    if backend == "sqlite":
+        storage = SQLiteStorage(db_path)
+        if not storage.imported():
+            counts = storage.import_json(points_file, requester_file, verified_users_file)
+            print(f"Imported JSON data into {db_path}: {counts}")
+        return storage
+    if backend != "json":
+        print(f"Warning: Unknown STORAGE_BACKEND '{backend}', using json")
+    return JSONStorage(points_file, requester_file, verified_users_file)
+
+
+def main(argv):
+    if len(argv) < 2 or argv[1] != "import":
+        print("Usage: python storage.py import [--force]")
+        return 2
+
+    storage = SQLiteStorage(STORAGE_DB_PATH)
+    try:
+        if storage.imported() and "--force" not in argv:
+            print(f"{STORAGE_DB_PATH} already has the JSON data (use --force to import again)")
+            return 0
+        counts = storage.import_json(replace="--force" in argv)
+        print(f"Imported into {STORAGE_DB_PATH}: {counts}")
+    finally:
+        storage.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
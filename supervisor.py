@@ -0,0 +1,208 @@
+"""
+Worker-process supervision for the character data service.
+
+`Supervisor` forks N copies of a worker function, restarts any that die and
+collects the stats snapshots they report. Each worker gets one end of a
+pipe: it sends its own stats every few seconds and receives the merged
+stats of all workers in return, so a `stats` request answered by any
+worker can report the whole service.
+
+Workers that die within a few seconds of starting are restarted with an
+exponential backoff (capped at 30s) so a worker that cannot start does not
+spin the CPU.
+"""
+
+import multiprocessing
+import os
+import signal
+import time
+from multiprocessing.connection import Connection, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Keys whose merged value is the largest per-worker value rather than the sum
+_MAX_KEYS = ("ttl",)
+_MAX_PREFIXES = ("peak_",)
+_MAX_SUFFIXES = ("_max_ms", "max_ms")
+
+RESTART_BACKOFF_MAX = 30.0
+# A worker that lives at least this long resets the restart backoff
+STABLE_AFTER = 10.0
+
+
+def merge_stats(snapshots: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge per-worker stats dicts into one.
+
+    Counters are summed, peaks and maximums keep the largest value, averages
+    (keys containing "avg") are averaged, and cache hit rates are recomputed
+    from the merged hit/miss counters. Nested dicts are merged key by key.
+    """
+    snapshots = [snapshot for snapshot in snapshots if isinstance(snapshot, dict)]
+    merged: Dict[str, Any] = {}
+    keys = list(dict.fromkeys(key for snapshot in snapshots for key in snapshot))
+    for key in keys:
+        values = [snapshot[key] for snapshot in snapshots if key in snapshot]
+        if all(isinstance(value, dict) for value in values):
+            merged[key] = merge_stats(values)
+        elif all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values):
+            if key in _MAX_KEYS or key.startswith(_MAX_PREFIXES) or key.endswith(_MAX_SUFFIXES):
+                merged[key] = max(values)
+            elif "avg" in key:
+                merged[key] = round(sum(values) / len(values), 2)
+            else:
+                merged[key] = sum(values)
+        else:
+            merged[key] = values[0]
+
+    if "hit_rate" in merged and "hits" in merged and "misses" in merged:
+        hits = merged["hits"] + merged.get("coalesced", 0)
+        lookups = hits + merged["misses"]
+        merged["hit_rate"] = hits / lookups if lookups else 0.0
+    return merged
+
+
+class _Worker:
+    def __init__(self, worker_id: int):
+        self.id = worker_id
+        self.process: Optional[multiprocessing.Process] = None
+        self.conn: Optional[Connection] = None
+        self.started = 0.0
+        self.restarts = 0
+        self.backoff = 0.0
+        self.restart_at: Optional[float] = None
+        self.stats: Optional[Dict[str, Any]] = None
+
+
+class Supervisor:
+    """
+    Run and supervise worker processes.
+
+    Args:
+        target: Called in each child as target(worker_id, conn, *args).
+            It should poll `conn` for merged stats and send its own stats
+            dicts on it.
+        workers: Number of worker processes
+        args: Extra arguments passed to target (inherited, not pickled: the
+            children are forked)
+        name: Process name prefix used in logs
+    """
+
+    def __init__(self, target: Callable[..., Any], workers: int, args: tuple = (), name: str = "worker"):
+        self.target = target
+        self.args = args
+        self.name = name
+        self._ctx = multiprocessing.get_context("fork")
+        self._workers = [_Worker(worker_id) for worker_id in range(workers)]
+        self._stopping = False
+
+    def _start(self, worker: _Worker):
+        parent_conn, child_conn = self._ctx.Pipe()
+        process = self._ctx.Process(
+            target=self.target,
+            args=(worker.id, child_conn) + self.args,
+            name=f"{self.name}-{worker.id}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        worker.process, worker.conn = process, parent_conn
+        worker.started = time.monotonic()
+        worker.restart_at = None
+        worker.stats = None
+        print(f"Started {process.name} (PID {process.pid})")
+
+    def _reap(self, worker: _Worker):
+        """Handle a worker that exited and schedule its restart."""
+        process = worker.process
+        process.join()
+        worker.conn.close()
+        worker.process = worker.conn = None
+        if self._stopping:
+            return
+
+        lifetime = time.monotonic() - worker.started
+        if lifetime >= STABLE_AFTER:
+            worker.backoff = 0.0
+        else:
+            worker.backoff = min(max(worker.backoff * 2, 0.5), RESTART_BACKOFF_MAX)
+        worker.restarts += 1
+        worker.restart_at = time.monotonic() + worker.backoff
+        print(f"{process.name} (PID {process.pid}) exited with code {process.exitcode} "
+              f"after {lifetime:.1f}s; restarting in {worker.backoff:.1f}s")
+
+    def _receive(self, worker: _Worker):
+        """Store a worker's stats and answer with the merged stats."""
+        try:
+            worker.stats = worker.conn.recv()
+            worker.conn.send(self.stats())
+        except (EOFError, OSError):
+            pass  # The worker is exiting; its sentinel will fire next
+
+    def stats(self) -> Dict[str, Any]:
+        """Stats merged across the workers that have reported, plus supervision counters."""
+        merged = merge_stats(worker.stats for worker in self._workers if worker.stats)
+        merged["workers"] = {
+            "configured": len(self._workers),
+            "alive": sum(1 for worker in self._workers if worker.process and worker.process.is_alive()),
+            "reporting": sum(1 for worker in self._workers if worker.stats),
+            "restarts": sum(worker.restarts for worker in self._workers),
+        }
+        return merged
+
+    def stop(self, *_):
+        self._stopping = True
+
+    def run(self):
+        """Start the workers and supervise them until SIGINT/SIGTERM."""
+        previous = {sig: signal.signal(sig, self.stop) for sig in (signal.SIGINT, signal.SIGTERM)}
+        try:
+            for worker in self._workers:
+                self._start(worker)
+            while not self._stopping:
+                self._poll()
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+            self._shutdown()
+
+    def _poll(self):
+        now = time.monotonic()
+        waiting = [w.restart_at - now for w in self._workers if w.process is None and w.restart_at is not None]
+        timeout = max(0.0, min(waiting + [1.0]))
+
+        handles: Dict[Any, tuple] = {}
+        for worker in self._workers:
+            if worker.process is not None:
+                handles[worker.process.sentinel] = ("exit", worker)
+                handles[worker.conn] = ("stats", worker)
+        ready: List[Any] = wait(list(handles), timeout) if handles else []
+        if not handles:
+            time.sleep(timeout)
+
+        # Read stats before reaping so a dying worker's last report is kept
+        for kind, worker in sorted((handles[handle] for handle in ready), key=lambda item: item[0] != "stats"):
+            if kind == "stats" and worker.conn is not None:
+                self._receive(worker)
+            elif kind == "exit" and worker.process is not None:
+                self._reap(worker)
+
+        now = time.monotonic()
+        for worker in self._workers:
+            if worker.process is None and worker.restart_at is not None and worker.restart_at <= now:
+                self._start(worker)
+
+    def _shutdown(self, timeout: float = 10.0):
+        """Ask every worker to stop (SIGTERM), then kill any that do not exit in time."""
+        self._stopping = True
+        alive = [worker.process for worker in self._workers if worker.process is not None]
+        for process in alive:
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGTERM)
+        deadline = time.monotonic() + timeout
+        for process in alive:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                print(f"{process.name} did not stop in {timeout:.0f}s; killing it")
+                process.kill()
+                process.join()
+        print(f"All workers stopped (service stats: {self.stats()})")
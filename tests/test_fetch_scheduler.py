@@ -0,0 +1,115 @@
+"""
+Fetch priority of shared (single-flight) fetches.
+
+An interactive caller that joins a fetch started by background work must
+promote it: the shared fetch (and whatever it already queued) is served
+before other background work.
+
+Run with: python -m pytest tests/  (or python -m unittest discover tests)
+"""
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import char_data_scraper  # noqa: E402
+from admission import AdmissionControl  # noqa: E402
+from charpage_cache import TTLCache  # noqa: E402
+from fetch_scheduler import (  # noqa: E402
+    BACKGROUND, INTERACTIVE, FetchScheduler, current_priority, fetch_priority, start_shared
+)
+from upstream_guard import AdaptiveRateLimiter  # noqa: E402
+
+
+class SharedFetchPriorityTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_interactive_caller_promotes_queued_background_lookup(self):
+        # One admission slot, held while background lookups (b1, b2, x) queue behind it
+        order = []
+        release = asyncio.Event()
+
+        async def get_char_data(name, expired=None):
+            order.append(name)
+            if name == "hold":
+                await release.wait()
+            return {"name": name}
+
+        patched = {"admission": AdmissionControl(1, 16), "get_char_data": get_char_data,
+                   "result_cache": TTLCache(maxsize=16, ttl=60)}
+        saved = {name: getattr(char_data_scraper, name) for name in patched}
+        for name, value in patched.items():
+            setattr(char_data_scraper, name, value)
+        self.addCleanup(lambda: [setattr(char_data_scraper, k, v) for k, v in saved.items()])
+
+        hold = asyncio.create_task(char_data_scraper.lookup_char_data("hold"))
+        await asyncio.sleep(0)
+        with fetch_priority(BACKGROUND):
+            batch = [asyncio.create_task(char_data_scraper.lookup_char_data(n)) for n in ("b1", "b2", "x")]
+        await asyncio.sleep(0.01)
+        # "x" joins the pending background fetch, then a new interactive "y" arrives
+        joined = asyncio.create_task(char_data_scraper.lookup_char_data("x"))
+        fresh = asyncio.create_task(char_data_scraper.lookup_char_data("y"))
+        await asyncio.sleep(0.01)
+        release.set()
+        await asyncio.gather(hold, joined, fresh, *batch)
+
+        self.assertEqual(order, ["hold", "x", "y", "b1", "b2"])
+
+    async def test_interactive_caller_promotes_rate_limited_background_fetch(self):
+        scheduler = FetchScheduler(AdaptiveRateLimiter(rate=50, burst=1))
+        cache = TTLCache(maxsize=16, ttl=60)
+        order = []
+
+        def fetcher(name):
+            async def fetch():
+                await scheduler.acquire()
+                order.append(name)
+                return name
+            return fetch
+
+        await scheduler.acquire()  # Empty the bucket so every fetch below waits for a token
+        with fetch_priority(BACKGROUND):
+            batch = [asyncio.create_task(cache.get_or_fetch(n, fetcher(n))) for n in ("b1", "b2", "x")]
+        await asyncio.sleep(0)
+        joined = asyncio.create_task(cache.get_or_fetch("x", fetcher("x")))
+        await asyncio.gather(joined, *batch)
+
+        self.assertEqual(order[0], "x")
+        self.assertEqual(cache.stats()["coalesced"], 1)
+
+    async def test_promotion_reaches_nested_shared_fetches(self):
+        seen = {}
+        started = asyncio.Event()
+        promoted = asyncio.Event()
+
+        async def inner():
+            started.set()
+            await promoted.wait()
+            seen["inner"] = current_priority()
+
+        async def outer():
+            task, _ = start_shared(inner())
+            await task
+            seen["outer"] = current_priority()
+
+        with fetch_priority(BACKGROUND):
+            task, shared = start_shared(outer())
+        await started.wait()
+        shared.join(INTERACTIVE)
+        promoted.set()
+        await task
+
+        self.assertEqual(seen, {"inner": INTERACTIVE, "outer": INTERACTIVE})
+
+    async def test_background_caller_does_not_demote(self):
+        task, shared = start_shared(asyncio.sleep(0))
+        shared.join(BACKGROUND)
+        await task
+        self.assertEqual(shared.priority, INTERACTIVE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+Streamed inventory ingestion (inventory_index.read_inventory) and lookups.
+
+Run with: python -m pytest tests/  (or python -m unittest discover tests)
+"""
+
+import json
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from inventory_index import CompactInventory, json_default, read_inventory  # noqa: E402
+
+ITEMS = [
+    {"ItemID": 1000 + n, "strName": f"Item {n}", "strType": ("Sword", "Armor", "Pet")[n % 3],
+     "intCount": n, "bCoins": n % 2 == 0, "strEnh": None if n % 5 else "Lucky"}
+    for n in range(200)
+]
+ITEMS[3]["fRate"] = 1.5          # A field only one item has
+del ITEMS[10]["intCount"]         # A field one item lacks
+ITEMS[20]["intCount"] = "many"    # A numeric field with a non-int value
+ITEMS[30]["strName"] = None       # An item without a usable name
+ITEMS.append({"strName": "Blade  of AWE", "intCount": 2})
+ITEMS.append({"strName": "blade of awe", "intCount": 3})
+
+
+async def _chunks(text, size):
+    for start in range(0, len(text), size):
+        yield text[start:start + size]
+
+
+class ReadInventoryTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_round_trips_at_any_chunk_size(self):
+        body = json.dumps(ITEMS)
+        for size in (1, 7, 64, 4096, len(body)):
+            inventory = await read_inventory(_chunks(body, size))
+            self.assertEqual(len(inventory), len(ITEMS), size)
+            self.assertEqual(inventory.to_list(), ITEMS, size)
+
+    async def test_numbers_split_across_chunks(self):
+        async def body():
+            yield '[{"strName": "a", "intCount": 12'
+            yield '34}, {"strName": "b"}]'
+
+        inventory = await read_inventory(body())
+        self.assertEqual(inventory.find("a"), {"strName": "a", "intCount": 1234})
+
+    async def test_empty_list(self):
+        inventory = await read_inventory(_chunks(" [ ] ", 2))
+        self.assertEqual(len(inventory), 0)
+        self.assertNotIn("anything", inventory)
+
+    async def test_malformed_bodies(self):
+        for body in ('{"error": "not a list"}', '[{"strName": "a"}', '[{"strName": "a"},,]',
+                     '[{"strName": "a"}] trailing', '[1, 2]', '[{"strName": "a"} {"strName": "b"}]', ''):
+            with self.subTest(body=body), self.assertRaises(ValueError):
+                await read_inventory(_chunks(body, 3))
+
+
+class CompactInventoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.inventory = CompactInventory(ITEMS)
+
+    def test_find_and_contains_ignore_case_and_spacing(self):
+        self.assertEqual(self.inventory.find("item 7"), ITEMS[7])
+        self.assertIn("  ITEM   7 ", self.inventory)
+        self.assertNotIn("Item 999", self.inventory)
+        self.assertIsNone(self.inventory.find("Item 999"))
+        self.assertNotIn(7, self.inventory)
+
+    def test_duplicate_names_find_the_first(self):
+        self.assertEqual(self.inventory.find("BLADE OF AWE")["intCount"], 2)
+
+    def test_list_access(self):
+        self.assertEqual(self.inventory[-1], ITEMS[-1])
+        self.assertEqual(self.inventory[5:8], ITEMS[5:8])
+        self.assertEqual(self.inventory.to_list() + [{"strName": "new"}], ITEMS + [{"strName": "new"}])
+        with self.assertRaises(IndexError):
+            self.inventory[len(ITEMS)]
+
+    def test_json_serialization(self):
+        data = {"name": "Hero", "inventory_items": self.inventory}
+        self.assertEqual(json.loads(json.dumps(data, default=json_default)),
+                         {"name": "Hero", "inventory_items": ITEMS})
+        with self.assertRaises(TypeError):
+            json.dumps({"other": object()}, default=json_default)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,525 @@
+"""
+Adaptive rate limiting and circuit breaking per upstream host.
+
+Every request the shared HTTP clients (http_clients.py) send passes through
+the guard for its host (account.aq.com, the wiki):
+
+- An adaptive token bucket spaces requests out. Its rate grows slowly while
+  requests succeed and is halved (at most once a second) when the upstream
+  answers 429 or 5xx or times out, down to a floor. A Retry-After header on
+  a 429/503 pauses the bucket for that long.
+- A circuit breaker watches the outcome of the last requests. When too many
+  of them failed it opens and requests fail straight away with CircuitOpen
+  instead of piling onto a struggling upstream. After a cooldown one probe
+  request is let through (half-open); its success closes the breaker, its
+  failure re-opens it with a doubled cooldown (capped).
+
+404s and other 4xx answers count as successes: the upstream answered.
+Tokens are handed out in fetch priority order (fetch_scheduler.py), so
+interactive requests never queue behind background ones. An interactive
+request whose wait for a token would exceed its pool timeout fails with
+httpx.PoolTimeout instead of queueing.
+
+The blocking clients (http_clients.get_sync_http_client) go through the
+same guard with GuardedSyncTransport: the breaker is checked the same way
+and the caller sleeps until the bucket has a token.
+
+State changes (breaker opened/half-open/closed, rate cut) go to the
+registered listeners, or are printed when there are none. The guards are
+per process: the bot and each scraper service worker limit themselves.
+
+Configuration (environment variables):
+- UPSTREAM_RATE: starting and highest request rate per host, per second (default 10)
+- UPSTREAM_RATE_MIN: lowest rate the limiter backs off to (default 0.5)
+- UPSTREAM_BURST: requests allowed back to back before spacing starts (default 10)
+- UPSTREAM_BREAKER_FAILURE_RATIO: failed share of recent requests that opens the breaker (default 0.5)
+- UPSTREAM_BREAKER_MIN_REQUESTS: recent requests needed before the breaker can open (default 10)
+- UPSTREAM_BREAKER_WINDOW: recent requests the breaker looks at (default 20)
+- UPSTREAM_BREAKER_COOLDOWN: seconds the breaker stays open at first (default 30)
+- UPSTREAM_BREAKER_COOLDOWN_MAX: longest cooldown after repeated failed probes (default 300)
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from fetch_scheduler import FetchScheduler
+
+
+UPSTREAM_RATE = float(os.environ.get("UPSTREAM_RATE", "10"))
+UPSTREAM_RATE_MIN = float(os.environ.get("UPSTREAM_RATE_MIN", "0.5"))
+UPSTREAM_BURST = int(os.environ.get("UPSTREAM_BURST", "10"))
+UPSTREAM_BREAKER_FAILURE_RATIO = float(os.environ.get("UPSTREAM_BREAKER_FAILURE_RATIO", "0.5"))
+UPSTREAM_BREAKER_MIN_REQUESTS = int(os.environ.get("UPSTREAM_BREAKER_MIN_REQUESTS", "10"))
+UPSTREAM_BREAKER_WINDOW = int(os.environ.get("UPSTREAM_BREAKER_WINDOW", "20"))
+UPSTREAM_BREAKER_COOLDOWN = float(os.environ.get("UPSTREAM_BREAKER_COOLDOWN", "30"))
+UPSTREAM_BREAKER_COOLDOWN_MAX = float(os.environ.get("UPSTREAM_BREAKER_COOLDOWN_MAX", "300"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+# Numeric breaker state for gauges
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# Statuses that mean the upstream is throttling us or struggling
+THROTTLE_STATUSES = (429,)
+
+
+class CircuitOpen(httpx.TransportError):
+    """Raised instead of sending a request while the host's breaker is open."""
+
+    def __init__(self, host: str, retry_after: float, request: Optional[httpx.Request] = None):
+        super().__init__(f"{host} is failing; requests paused for {retry_after:.0f}s (circuit open)",
+                         request=request)
+        self.host = host
+        self.retry_after = retry_after
+
+
+def is_failure_status(status_code: int) -> bool:
+    """True for answers that count against the upstream (throttling or server errors)."""
+    return status_code in THROTTLE_STATUSES or status_code >= 500
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """The Retry-After header of a response in seconds (delta or HTTP date), or None."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket whose rate follows the upstream's health (additive increase,
+    multiplicative decrease).
+
+    Args:
+        rate: Starting and highest rate (requests per second)
+        min_rate: Lowest rate after backing off
+        burst: Bucket size
+        increase: Rate added per successful request
+        decrease: Factor applied to the rate on a failure
+        decrease_interval: Cut the rate at most once per this many seconds,
+            so one burst of failures does not collapse it to the floor
+    """
+
+    def __init__(self, rate: float = UPSTREAM_RATE, min_rate: float = UPSTREAM_RATE_MIN,
+                 burst: int = UPSTREAM_BURST, increase: float = 0.05, decrease: float = 0.5,
+                 decrease_interval: float = 1.0):
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.increase = increase
+        self.decrease = decrease
+        self.decrease_interval = decrease_interval
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+
+        self.acquired = 0
+        self.decreases = 0
+
+    def _refill(self, now: float):
+        self._tokens = min(float(self.burst), self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self) -> float:
+        """Seconds a request starting now would wait for its token."""
+        now = time.monotonic()
+        self._refill(now)
+        debt = max(0.0, 1 - self._tokens) / self.rate
+        return max(debt, self._paused_until - now)
+
+    def take(self):
+        """Use one token (waiting for it is up to the caller; see fetch_scheduler.py)."""
+        self._refill(time.monotonic())
+        self._tokens -= 1
+        self.acquired += 1
+
+    def refund(self):
+        """Give back a token taken for a request that was never sent."""
+        self._tokens = min(float(self.burst), self._tokens + 1)
+        self.acquired -= 1
+
+    def pause(self, seconds: float):
+        """Send nothing for `seconds` (a Retry-After from the upstream)."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def on_success(self):
+        self._refill(time.monotonic())
+        self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_failure(self) -> bool:
+        """Back off; returns True if the rate was cut."""
+        now = time.monotonic()
+        if now - self._last_decrease < self.decrease_interval or self.rate <= self.min_rate:
+            return False
+        self._refill(now)
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        self._last_decrease = now
+        self.decreases += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate": round(self.rate, 3),
+            "max_rate": self.max_rate,
+            "min_rate": self.min_rate,
+            "acquired": self.acquired,
+            "decreases": self.decreases,
+        }
+
+
+class CircuitBreaker:
+    """
+    Failure-ratio circuit breaker over the last `window` request outcomes.
+
+    Args:
+        failure_ratio: Failed share of the window that opens the breaker
+        min_requests: Outcomes needed in the window before it can open
+        window: Number of recent outcomes considered
+        cooldown: Seconds the breaker stays open before a probe is let through
+        cooldown_max: Cap for the cooldown, which doubles after each failed probe
+    """
+
+    def __init__(self, failure_ratio: float = UPSTREAM_BREAKER_FAILURE_RATIO,
+                 min_requests: int = UPSTREAM_BREAKER_MIN_REQUESTS, window: int = UPSTREAM_BREAKER_WINDOW,
+                 cooldown: float = UPSTREAM_BREAKER_COOLDOWN, cooldown_max: float = UPSTREAM_BREAKER_COOLDOWN_MAX):
+        self.failure_ratio = failure_ratio
+        self.min_requests = min_requests
+        self.base_cooldown = cooldown
+        self.cooldown_max = max(cooldown, cooldown_max)
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self._outcomes: deque = deque(maxlen=max(1, window))
+        self._opened_at = 0.0
+        self._probing = False
+
+        self.opened = 0
+        self.rejected = 0
+
+    def retry_after(self) -> float:
+        """Seconds until the breaker lets a request through (0 if it does now)."""
+        if self.state == OPEN:
+            return max(0.0, self._opened_at + self.cooldown - time.monotonic())
+        if self.state == HALF_OPEN and self._probing:
+            return min(1.0, self.cooldown)
+        return 0.0
+
+    def allow(self) -> Optional[str]:
+        """
+        Admit one request: returns the new state if admitting it changed the
+        state (open -> half_open), "" if admitted without a change, and None
+        if the request must not be sent.
+        """
+        if self.state == CLOSED:
+            return ""
+        if self.retry_after() > 0:
+            self.rejected += 1
+            return None
+        # Cooldown over (or the last probe finished): this request is the probe
+        changed = self.state != HALF_OPEN
+        self.state = HALF_OPEN
+        self._probing = True
+        return HALF_OPEN if changed else ""
+
+    def release(self):
+        """The admitted request ended without an outcome (cancelled)."""
+        self._probing = False
+
+    def record(self, failed: bool) -> Optional[str]:
+        """Record an outcome; returns the new state if it changed."""
+        if self.state == HALF_OPEN:
+            self._probing = False
+            if failed:
+                self.cooldown = min(self.cooldown * 2, self.cooldown_max)
+                return self._open()
+            self.state = CLOSED
+            self.cooldown = self.base_cooldown
+            self._outcomes.clear()
+            return CLOSED
+        if self.state == OPEN:
+            return None  # Answers to requests sent before it opened
+
+        self._outcomes.append(failed)
+        failures = sum(self._outcomes)
+        if len(self._outcomes) >= self.min_requests and failures / len(self._outcomes) >= self.failure_ratio:
+            return self._open()
+        return None
+
+    def _open(self) -> str:
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.opened += 1
+        return OPEN
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "retry_after": round(self.retry_after(), 1),
+            "cooldown": self.cooldown,
+            "opened": self.opened,
+            "rejected": self.rejected,
+            "recent_failures": sum(self._outcomes),
+            "recent_requests": len(self._outcomes),
+        }
+
+
+# Listener: called as listener(host, message) on breaker transitions and rate cuts
+Listener = Callable[[str, str], None]
+_listeners: List[Listener] = []
+
+
+def add_listener(listener: Listener):
+    """Receive breaker transitions and rate cuts (replaces the default print)."""
+    _listeners.append(listener)
+
+
+def _notify(host: str, message: str):
+    if not _listeners:
+        print(f"Upstream {host}: {message}")
+    for listener in _listeners:
+        listener(host, message)
+
+
+class UpstreamGuard:
+    """Rate limiter plus circuit breaker for one upstream host."""
+
+    def __init__(self, host: str, limiter: Optional[AdaptiveRateLimiter] = None,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.host = host
+        self.limiter = limiter or AdaptiveRateLimiter()
+        self.breaker = breaker or CircuitBreaker()
+        # Tokens go to interactive requests before background ones
+        self.scheduler = FetchScheduler(self.limiter)
+        # Blocking callers take tokens one at a time (acquire_blocking)
+        self._blocking_lock = threading.Lock()
+        self.failures = 0
+        self.successes = 0
+
+    @property
+    def is_open(self) -> bool:
+        """True while the breaker is not closed (open, or half-open waiting on a probe)."""
+        return self.breaker.state != CLOSED
+
+    async def acquire(self, max_wait: Optional[float] = None):
+        """
+        Wait for permission to send one request (in fetch priority order).
+
+        Raises:
+            CircuitOpen: The breaker is open
+            asyncio.TimeoutError: An interactive request's rate limit wait would exceed max_wait
+        """
+        changed = self.breaker.allow()
+        if changed is None:
+            raise CircuitOpen(self.host, self.breaker.retry_after())
+        if changed:
+            _notify(self.host, f"circuit half-open, sending a probe request (rate {self.limiter.rate:.2f}/s)")
+        try:
+            await self.scheduler.acquire(max_wait=max_wait)
+        except BaseException:
+            self.breaker.release()
+            raise
+        if self.breaker.state == OPEN:
+            # The breaker opened while this request waited for its token: it is never sent
+            self.limiter.refund()
+            self.breaker.release()
+            raise CircuitOpen(self.host, self.breaker.retry_after())
+
+    def acquire_blocking(self, max_wait: Optional[float] = None):
+        """
+        acquire() for blocking callers outside the event loop: sleeps until
+        the bucket has a token (blocking requests are not part of the
+        priority queue; they take a token as soon as one is free).
+
+        Raises:
+            CircuitOpen: The breaker is open
+            TimeoutError: The rate limit wait would exceed max_wait
+        """
+        changed = self.breaker.allow()
+        if changed is None:
+            raise CircuitOpen(self.host, self.breaker.retry_after())
+        if changed:
+            _notify(self.host, f"circuit half-open, sending a probe request (rate {self.limiter.rate:.2f}/s)")
+        with self._blocking_lock:
+            waited = 0.0
+            while True:
+                delay = self.limiter.delay()
+                if delay <= 0:
+                    break
+                if max_wait is not None and waited + delay > max_wait:
+                    self.breaker.release()
+                    raise TimeoutError()
+                time.sleep(delay)
+                waited += delay
+            self.limiter.take()
+        if self.breaker.state == OPEN:
+            # The breaker opened while this request waited for its token: it is never sent
+            self.limiter.refund()
+            self.breaker.release()
+            raise CircuitOpen(self.host, self.breaker.retry_after())
+
+    def release(self):
+        """The request ended without telling us anything about the upstream."""
+        self.breaker.release()
+
+    def record(self, failed: bool, retry_after: Optional[float] = None):
+        """Record the outcome of a request sent after acquire()."""
+        if failed:
+            self.failures += 1
+            if retry_after:
+                self.limiter.pause(retry_after)
+            if self.limiter.on_failure():
+                _notify(self.host, f"upstream struggling, request rate cut to {self.limiter.rate:.2f}/s")
+        else:
+            self.successes += 1
+            self.limiter.on_success()
+
+        changed = self.breaker.record(failed)
+        if changed == OPEN:
+            _notify(self.host, f"circuit OPEN after repeated failures; pausing requests for "
+                               f"{self.breaker.cooldown:g}s (rate {self.limiter.rate:.2f}/s)")
+        elif changed == CLOSED:
+            _notify(self.host, f"circuit closed, upstream recovered (rate {self.limiter.rate:.2f}/s)")
+
+    async def wait_until_available(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the breaker lets requests through again.
+
+        Returns True once it does, False if it is still open after `timeout` seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.breaker.retry_after()
+            if wait <= 0:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            await asyncio.sleep(wait)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "successes": self.successes,
+            "failures": self.failures,
+            "limiter": self.limiter.stats(),
+            "breaker": self.breaker.stats(),
+            "queue": self.scheduler.stats(),
+        }
+
+
+_guards: Dict[str, UpstreamGuard] = {}
+
+
+def host_of(url: str) -> str:
+    """Guard key for a URL: "https://account.aq.com/CharPage?id=x" -> "account.aq.com"."""
+    return (urlsplit(url if "://" in url else f"https://{url}").hostname or "").lower()
+
+
+def get_guard(url: str) -> UpstreamGuard:
+    """The guard for the host of `url` (created with the configured defaults on first use)."""
+    host = host_of(url)
+    guard = _guards.get(host)
+    if guard is None:
+        guard = _guards[host] = UpstreamGuard(host)
+    return guard
+
+
+def guard_stats() -> Dict[str, Any]:
+    """Limiter and breaker stats for every host seen so far."""
+    return {host: guard.stats() for host, guard in _guards.items()}
+
+
+class GuardedTransport(httpx.AsyncBaseTransport):
+    """httpx transport that sends every request through its host's guard."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        guard = get_guard(str(request.url))
+        max_wait = (request.extensions.get("timeout") or {}).get("pool")
+        try:
+            await guard.acquire(max_wait)
+        except CircuitOpen as e:
+            e.request = request
+            raise
+        except asyncio.TimeoutError:
+            raise httpx.PoolTimeout(f"Rate limit for {guard.host} would delay the request more than "
+                                    f"{max_wait}s", request=request) from None
+
+        try:
+            response = await self._transport.handle_async_request(request)
+        except httpx.PoolTimeout:
+            guard.release()  # Our own connection pool was full; says nothing about the upstream
+            raise
+        except (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError):
+            guard.record(failed=True)
+            raise
+        except BaseException:
+            guard.release()
+            raise
+
+        failed = is_failure_status(response.status_code)
+        guard.record(failed, retry_after_seconds(response) if failed else None)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class GuardedSyncTransport(httpx.BaseTransport):
+    """Blocking counterpart of GuardedTransport (for httpx.Client)."""
+
+    def __init__(self, transport: httpx.BaseTransport):
+        self._transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        guard = get_guard(str(request.url))
+        max_wait = (request.extensions.get("timeout") or {}).get("pool")
+        try:
+            guard.acquire_blocking(max_wait)
+        except CircuitOpen as e:
+            e.request = request
+            raise
+        except TimeoutError:
+            raise httpx.PoolTimeout(f"Rate limit for {guard.host} would delay the request more than "
+                                    f"{max_wait}s", request=request) from None
+
+        try:
+            response = self._transport.handle_request(request)
+        except httpx.PoolTimeout:
+            guard.release()
+            raise
+        except (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError):
+            guard.record(failed=True)
+            raise
+        except BaseException:
+            guard.release()
+            raise
+
+        failed = is_failure_status(response.status_code)
+        guard.record(failed, retry_after_seconds(response) if failed else None)
+        return response
+
+    def close(self):
+        self._transport.close()